@@ -0,0 +1,73 @@
+"""
+Measures trend-chart redraw time for long histories: the old path (clear the
+figure and plot every point) against LTTB decimation with an in-place
+Line2D update.
+
+Usage: python bench_chart.py [points]
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import numpy as np
+
+from bmi_calculator import chart
+
+
+def timed(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(42)
+    x = 19000 + np.arange(points) / 24.0  # hourly measurements
+    y = 24 + np.cumsum(rng.normal(0, 0.05, points))
+    dates = np.datetime_as_string(
+        chart._EPOCH + (x * 86400).astype("timedelta64[s]"), unit="s"
+    ).astype(object)
+    dates = [d.replace("T", " ") for d in dates]
+
+    full_figure = Figure(figsize=(8, 4))
+    full_canvas = FigureCanvasAgg(full_figure)
+
+    def full_redraw():
+        full_figure.clear()
+        ax = full_figure.add_subplot(111)
+        ax.plot(x, y, marker='o', linewidth=2.5, markersize=8)
+        full_canvas.draw()
+
+    figure = Figure(figsize=(8, 4))
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    line, = ax.plot(*chart.lttb(x, y))
+    canvas.draw()
+
+    def incremental_redraw():
+        line.set_data(*chart.lttb(x, y))
+        ax.relim()
+        ax.autoscale_view()
+        canvas.draw()
+
+    print(f"points:               {points:,}")
+    print(f"strptime parse:       {timed(lambda: [time.strptime(d, '%Y-%m-%d %H:%M:%S') for d in dates], 1):8.1f} ms")
+    print(f"vectorized parse:     {timed(lambda: chart.parse_dates(dates), 1):8.1f} ms")
+    print(f"lttb decimation:      {timed(lambda: chart.lttb(x, y)):8.1f} ms")
+    print(f"full redraw:          {timed(full_redraw, 2):8.1f} ms")
+    print(f"decimated set_data:   {timed(incremental_redraw):8.1f} ms "
+          f"({chart.DEFAULT_MAX_POINTS} points drawn)")
+
+
+if __name__ == "__main__":
+    main()
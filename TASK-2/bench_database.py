@@ -0,0 +1,40 @@
+"""
+Measures single-row insert throughput of DatabaseManager.add_record with the
+legacy connect-per-call mode and the default persistent WAL connection.
+
+Usage: python bench_database.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bmi_calculator.database import DatabaseManager
+
+
+def insert_rate(rows, persistent):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"), persistent=persistent)
+        user_id = db.add_user("bench")
+        start = time.perf_counter()
+        for i in range(rows):
+            db.add_record(user_id, 70 + i % 10, 1.75, 22.9)
+        elapsed = time.perf_counter() - start
+        db.close()
+    return rows / elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    legacy = insert_rate(rows, persistent=False)
+    pooled = insert_rate(rows, persistent=True)
+    print(f"rows:       {rows:,}")
+    print(f"legacy:     {legacy:,.0f} inserts/s (new connection per call)")
+    print(f"persistent: {pooled:,.0f} inserts/s (WAL, synchronous=NORMAL)")
+    print(f"speedup:    {pooled / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
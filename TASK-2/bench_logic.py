@@ -0,0 +1,55 @@
+"""
+Compares the scalar BMI path (calculate_bmi + get_category in a loop)
+with BMILogic.calculate_bmi_batch.
+
+Usage: python bench_logic.py [rows]
+"""
+import random
+import sys
+import os
+import time
+from array import array
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bmi_calculator.logic import BMILogic, load_numpy
+
+
+def scalar_path(weights, heights):
+    results = []
+    for weight, height in zip(weights, heights):
+        try:
+            bmi = BMILogic.calculate_bmi(weight, height)
+            results.append((bmi, BMILogic.get_category(bmi)))
+        except ValueError:
+            results.append((None, None))
+    return results
+
+
+def best_of(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(42)
+    weights = array("d", (rng.uniform(40, 150) for _ in range(rows)))
+    heights = array("d", (rng.uniform(1.4, 2.1) for _ in range(rows)))
+
+    scalar = best_of(scalar_path, weights, heights)
+    batch = best_of(BMILogic.calculate_bmi_batch, weights, heights)
+
+    print(f"rows:   {rows:,}")
+    print(f"engine: {'numpy' if load_numpy() is not None else 'pure python (array.array)'}")
+    print(f"scalar: {scalar:.3f}s ({rows / scalar:,.0f} rows/s)")
+    print(f"batch:  {batch:.3f}s ({rows / batch:,.0f} rows/s)")
+    print(f"speedup: {scalar / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Measures theme toggle latency in the BMI app: reading the .qss file from disk
+on every toggle (the previous behaviour) against ThemeManager's cached
+stylesheets, plus the cost of re-applying the active theme.
+
+Usage: python bench_theme.py [toggles] [--offscreen]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+if "--offscreen" in sys.argv:
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    sys.argv.remove("--offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from bmi_calculator.database import DatabaseManager
+from bmi_calculator.ui.main_window import MainWindow
+from bmi_calculator.ui.theme_manager import ThemeManager
+
+
+def median_ms(app, toggles, toggle):
+    samples = []
+    for i in range(toggles):
+        start = time.perf_counter()
+        toggle(i)
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    toggles = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        window = MainWindow(db_manager=db)
+        window.show()
+        app.processEvents()
+
+        def read_from_disk(i):
+            name = ThemeManager.THEMES["dark" if i % 2 else "light"]
+            with open(os.path.join(ThemeManager.THEME_DIR, name), "r") as f:
+                app.setStyleSheet(f.read())
+
+        manager = ThemeManager.instance()
+        manager.preload()
+
+        print(f"toggles:             {toggles}")
+        print(f"read from disk:      {median_ms(app, toggles, read_from_disk):7.2f} ms")
+        print(f"cached (preloaded):  {median_ms(app, toggles, lambda i: window.toggle_theme()):7.2f} ms")
+        print(f"re-apply same theme: {median_ms(app, toggles, lambda i: window.apply_theme()):7.3f} ms")
+
+        window.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
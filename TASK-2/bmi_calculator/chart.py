@@ -0,0 +1,86 @@
+import numpy as np
+
+# Points drawn by the trend chart regardless of history length
+DEFAULT_MAX_POINTS = 2000
+
+# Matplotlib date numbers are days since 1970-01-01 (matplotlib >= 3.3)
+_EPOCH = np.datetime64("1970-01-01T00:00:00", "s")
+_ONE_DAY = np.timedelta64(1, "D")
+
+
+def parse_dates(date_strings):
+    """
+    Converts 'YYYY-MM-DD HH:MM:SS' strings to matplotlib date numbers in one
+    vectorized pass. Unparseable entries become NaN.
+    """
+    values = np.asarray(date_strings, dtype=object)
+    try:
+        parsed = values.astype("datetime64[s]")
+    except ValueError:
+        # Fall back to element-wise parsing only when the batch has bad rows
+        parsed = np.array([_parse_one(v) for v in values], dtype="datetime64[s]")
+    return (parsed - _EPOCH) / _ONE_DAY
+
+
+def _parse_one(value):
+    try:
+        return np.datetime64(value, "s")
+    except (TypeError, ValueError):
+        return np.datetime64("NaT")
+
+
+def to_date_number(value):
+    """Converts a naive datetime to a matplotlib date number."""
+    return (np.datetime64(value, "s") - _EPOCH) / _ONE_DAY
+
+
+def series_from_rows(rows):
+    """Splits (date_number, bmi) rows into float arrays, dropping rows without a date."""
+    data = np.array(rows, dtype=np.float64).reshape(-1, 2)
+    data = data[~np.isnan(data[:, 0])]
+    return data[:, 0], data[:, 1]
+
+
+def lttb(x, y, threshold=DEFAULT_MAX_POINTS):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, for each of threshold - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket. The visual shape
+    of the line is preserved while the point count is bounded by threshold.
+
+    Returns (x, y) arrays; the inputs are returned as-is when they are already
+    small enough.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    every = (n - 2) / (threshold - 2)
+    # bounds[i]:bounds[i + 1] is bucket i (all points except first and last)
+    bounds = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    bounds[-1] = n - 1
+
+    # The mean of every "next" bucket is independent of the points chosen so
+    # far, so compute them all up front; the last bucket looks at the final point
+    sizes = np.diff(bounds)
+    avg_x = np.append((np.add.reduceat(x[1:n - 1], bounds[:-1] - 1) / sizes)[1:], x[-1])
+    avg_y = np.append((np.add.reduceat(y[1:n - 1], bounds[:-1] - 1) / sizes)[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        ax, ay = x[a], y[a]
+        areas = np.abs((ax - avg_x[i]) * (y[start:end] - ay) - (ax - x[start:end]) * (avg_y[i] - ay))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return x[selected], y[selected]
+
@@ -1,22 +1,156 @@
 import sqlite3
 import datetime
+import math
+import threading
+from itertools import islice
+
+from .logic import BMILogic
+
+# Schema migrations, applied in order to databases whose PRAGMA user_version is
+# lower than the migration's version. Version 1 is the original schema created
+# by create_tables.
+MIGRATIONS = [
+    (2, [
+        # Covers get_records (WHERE user_id = ? ORDER BY date) without a table
+        # lookup or a temp b-tree sort
+        """
+        CREATE INDEX IF NOT EXISTS idx_records_user_date
+        ON records (user_id, date, weight, height, bmi)
+        """,
+    ]),
+    (3, [
+        # Keyset pagination orders by (date, id); id must precede the payload
+        # columns for the index to deliver that order without a sort
+        "DROP INDEX IF EXISTS idx_records_user_date",
+        """
+        CREATE INDEX IF NOT EXISTS idx_records_history
+        ON records (user_id, date, id, weight, height, bmi)
+        """,
+    ]),
+    (4, [
+        # Serves MIN/MAX and percentile lookups per user
+        "CREATE INDEX IF NOT EXISTS idx_records_user_bmi ON records (user_id, bmi)",
+        # Running per-user aggregates, kept current by the triggers below.
+        # A NULL min_bmi/max_bmi means the extreme was deleted and is
+        # recomputed lazily by get_record_stats.
+        """
+        CREATE TABLE IF NOT EXISTS record_summary (
+            user_id INTEGER PRIMARY KEY,
+            count INTEGER NOT NULL,
+            total REAL NOT NULL,
+            min_bmi REAL,
+            max_bmi REAL,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_records_summary_insert
+        AFTER INSERT ON records
+        BEGIN
+            INSERT INTO record_summary (user_id, count, total, min_bmi, max_bmi)
+            VALUES (NEW.user_id, 1, NEW.bmi, NEW.bmi, NEW.bmi)
+            ON CONFLICT (user_id) DO UPDATE SET
+                count = count + 1,
+                total = total + excluded.total,
+                min_bmi = MIN(min_bmi, excluded.min_bmi),
+                max_bmi = MAX(max_bmi, excluded.max_bmi);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_records_summary_delete
+        AFTER DELETE ON records
+        BEGIN
+            UPDATE record_summary SET
+                count = count - 1,
+                total = total - OLD.bmi,
+                min_bmi = CASE WHEN OLD.bmi <= min_bmi THEN NULL ELSE min_bmi END,
+                max_bmi = CASE WHEN OLD.bmi >= max_bmi THEN NULL ELSE max_bmi END
+            WHERE user_id = OLD.user_id;
+            DELETE FROM record_summary WHERE user_id = OLD.user_id AND count <= 0;
+        END
+        """,
+        # Backfill existing databases
+        """
+        INSERT OR REPLACE INTO record_summary (user_id, count, total, min_bmi, max_bmi)
+        SELECT user_id, COUNT(*), SUM(bmi), MIN(bmi), MAX(bmi)
+        FROM records GROUP BY user_id
+        """,
+    ]),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+class ConnectionManager:
+    """
+    Hands out one long-lived SQLite connection per thread.
+
+    Connections are opened lazily, configured once with WAL journaling and
+    tuned pragmas, and reused for every subsequent query on that thread.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",  # fsync on checkpoint, not on every commit
+        "PRAGMA foreign_keys=ON",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-8000",  # ~8 MB page cache
+        "PRAGMA busy_timeout=5000",
+    )
+
+    def __init__(self, db_name):
+        self.db_name = db_name
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def get_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_name)
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Close every connection opened through this manager."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Connection belongs to another thread that is still alive
+                pass
+        self._local = threading.local()
+
 
 class DatabaseManager:
-    def __init__(self, db_name="bmi_data.db"):
+    def __init__(self, db_name="bmi_data.db", persistent=True):
         # Ensure database is in the project root directory
         import os
-        if not os.path.isabs(db_name):
+        if not os.path.isabs(db_name) and db_name != ":memory:":
             # Get the directory where the database.py file is located
             current_dir = os.path.dirname(os.path.abspath(__file__))
             # Go up one level to project root
             project_root = os.path.dirname(current_dir)
             db_name = os.path.join(project_root, db_name)
         self.db_name = db_name
+        # persistent=False keeps the old connect-per-call behaviour
+        self.connection_manager = ConnectionManager(db_name) if persistent else None
         self.create_tables()
 
     def get_connection(self):
+        if self.connection_manager is not None:
+            return self.connection_manager.get_connection()
         return sqlite3.connect(self.db_name)
 
+    def close(self):
+        if self.connection_manager is not None:
+            self.connection_manager.close()
+
     def create_tables(self):
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -39,6 +173,24 @@ class DatabaseManager:
                 )
             """)
             conn.commit()
+        self.migrate()
+
+    def get_schema_version(self):
+        return self.get_connection().execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self):
+        """Upgrade an existing database in place to SCHEMA_VERSION."""
+        current = max(self.get_schema_version(), 1)
+        with self.get_connection() as conn:
+            for version, statements in MIGRATIONS:
+                if version <= current:
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                # PRAGMA does not accept bound parameters
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                current = version
+        return current
 
     def add_user(self, name):
         try:
@@ -76,8 +228,209 @@ class DatabaseManager:
             """, (user_id,))
             return cursor.fetchall()
 
+    def get_records_page(self, user_id, after=None, limit=200):
+        """
+        Returns up to `limit` records ordered by (date, id), starting after the
+        keyset cursor `after` = (date, id) of the last row of the previous page.
+
+        Rows are (id, weight, height, bmi, date).
+        """
+        with self.get_connection() as conn:
+            if after is None:
+                cursor = conn.execute("""
+                    SELECT id, weight, height, bmi, date FROM records
+                    WHERE user_id = ?
+                    ORDER BY date ASC, id ASC
+                    LIMIT ?
+                """, (user_id, limit))
+            else:
+                cursor = conn.execute("""
+                    SELECT id, weight, height, bmi, date FROM records
+                    WHERE user_id = ? AND (date, id) > (?, ?)
+                    ORDER BY date ASC, id ASC
+                    LIMIT ?
+                """, (user_id, after[0], after[1], limit))
+            return cursor.fetchall()
+
+    def get_bmi_series(self, user_id):
+        """
+        Returns (date_number, bmi) rows ordered by date, where date_number is
+        days since 1970-01-01 (the matplotlib date epoch), computed by SQLite
+        so the chart never parses date strings row by row.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT julianday(date) - 2440587.5, bmi FROM records
+                WHERE user_id = ?
+                ORDER BY date ASC, id ASC
+            """, (user_id,))
+            return cursor.fetchall()
+
+    def count_records(self, user_id):
+        with self.get_connection() as conn:
+            cursor = conn.execute("SELECT COUNT(*) FROM records WHERE user_id = ?", (user_id,))
+            return cursor.fetchone()[0]
+
+    def get_record_stats(self, user_id):
+        """
+        Returns {"count", "avg", "min", "max"} for a user's BMI values from the
+        incrementally maintained record_summary table.
+        """
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT count, total, min_bmi, max_bmi FROM record_summary
+                WHERE user_id = ?
+            """, (user_id,)).fetchone()
+            if row is None:
+                return {"count": 0, "avg": None, "min": None, "max": None}
+
+            count, total, min_bmi, max_bmi = row
+            if min_bmi is None or max_bmi is None:
+                # An extreme value was deleted; refresh it from the index
+                min_bmi, max_bmi = conn.execute(
+                    "SELECT MIN(bmi), MAX(bmi) FROM records WHERE user_id = ?", (user_id,)
+                ).fetchone()
+                conn.execute(
+                    "UPDATE record_summary SET min_bmi = ?, max_bmi = ? WHERE user_id = ?",
+                    (min_bmi, max_bmi, user_id)
+                )
+            return {"count": count, "avg": total / count, "min": min_bmi, "max": max_bmi}
+
+    def get_bmi_percentiles(self, user_id, percentiles=(25, 50, 75)):
+        """Returns {percentile: bmi} using the nearest-rank method."""
+        with self.get_connection() as conn:
+            count = conn.execute("SELECT count FROM record_summary WHERE user_id = ?", (user_id,)).fetchone()
+            if count is None:
+                return {p: None for p in percentiles}
+            count = count[0]
+
+            result = {}
+            for p in percentiles:
+                if not 0 <= p <= 100:
+                    raise ValueError("Percentiles must be between 0 and 100")
+                rank = max(1, -(-p * count // 100))  # ceil(p/100 * count)
+                result[p] = conn.execute("""
+                    SELECT bmi FROM records WHERE user_id = ?
+                    ORDER BY bmi LIMIT 1 OFFSET ?
+                """, (user_id, rank - 1)).fetchone()[0]
+            return result
+
+    def get_monthly_stats(self, user_id):
+        """Returns (month, count, avg, min, max) rows, one per calendar month."""
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT strftime('%Y-%m', date) AS month, COUNT(*), AVG(bmi), MIN(bmi), MAX(bmi)
+                FROM records
+                WHERE user_id = ?
+                GROUP BY month
+                ORDER BY month ASC
+            """, (user_id,))
+            return cursor.fetchall()
+
     def delete_records(self, user_id):
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM records WHERE user_id = ?", (user_id,))
             conn.commit()
+
+    def import_records(self, rows, chunk_size=5000, progress_callback=None):
+        """
+        Streams historical measurements into the records table.
+
+        Args:
+            rows: Iterable of (user_name, weight, height) or
+                  (user_name, weight, height, date) tuples; dates are ISO 8601
+                  strings or datetimes
+            chunk_size: Rows written per transaction (default: 5000)
+            progress_callback: Optional callable(processed, imported) invoked
+                after every chunk
+
+        Returns:
+            Dict with the number of "processed" and "imported" rows and a list of
+            (row_index, message) "errors" for rows that were skipped.
+        """
+        conn = self.get_connection()
+        user_ids = {}
+        processed = 0
+        imported = 0
+        errors = []
+
+        iterator = iter(rows)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+
+            names, weights, heights, dates, indexes = [], [], [], [], []
+            chunk_errors = []
+            for offset, row in enumerate(chunk):
+                index = processed + offset
+                try:
+                    name, weight, height, *rest = row
+                    if len(rest) > 1:
+                        raise ValueError("too many columns")
+                    name = str(name).strip()
+                    if not name:
+                        raise ValueError("user name is empty")
+                    weight, height = float(weight), float(height)
+                    if not (math.isfinite(weight) and math.isfinite(height)):
+                        raise ValueError("weight and height must be finite numbers")
+                    date = self._import_date(rest[0]) if rest and rest[0] is not None else None
+                except (TypeError, ValueError) as e:
+                    chunk_errors.append((index, f"Invalid row: {e}"))
+                    continue
+                # Appended together so the lists stay aligned
+                weights.append(weight)
+                heights.append(height)
+                names.append(name)
+                dates.append(date)
+                indexes.append(index)
+
+            bmis, _, bmi_errors = BMILogic.calculate_bmi_batch(weights, heights)
+            for position, error in bmi_errors.items():
+                chunk_errors.append((indexes[position], str(error)))
+            errors.extend(sorted(chunk_errors))
+
+            valid = [i for i in range(len(names)) if i not in bmi_errors]
+            try:
+                with conn:
+                    self._resolve_users(conn, {names[i] for i in valid}, user_ids)
+                    conn.executemany("""
+                        INSERT INTO records (user_id, weight, height, bmi, date)
+                        VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+                    """, [
+                        (user_ids[names[i]], weights[i], heights[i], float(bmis[i]), dates[i])
+                        for i in valid
+                    ])
+                imported += len(valid)
+            except sqlite3.Error as e:
+                # The chunk was rolled back; drop any ids created inside it
+                user_ids.clear()
+                errors.extend((indexes[i], f"Database error: {e}") for i in valid)
+
+            processed += len(chunk)
+            if progress_callback is not None:
+                progress_callback(processed, imported)
+
+        return {"processed": processed, "imported": imported, "errors": errors}
+
+    @staticmethod
+    def _import_date(value):
+        """Parses an ISO 8601 date or datetime into the format CURRENT_TIMESTAMP stores."""
+        try:
+            return datetime.datetime.fromisoformat(str(value).strip()).strftime("%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            raise ValueError(f"invalid date {value!r}") from None
+
+    def _resolve_users(self, conn, names, user_ids):
+        """Fill user_ids with ids for names, creating missing users in one statement."""
+        missing = [name for name in names if name not in user_ids]
+        if not missing:
+            return
+        conn.executemany("INSERT OR IGNORE INTO users (name) VALUES (?)", [(name,) for name in missing])
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(missing), 500):
+            batch = missing[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            cursor = conn.execute(f"SELECT name, id FROM users WHERE name IN ({placeholders})", batch)
+            user_ids.update(cursor.fetchall())
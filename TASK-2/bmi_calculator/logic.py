@@ -1,3 +1,24 @@
+import bisect
+import functools
+from array import array
+
+# Category boundaries: a BMI falls into CATEGORIES[i] where i is the number of
+# thresholds it is greater than or equal to.
+CATEGORY_THRESHOLDS = (18.5, 25.0, 30.0)
+CATEGORIES = ("Underweight", "Normal weight", "Overweight", "Obese")
+INVALID_CATEGORY = -1
+
+
+@functools.lru_cache(maxsize=None)
+def load_numpy():
+    """Import numpy on first batch call so the GUI does not pay for it at startup."""
+    try:
+        import numpy
+    except ImportError:  # numpy ships with matplotlib, but keep logic usable without it
+        return None
+    return numpy
+
+
 class BMILogic:
     @staticmethod
     def calculate_bmi(weight_kg, height_m):
@@ -7,11 +28,73 @@ class BMILogic:
 
     @staticmethod
     def get_category(bmi):
-        if bmi < 18.5:
-            return "Underweight"
-        elif 18.5 <= bmi < 25:
-            return "Normal weight"
-        elif 25 <= bmi < 30:
-            return "Overweight"
-        else:
-            return "Obese"
+        return CATEGORIES[BMILogic.get_category_code(bmi)]
+
+    @staticmethod
+    def get_category_code(bmi):
+        """Return the index into CATEGORIES for a single BMI value."""
+        return bisect.bisect_right(CATEGORY_THRESHOLDS, bmi)
+
+    @staticmethod
+    def calculate_bmi_batch(weights_kg, heights_m):
+        """
+        Calculates BMI and category codes for whole columns of measurements.
+
+        Args:
+            weights_kg: Sequence/array of weights in kilograms
+            heights_m: Sequence/array of heights in meters (same length)
+
+        Returns:
+            (bmis, codes, errors) where bmis and codes are numpy arrays when numpy
+            is available (array.array otherwise), codes index into CATEGORIES and
+            errors maps row index -> ValueError for rows with a non-positive height.
+            Those rows get a NaN BMI and the code INVALID_CATEGORY.
+        """
+        if len(weights_kg) != len(heights_m):
+            raise ValueError("Weights and heights must have the same length")
+
+        if load_numpy() is not None:
+            return BMILogic._calculate_bmi_batch_numpy(weights_kg, heights_m)
+        return BMILogic._calculate_bmi_batch_python(weights_kg, heights_m)
+
+    @staticmethod
+    def _calculate_bmi_batch_numpy(weights_kg, heights_m):
+        np = load_numpy()
+        weights = np.asarray(weights_kg, dtype=np.float64)
+        heights = np.asarray(heights_m, dtype=np.float64)
+
+        invalid = heights <= 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bmis = weights / (heights * heights)
+        bmis[invalid] = np.nan
+
+        codes = np.searchsorted(CATEGORY_THRESHOLDS, bmis, side="right").astype(np.int8)
+        codes[invalid] = INVALID_CATEGORY
+
+        errors = {int(i): ValueError("Height must be greater than 0") for i in np.flatnonzero(invalid)}
+        return bmis, codes, errors
+
+    @staticmethod
+    def _calculate_bmi_batch_python(weights_kg, heights_m):
+        bmis = array("d", bytes(8 * len(heights_m)))
+        codes = array("b", bytes(len(heights_m)))
+        errors = {}
+        thresholds = CATEGORY_THRESHOLDS
+        bisect_right = bisect.bisect_right
+
+        for i, (weight, height) in enumerate(zip(weights_kg, heights_m)):
+            if height <= 0:
+                bmis[i] = float("nan")
+                codes[i] = INVALID_CATEGORY
+                errors[i] = ValueError("Height must be greater than 0")
+                continue
+            bmi = weight / (height * height)
+            bmis[i] = bmi
+            codes[i] = bisect_right(thresholds, bmi)
+
+        return bmis, codes, errors
+
+    @staticmethod
+    def get_category_names(codes):
+        """Map category codes from calculate_bmi_batch back to labels (None for invalid rows)."""
+        return [CATEGORIES[code] if code >= 0 else None for code in codes]
@@ -0,0 +1,109 @@
+import itertools
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+def _discard(_):
+    pass
+
+
+class _TaskSignals(QObject):
+    finished = pyqtSignal(int, object)  # token, result
+    failed = pyqtSignal(int, object)  # token, exception
+
+
+class _DatabaseTask(QRunnable):
+    def __init__(self, token, func, args, kwargs):
+        super().__init__()
+        self.token = token
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = _TaskSignals()
+        # The worker keeps its own reference so a task can be taken back out
+        # of the queue when it is superseded
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(self.token, e)
+        else:
+            self.signals.finished.emit(self.token, result)
+
+
+class DatabaseWorker(QObject):
+    """
+    Runs DatabaseManager calls off the GUI thread.
+
+    Calls are queued on a single background thread, so writes and the reloads
+    that follow them run in submission order. Results are delivered through
+    Qt signals back on the GUI thread. Submitting with a `key` supersedes any
+    earlier request with the same key: a queued one is removed from the
+    queue, and a running one has its result dropped.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        # SQLite allows one writer; a single thread also keeps results ordered
+        self.pool.setMaxThreadCount(1)
+        # Keep the thread (and its SQLite connection) alive between requests
+        self.pool.setExpiryTimeout(-1)
+        self._tokens = itertools.count()
+        self._tasks = {}  # token -> (task, key, on_result, on_error)
+        self._latest = {}  # key -> token of the newest request
+
+    def submit(self, func, *args, key=None, on_result=None, on_error=None, **kwargs):
+        token = next(self._tokens)
+        if key is not None:
+            self.cancel(key)
+            self._latest[key] = token
+
+        task = _DatabaseTask(token, func, args, kwargs)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        self._tasks[token] = (task, key, on_result, on_error)
+        self.pool.start(task)
+        return token
+
+    def cancel(self, key):
+        """Drop the pending request for key, if any."""
+        token = self._latest.pop(key, None)
+        entry = self._tasks.get(token)
+        if entry is None:
+            return
+        task = entry[0]
+        if self.pool.tryTake(task):
+            del self._tasks[token]
+        else:
+            # Already running: let it finish but ignore its outcome
+            self._tasks[token] = (task, key, None, _discard)
+
+    def is_pending(self, key):
+        return key in self._latest
+
+    def wait_for_done(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+
+    def _take(self, token):
+        entry = self._tasks.pop(token, None)
+        if entry is None:
+            return None, None
+        _, key, on_result, on_error = entry
+        if key is not None and self._latest.get(key) == token:
+            del self._latest[key]
+        return on_result, on_error
+
+    def _on_finished(self, token, result):
+        on_result, _ = self._take(token)
+        if on_result is not None:
+            on_result(result)
+
+    def _on_failed(self, token, error):
+        _, on_error = self._take(token)
+        if on_error is not None:
+            on_error(error)
+        else:
+            print(f"Database error: {error}")
@@ -0,0 +1,123 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """
+    Table model over a user's BMI records that loads rows lazily.
+
+    Rows are fetched from DatabaseManager.get_records_page in keyset-paginated
+    pages as the view scrolls, so only the visible part of a long history is
+    ever materialised. With a DatabaseWorker, pages are loaded on its
+    background thread and inserted when they arrive.
+    """
+
+    HEADERS = ["Date", "Weight (kg)", "Height (m)", "BMI"]
+    FETCH_KEY = "history-page"
+
+    def __init__(self, page_size=200, parent=None, worker=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.worker = worker
+        self.db_manager = None
+        self.user_id = None
+        self._rows = []
+        self._cursor = None
+        self._exhausted = True
+        self._loading = False
+        self._generation = 0
+
+    def set_user(self, db_manager, user_id):
+        """Point the model at another user's history and reset it."""
+        if self.worker is not None:
+            self.worker.cancel(self.FETCH_KEY)
+        self.beginResetModel()
+        self._generation += 1
+        self._loading = False
+        self.db_manager = db_manager
+        self.user_id = user_id
+        self._rows = []
+        self._cursor = None
+        self._exhausted = db_manager is None or user_id is None
+        self.endResetModel()
+
+    def clear(self):
+        self.set_user(None, None)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted or self._loading:
+            return
+
+        generation = self._generation
+        if self.worker is None:
+            page = self.db_manager.get_records_page(self.user_id, after=self._cursor, limit=self.page_size)
+            self._append_page(generation, page)
+            return
+
+        self._loading = True
+        self.worker.submit(
+            self.db_manager.get_records_page, self.user_id,
+            after=self._cursor, limit=self.page_size,
+            key=self.FETCH_KEY,
+            on_result=lambda page: self._append_page(generation, page),
+            on_error=lambda error: self._page_failed(generation, error),
+        )
+
+    def _page_failed(self, generation, error):
+        if generation != self._generation:
+            return
+        # Let the view ask for the page again on the next scroll
+        self._loading = False
+        print(f"Database error: {error}")
+
+    def _append_page(self, generation, page):
+        if generation != self._generation:
+            return  # The model was reset while this page was loading
+        self._loading = False
+        if len(page) < self.page_size:
+            self._exhausted = True
+        if not page:
+            return
+
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+        record_id, _, _, _, date = page[-1]
+        self._cursor = (date, record_id)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return QVariant()
+
+        _, weight, height, bmi, date = self._rows[index.row()]
+        column = index.column()
+        if column == 0:
+            return date
+        elif column == 1:
+            return f"{weight:.1f}"
+        elif column == 2:
+            return f"{height:.2f}"
+        return f"{bmi:.1f}"
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
@@ -1,14 +1,28 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView, QLabel
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTableView, QHeaderView, QLabel
 from PyQt6.QtGui import QPainter, QPixmap
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.dates as mdates
-import datetime
 import os
+import time
+from .history_model import HistoryTableModel
+
+# matplotlib, numpy and bmi_calculator.chart are imported in ensure_chart(),
+# the first time the History tab is shown, to keep them off the startup path.
 
 class HistoryWidget(QWidget):
-    def __init__(self):
+    # Markers are only drawn while they can still be told apart
+    MARKER_LIMIT = 200
+
+    def __init__(self, max_chart_points=None, worker=None):
         super().__init__()
+        self.worker = worker
+        self.max_chart_points = max_chart_points
+        self.figure = None
+        self.canvas = None
+        self.series_x = None
+        self.series_y = None
+        self.ax = None
+        self.line = None
+        self.last_redraw_ms = 0.0
+        self._pending_chart_updates = []
         self.init_ui()
 
     def init_ui(self):
@@ -54,18 +68,17 @@ class HistoryWidget(QWidget):
         
         layout.addWidget(stats_frame)
 
-        # Graph
-        self.figure = Figure(figsize=(8, 4))
-        self.figure.patch.set_alpha(0.0)
-        self.canvas = FigureCanvas(self.figure)
-        self.canvas.setStyleSheet("background: transparent;")
-        self.canvas.setMinimumHeight(300)
-        layout.addWidget(self.canvas)
+        # Graph (the canvas is created by ensure_chart on first show)
+        self.chart_container = QWidget()
+        self.chart_container.setMinimumHeight(300)
+        chart_layout = QVBoxLayout(self.chart_container)
+        chart_layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.chart_container)
 
-        # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["Date", "Weight (kg)", "Height (m)", "BMI"])
+        # Table (rows are fetched lazily by the model as the user scrolls)
+        self.table_model = HistoryTableModel(worker=self.worker)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table.setAlternatingRowColors(True)
         self.table.setMinimumHeight(200)
@@ -81,75 +94,155 @@ class HistoryWidget(QWidget):
 
         self.setLayout(layout)
 
-    def update_data(self, records):
-        # Update statistics
-        if records:
-            bmis = [bmi for _, _, bmi, _ in records]
-            avg_bmi = sum(bmis) / len(bmis)
-            min_bmi = min(bmis)
-            max_bmi = max(bmis)
-            
-            self.avg_label.setText(f"Avg BMI: {avg_bmi:.1f}")
-            self.min_label.setText(f"Min BMI: {min_bmi:.1f}")
-            self.max_label.setText(f"Max BMI: {max_bmi:.1f}")
-            self.count_label.setText(f"Records: {len(records)}")
+    def set_user(self, db_manager, user_id):
+        """Show the paginated history table for user_id."""
+        self.table_model.set_user(db_manager, user_id)
+        if self.table_model.canFetchMore():
+            self.table_model.fetchMore()
+
+    def update_stats(self, stats):
+        """Update the summary panel from DatabaseManager.get_record_stats."""
+        if stats["count"]:
+            self.avg_label.setText(f"Avg BMI: {stats['avg']:.1f}")
+            self.min_label.setText(f"Min BMI: {stats['min']:.1f}")
+            self.max_label.setText(f"Max BMI: {stats['max']:.1f}")
+            self.count_label.setText(f"Records: {stats['count']}")
         else:
             self.avg_label.setText("Avg BMI: --")
             self.min_label.setText("Min BMI: --")
             self.max_label.setText("Max BMI: --")
             self.count_label.setText("Records: 0")
-        
-        # Update Table
-        self.table.setRowCount(len(records))
-        dates = []
-        bmis = []
-
-        for i, (weight, height, bmi, date_str) in enumerate(records):
-            # Parse date
-            try:
-                date_obj = datetime.datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                date_obj = datetime.datetime.now()
-
-            self.table.setItem(i, 0, QTableWidgetItem(date_str))
-            self.table.setItem(i, 1, QTableWidgetItem(f"{weight:.1f}"))
-            self.table.setItem(i, 2, QTableWidgetItem(f"{height:.2f}"))
-            self.table.setItem(i, 3, QTableWidgetItem(f"{bmi:.1f}"))
-            
-            dates.append(date_obj)
-            bmis.append(bmi)
-
-        # Update Graph
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.ensure_chart()
+
+    def ensure_chart(self):
+        """Import matplotlib and build the canvas, then replay queued updates."""
+        if self.canvas is not None:
+            return
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+        import numpy as np
+        from .. import chart
+
+        if self.max_chart_points is None:
+            self.max_chart_points = chart.DEFAULT_MAX_POINTS
+        self.series_x = np.empty(0)
+        self.series_y = np.empty(0)
+
+        self.figure = Figure(figsize=(8, 4))
+        self.figure.patch.set_alpha(0.0)
+        self.canvas = FigureCanvas(self.figure)
+        self.canvas.setStyleSheet("background: transparent;")
+        self.canvas.setMinimumHeight(300)
+        self.chart_container.layout().addWidget(self.canvas)
+
+        pending, self._pending_chart_updates = self._pending_chart_updates, []
+        for update in pending:
+            update()
+        self.redraw_chart()
+
+    def update_data(self, records):
+        """Plot full (weight, height, bmi, date) records."""
+        self._queue_chart_update(lambda: self._set_records(records), replace=True)
+
+    def update_series(self, rows):
+        """Plot (date_number, bmi) rows from DatabaseManager.get_bmi_series."""
+        self._queue_chart_update(lambda: self._set_rows(rows), replace=True)
+
+    def append_point(self, bmi, x=None):
+        """
+        Add one measurement to the end of the plotted series. x is a
+        matplotlib date number and defaults to the current UTC time, matching
+        SQLite's CURRENT_TIMESTAMP.
+        """
+        if x is None:
+            x = time.time() / 86400.0  # days since 1970-01-01
+        self._queue_chart_update(lambda: self._append(x, bmi))
+
+    def _queue_chart_update(self, update, replace=False):
+        if self.canvas is None:
+            # Not shown yet; keep only what is needed to rebuild the series
+            if replace:
+                self._pending_chart_updates = []
+            self._pending_chart_updates.append(update)
+            return
+        update()
+        self.redraw_chart()
+
+    def _set_records(self, records):
+        import numpy as np
+        from .. import chart
+        x = chart.parse_dates([date_str for _, _, _, date_str in records])
+        y = np.array([bmi for _, _, bmi, _ in records], dtype=np.float64)
+        valid = ~np.isnan(x)
+        self.series_x = x[valid]
+        self.series_y = y[valid]
+
+    def _set_rows(self, rows):
+        from .. import chart
+        self.series_x, self.series_y = chart.series_from_rows(rows)
+
+    def _append(self, x, bmi):
+        import numpy as np
+        self.series_x = np.append(self.series_x, x)
+        self.series_y = np.append(self.series_y, bmi)
+
+    def redraw_chart(self):
+        from .. import chart
+        start = time.perf_counter()
+        xs, ys = chart.lttb(self.series_x, self.series_y, self.max_chart_points)
+
+        if not len(xs):
+            self._reset_chart()
+        elif self.line is None:
+            self._create_line(xs, ys)
+        else:
+            # Reuse the existing artist; only its data and the limits change
+            self.line.set_data(xs, ys)
+            self.line.set_marker('o' if len(xs) <= self.MARKER_LIMIT else '')
+            self.ax.relim()
+            self.ax.autoscale_view()
+
+        self.canvas.draw()
+        self.last_redraw_ms = (time.perf_counter() - start) * 1000
+
+    def _reset_chart(self):
         self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        
+        self.ax = self.figure.add_subplot(111)
+        self.line = None
+
         self.figure.patch.set_facecolor('none')
-        ax.set_facecolor((0.96, 0.96, 0.96, 0.5))  # Light gray with transparency
-
-        if dates:
-            # Plot with styled line and markers
-            line, = ax.plot(dates, bmis, marker='o', linestyle='-', linewidth=2.5, markersize=8)
-            line.set_color('#1976D2')  # Blue
-            line.set_markerfacecolor('#1976D2')
-            line.set_markeredgecolor('#0D47A1')
-            line.set_markeredgewidth(2)
-            
-            ax.set_title("BMI Trend Over Time", color='#212121', fontsize=14, fontweight='bold', pad=15)
-            ax.set_xlabel("Date", color='#616161', fontsize=11)
-            ax.set_ylabel("BMI", color='#616161', fontsize=11)
-            
-            # Style ticks
-            ax.tick_params(axis='x', colors='#616161', labelsize=9)
-            ax.tick_params(axis='y', colors='#616161', labelsize=9)
-            
-            # Style spines
-            for spine in ax.spines.values():
-                spine.set_color('#BDBDBD')
-                spine.set_linewidth(1)
-
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-            ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-            self.figure.autofmt_xdate()
-            ax.grid(True, color='#E0E0E0', linestyle='--', alpha=0.7)
-        
-        self.canvas.draw()
+        self.ax.set_facecolor((0.96, 0.96, 0.96, 0.5))  # Light gray with transparency
+
+    def _create_line(self, xs, ys):
+        import matplotlib.dates as mdates
+        self._reset_chart()
+        ax = self.ax
+
+        # Plot with styled line and markers
+        marker = 'o' if len(xs) <= self.MARKER_LIMIT else ''
+        self.line, = ax.plot(xs, ys, marker=marker, linestyle='-', linewidth=2.5, markersize=8)
+        self.line.set_color('#1976D2')  # Blue
+        self.line.set_markerfacecolor('#1976D2')
+        self.line.set_markeredgecolor('#0D47A1')
+        self.line.set_markeredgewidth(2)
+
+        ax.set_title("BMI Trend Over Time", color='#212121', fontsize=14, fontweight='bold', pad=15)
+        ax.set_xlabel("Date", color='#616161', fontsize=11)
+        ax.set_ylabel("BMI", color='#616161', fontsize=11)
+
+        # Style ticks
+        ax.tick_params(axis='x', colors='#616161', labelsize=9)
+        ax.tick_params(axis='y', colors='#616161', labelsize=9)
+
+        # Style spines
+        for spine in ax.spines.values():
+            spine.set_color('#BDBDBD')
+            spine.set_linewidth(1)
+
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+        ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+        self.figure.autofmt_xdate()
+        ax.grid(True, color='#E0E0E0', linestyle='--', alpha=0.7)
@@ -11,9 +11,13 @@ class InputWidget(QWidget):
     user_changed_signal = pyqtSignal(int) # user_id
     add_user_signal = pyqtSignal(str) # username
 
-    def __init__(self, db_manager):
+    USERS_KEY = "users"
+
+    def __init__(self, db_manager, worker=None):
         super().__init__()
         self.db_manager = db_manager
+        # With a DatabaseWorker the user list is loaded off the GUI thread
+        self.worker = worker
         self.init_ui()
 
     def init_ui(self):
@@ -96,6 +100,12 @@ class InputWidget(QWidget):
         self.refresh_users()
 
     def refresh_users(self):
+        if self.worker is None:
+            self.set_users(self.db_manager.get_users())
+            return
+        self.worker.submit(self.db_manager.get_users, key=self.USERS_KEY, on_result=self.set_users)
+
+    def set_users(self, users):
         self.user_combo.blockSignals(True)
         self.user_combo.clear()
         
@@ -103,7 +113,6 @@ class InputWidget(QWidget):
         self.user_combo.addItem("-- Select or Add a User --", None)
         
         # Add existing users
-        users = self.db_manager.get_users()
         for user_id, name in users:
             self.user_combo.addItem(name, user_id)
         
@@ -1,17 +1,23 @@
 from PyQt6.QtWidgets import QMainWindow, QTabWidget, QVBoxLayout, QHBoxLayout, QWidget, QMessageBox
 from .input_widget import InputWidget
 from .history_widget import HistoryWidget
+from .db_worker import DatabaseWorker
+from .theme_manager import ThemeManager
 from ..database import DatabaseManager
 from ..logic import BMILogic
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, db_manager=None):
         super().__init__()
         self.setWindowTitle("BMI Calculator")
         self.setGeometry(100, 100, 900, 700)
 
-        self.db_manager = DatabaseManager()
+        self.db_manager = db_manager if db_manager is not None else DatabaseManager()
+        # All record queries run on this worker, never on the GUI thread
+        self.db_worker = DatabaseWorker(self)
+        self.history_user_id = None
         self.is_dark_mode = False  # Start with light mode
+        self.theme_manager = ThemeManager.instance()
         
         self.init_ui()
         self.apply_theme()  # Apply initial theme
@@ -55,7 +61,7 @@ class MainWindow(QMainWindow):
         calc_layout.setContentsMargins(0, 0, 0, 0)
         
         # Input Widget (left side)
-        self.input_widget = InputWidget(self.db_manager)
+        self.input_widget = InputWidget(self.db_manager, worker=self.db_worker)
         self.input_widget.calculate_signal.connect(self.calculate_bmi)
         self.input_widget.user_changed_signal.connect(self.load_history)
         self.input_widget.add_user_signal.connect(self.add_user)
@@ -69,14 +75,20 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(calc_tab, "Calculator")
 
         # History Tab
-        self.history_widget = HistoryWidget()
+        self.history_widget = HistoryWidget(worker=self.db_worker)
         self.history_widget.clear_btn.clicked.connect(self.clear_history)
         self.tabs.addTab(self.history_widget, "History & Trends")
         
         # Don't auto-load any user on startup - let user select manually
 
     def add_user(self, name):
-        user_id = self.db_manager.add_user(name)
+        self.db_worker.submit(
+            self.db_manager.add_user, name,
+            on_result=lambda user_id: self.on_user_added(name, user_id),
+            on_error=self.on_database_error,
+        )
+
+    def on_user_added(self, name, user_id):
         if user_id:
             QMessageBox.information(self, "Success", f"User '{name}' added successfully!")
             self.input_widget.refresh_users()
@@ -93,21 +105,55 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "Error", "Please select or add a user first.")
                 return
 
-            # Save record
-            self.db_manager.add_record(user_id, weight, height, bmi)
-            
             # Show result in result widget
             self.result_widget.update_result(bmi, category)
-            
-            # Refresh history
-            self.load_history(user_id)
+
+            # Save record in the background
+            self.db_worker.submit(
+                self.save_record, user_id, weight, height, bmi,
+                on_result=self.on_record_saved,
+                on_error=self.on_database_error,
+            )
             
         except ValueError as e:
             QMessageBox.warning(self, "Error", str(e))
 
+    def save_record(self, user_id, weight, height, bmi):
+        # Runs on the database worker thread
+        self.db_manager.add_record(user_id, weight, height, bmi)
+        return user_id, bmi, self.db_manager.get_record_stats(user_id)
+
+    def on_record_saved(self, result):
+        user_id, bmi, stats = result
+        if user_id != self.history_user_id or self.db_worker.is_pending("history"):
+            return  # A full reload for the current user is on its way
+
+        # Refresh history; the chart only gains one point
+        self.history_widget.set_user(self.db_manager, user_id)
+        self.history_widget.update_stats(stats)
+        self.history_widget.append_point(bmi)
+
     def load_history(self, user_id):
-        records = self.db_manager.get_records(user_id)
-        self.history_widget.update_data(records)
+        # Rapid user switches supersede older loads that have not finished
+        self.history_user_id = user_id
+        self.history_widget.set_user(self.db_manager, user_id)
+        self.db_worker.submit(
+            self.fetch_history, user_id,
+            key="history",
+            on_result=self.on_history_loaded,
+            on_error=self.on_database_error,
+        )
+
+    def fetch_history(self, user_id):
+        # Runs on the database worker thread
+        return user_id, self.db_manager.get_record_stats(user_id), self.db_manager.get_bmi_series(user_id)
+
+    def on_history_loaded(self, result):
+        user_id, stats, series = result
+        if user_id != self.history_user_id:
+            return
+        self.history_widget.update_stats(stats)
+        self.history_widget.update_series(series)
 
     def clear_history(self):
         user_id = self.input_widget.user_combo.currentData()
@@ -122,9 +168,24 @@ class MainWindow(QMainWindow):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            self.db_manager.delete_records(user_id)
+            self.db_worker.submit(
+                self.db_manager.delete_records, user_id,
+                on_result=lambda _: self.on_history_cleared(user_id),
+                on_error=self.on_database_error,
+            )
+
+    def on_history_cleared(self, user_id):
+        if user_id == self.history_user_id:
             self.load_history(user_id)
-            QMessageBox.information(self, "Success", "History cleared successfully.")
+        QMessageBox.information(self, "Success", "History cleared successfully.")
+
+    def on_database_error(self, error):
+        QMessageBox.warning(self, "Database Error", str(error))
+
+    def closeEvent(self, event):
+        self.db_worker.wait_for_done()
+        self.db_manager.close()
+        super().closeEvent(event)
     
     def toggle_theme(self):
         """Toggle between light and dark mode"""
@@ -133,22 +194,8 @@ class MainWindow(QMainWindow):
     
     def apply_theme(self):
         """Apply the current theme to the application"""
-        import os
-        
         if self.is_dark_mode:
-            theme_file = "styles_dark.qss"
             self.theme_toggle_btn.setText("☀️ Light Mode")
         else:
-            theme_file = "styles_light.qss"
             self.theme_toggle_btn.setText("🌙 Dark Mode")
-        
-        # Load and apply stylesheet
-        theme_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), theme_file)
-        try:
-            with open(theme_path, "r") as f:
-                self.parent().setStyleSheet(f.read()) if self.parent() else None
-                # Apply to QApplication instead
-                from PyQt6.QtWidgets import QApplication
-                QApplication.instance().setStyleSheet(f.read())
-        except FileNotFoundError:
-            print(f"Warning: {theme_file} not found")
+        self.theme_manager.apply("dark" if self.is_dark_mode else "light")
@@ -0,0 +1,62 @@
+import os
+
+from PyQt6.QtWidgets import QApplication
+
+
+class ThemeManager:
+    """
+    Loads each .qss theme from disk once and applies it to the QApplication.
+
+    Stylesheets are cached after the first read (or up front with preload),
+    and apply() skips the Qt re-polish entirely when the requested theme is
+    already active.
+    """
+
+    THEMES = {
+        "light": "styles_light.qss",
+        "dark": "styles_dark.qss",
+    }
+    # Project root, where the .qss files live
+    THEME_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    _instance = None
+
+    def __init__(self, theme_dir=None):
+        self.theme_dir = theme_dir or self.THEME_DIR
+        self.current = None
+        self._cache = {}
+
+    @classmethod
+    def instance(cls):
+        """Shared manager, so every window sees the same active theme."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def stylesheet(self, name):
+        if name not in self._cache:
+            path = os.path.join(self.theme_dir, self.THEMES[name])
+            with open(path, "r", encoding="utf-8") as f:
+                self._cache[name] = f.read()
+        return self._cache[name]
+
+    def preload(self, *names):
+        """Read the given themes (all of them by default) into the cache."""
+        for name in names or self.THEMES:
+            try:
+                self.stylesheet(name)
+            except FileNotFoundError:
+                print(f"Warning: {self.THEMES[name]} not found")
+
+    def apply(self, name, app=None):
+        """Apply a theme application-wide. Returns False if nothing changed."""
+        if name == self.current:
+            return False
+        try:
+            stylesheet = self.stylesheet(name)
+        except FileNotFoundError:
+            print(f"Warning: {self.THEMES[name]} not found")
+            return False
+        (app or QApplication.instance()).setStyleSheet(stylesheet)
+        self.current = name
+        return True
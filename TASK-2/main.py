@@ -6,16 +6,15 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from PyQt6.QtWidgets import QApplication
 from bmi_calculator.ui.main_window import MainWindow
+from bmi_calculator.ui.theme_manager import ThemeManager
 
 def main():
     app = QApplication(sys.argv)
     
-    # Load light theme stylesheet by default
-    try:
-        with open(os.path.join(os.path.dirname(__file__), "styles_light.qss"), "r") as f:
-            app.setStyleSheet(f.read())
-    except FileNotFoundError:
-        print("Warning: styles_light.qss not found")
+    # Read both themes once so toggling needs no disk I/O; light by default
+    theme_manager = ThemeManager.instance()
+    theme_manager.preload()
+    theme_manager.apply("light", app)
 
     window = MainWindow()
     window.show()
@@ -0,0 +1,97 @@
+"""
+Startup timing harness for the BMI app.
+
+Launches the app in fresh interpreters and reports, for each phase, the median
+over several runs:
+  - import:       importing bmi_calculator.ui.main_window
+  - window:       QApplication + MainWindow construction
+  - first shown:  show() until the first event-loop pass after it
+  - history tab:  first switch to the History tab (loads matplotlib)
+
+It also lists which heavy modules were already imported when the window was
+first shown, so lazy-import regressions are easy to spot.
+
+Usage: python profile_startup.py [--runs N] [--offscreen]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HEAVY_MODULES = ("matplotlib", "numpy")
+
+
+def child():
+    t0 = time.perf_counter()
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    from bmi_calculator.ui.main_window import MainWindow
+    from bmi_calculator.database import DatabaseManager
+    t_import = time.perf_counter()
+
+    timings = {"import": t_import - t0}
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "startup.db"))
+        window = MainWindow(db_manager=db)
+        t_window = time.perf_counter()
+        timings["window"] = t_window - t_import
+
+        def first_shown():
+            t_shown = time.perf_counter()
+            timings["first shown"] = t_shown - t_window
+            loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+            window.tabs.setCurrentWidget(window.history_widget)
+            app.processEvents()
+            timings["history tab"] = time.perf_counter() - t_shown
+            timings["total"] = time.perf_counter() - t0
+
+            print(json.dumps({"timings": timings, "loaded_at_show": loaded}))
+            window.close()
+            app.quit()
+
+        window.show()
+        QTimer.singleShot(0, first_shown)
+        app.exec()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--offscreen", action="store_true", help="use the Qt offscreen platform")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    env = dict(os.environ)
+    if args.offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+
+    results = []
+    for _ in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child"],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    print(f"runs: {args.runs}")
+    for phase in results[0]["timings"]:
+        values = [r["timings"][phase] * 1000 for r in results]
+        print(f"{phase:<12} median {statistics.median(values):8.1f} ms   max {max(values):8.1f} ms")
+    loaded = results[0]["loaded_at_show"]
+    print(f"heavy modules loaded before first show: {', '.join(loaded) if loaded else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
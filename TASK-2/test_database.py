@@ -0,0 +1,190 @@
+import os
+import sqlite3
+import shutil
+import tempfile
+import threading
+import unittest
+
+from bmi_calculator.database import DatabaseManager, SCHEMA_VERSION
+
+
+class TestDatabaseManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(os.path.join(self.tmp_dir, "test.db"))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_wal_mode(self):
+        mode = self.db.get_connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+
+    def test_connection_reused_per_thread(self):
+        self.assertIs(self.db.get_connection(), self.db.get_connection())
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.db.get_connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], self.db.get_connection())
+
+    def test_records_roundtrip(self):
+        user_id = self.db.add_user("alice")
+        self.assertIsNone(self.db.add_user("alice"))
+        self.db.add_record(user_id, 70, 1.75, 22.86)
+        self.db.add_record(user_id, 72, 1.75, 23.51)
+
+        records = self.db.get_records(user_id)
+        self.assertEqual([bmi for _, _, bmi, _ in records], [22.86, 23.51])
+
+        self.db.delete_records(user_id)
+        self.assertEqual(self.db.get_records(user_id), [])
+
+    def test_import_records(self):
+        existing_id = self.db.add_user("alice")
+        rows = [
+            ("alice", 70, 1.75),
+            ("bob", 80, 1.80, "2020-01-01 08:00:00"),
+            ("carol", 60, 0),
+            ("dave", "heavy", 1.70),
+            ("bob", 82, 1.80),
+        ]
+        progress = []
+        result = self.db.import_records(rows, chunk_size=2, progress_callback=lambda *p: progress.append(p))
+
+        self.assertEqual(result["processed"], 5)
+        self.assertEqual(result["imported"], 3)
+        self.assertEqual([index for index, _ in result["errors"]], [2, 3])
+        self.assertEqual(progress, [(2, 2), (4, 2), (5, 3)])
+
+        users = dict((name, user_id) for user_id, name in self.db.get_users())
+        self.assertEqual(users["alice"], existing_id)
+        self.assertNotIn("carol", users)
+        bob_records = self.db.get_records(users["bob"])
+        self.assertEqual(bob_records[0][3], "2020-01-01 08:00:00")
+        self.assertAlmostEqual(bob_records[0][2], 80 / 1.80 ** 2)
+
+    def test_import_records_bad_height(self):
+        result = self.db.import_records([("alice", 70, "tall"), ("bob", 70, 1.7)])
+        self.assertEqual(result["imported"], 1)
+        self.assertEqual([index for index, _ in result["errors"]], [0])
+        self.assertEqual([name for _, name in self.db.get_users()], ["bob"])
+
+    def test_import_records_skips_non_finite_and_bad_dates(self):
+        rows = [
+            ("alice", 70, 1.7),
+            ("bob", "nan", 1.7),
+            ("carol", 70, float("inf")),
+            ("dave", 70, 1.8, "not a date"),
+            ("erin", 65, 1.6, "2020-01-01"),
+        ]
+        result = self.db.import_records(rows)
+        self.assertEqual(result["imported"], 2)
+        self.assertEqual([index for index, _ in result["errors"]], [1, 2, 3])
+        self.assertTrue(all(message.startswith("Invalid row") for _, message in result["errors"]))
+        erin = dict((name, id_) for id_, name in self.db.get_users())["erin"]
+        self.assertEqual([row[3] for row in self.db.get_records(erin)], ["2020-01-01 00:00:00"])
+
+    def test_history_query_uses_index(self):
+        plan = self.db.get_connection().execute("""
+            EXPLAIN QUERY PLAN
+            SELECT weight, height, bmi, date FROM records
+            WHERE user_id = ?
+            ORDER BY date ASC
+        """, (1,)).fetchall()
+        details = " ".join(row[-1] for row in plan)
+        self.assertIn("COVERING INDEX idx_records_history", details)
+        self.assertNotIn("TEMP B-TREE", details)
+
+    def test_migrates_legacy_database(self):
+        path = os.path.join(self.tmp_dir, "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("CREATE TABLE records (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, weight REAL NOT NULL, height REAL NOT NULL, bmi REAL NOT NULL, date TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("INSERT INTO users (name) VALUES ('legacy')")
+        conn.execute("INSERT INTO records (user_id, weight, height, bmi) VALUES (1, 70, 1.75, 22.86)")
+        conn.commit()
+        conn.close()
+
+        db = DatabaseManager(path)
+        try:
+            self.assertEqual(db.get_schema_version(), SCHEMA_VERSION)
+            indexes = [row[1] for row in db.get_connection().execute("PRAGMA index_list(records)")]
+            self.assertIn("idx_records_history", indexes)
+            self.assertEqual(len(db.get_records(1)), 1)
+        finally:
+            db.close()
+
+    def test_records_page(self):
+        user_id = self.db.add_user("alice")
+        self.db.import_records(
+            [("alice", 60 + i, 1.75, f"2024-01-{1 + i // 2:02d} 08:00:00") for i in range(9)]
+        )
+        self.assertEqual(self.db.count_records(user_id), 9)
+
+        pages = []
+        after = None
+        while True:
+            page = self.db.get_records_page(user_id, after=after, limit=4)
+            if not page:
+                break
+            pages.append(page)
+            after = (page[-1][4], page[-1][0])
+
+        self.assertEqual([len(page) for page in pages], [4, 4, 1])
+        weights = [row[1] for page in pages for row in page]
+        self.assertEqual(weights, [row[0] for row in self.db.get_records(user_id)])
+
+    def test_records_page_uses_index(self):
+        plan = self.db.get_connection().execute("""
+            EXPLAIN QUERY PLAN
+            SELECT id, weight, height, bmi, date FROM records
+            WHERE user_id = ? AND (date, id) > (?, ?)
+            ORDER BY date ASC, id ASC
+            LIMIT ?
+        """, (1, "2024-01-01", 0, 200)).fetchall()
+        details = " ".join(row[-1] for row in plan)
+        self.assertIn("idx_records_history", details)
+        self.assertNotIn("TEMP B-TREE", details)
+
+    def test_bmi_series(self):
+        user_id = self.db.add_user("alice")
+        self.db.import_records([("alice", 70, 1.75, "1970-01-02 12:00:00")])
+        self.assertEqual(self.db.get_bmi_series(user_id), [(1.5, 70 / 1.75 ** 2)])
+
+    def test_record_stats(self):
+        user_id = self.db.add_user("alice")
+        self.assertEqual(self.db.get_record_stats(user_id)["count"], 0)
+
+        self.db.import_records([
+            ("alice", 60, 1.75, "2024-01-05 08:00:00"),
+            ("alice", 70, 1.75, "2024-01-20 08:00:00"),
+            ("alice", 80, 1.75, "2024-02-03 08:00:00"),
+        ])
+        record_id = self.db.add_record(user_id, 90, 1.75, 90 / 1.75 ** 2)
+
+        bmis = [bmi for _, _, bmi, _ in self.db.get_records(user_id)]
+        stats = self.db.get_record_stats(user_id)
+        self.assertEqual(stats["count"], 4)
+        self.assertAlmostEqual(stats["avg"], sum(bmis) / 4)
+        self.assertEqual(stats["min"], min(bmis))
+        self.assertEqual(stats["max"], max(bmis))
+
+        # Removing the current maximum forces a lazy refresh
+        self.db.get_connection().execute("DELETE FROM records WHERE id = ?", (record_id,))
+        stats = self.db.get_record_stats(user_id)
+        self.assertEqual(stats["count"], 3)
+        self.assertEqual(stats["max"], max(bmis[:3]))
+
+        self.assertEqual(self.db.get_bmi_percentiles(user_id, (0, 50, 100)), {0: bmis[0], 50: bmis[1], 100: bmis[2]})
+        months = self.db.get_monthly_stats(user_id)
+        self.assertEqual([(month, count) for month, count, *_ in months], [("2024-01", 2), ("2024-02", 1)])
+
+        self.db.delete_records(user_id)
+        self.assertEqual(self.db.get_record_stats(user_id)["count"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import math
+import unittest
+from array import array
+
+from bmi_calculator.logic import BMILogic, CATEGORIES, INVALID_CATEGORY, load_numpy
+
+
+class TestBMILogic(unittest.TestCase):
+    def setUp(self):
+        self.weights = [50, 70, 85, 110, 60, 18.5]
+        self.heights = [1.80, 1.75, 1.75, 1.70, 0, 1.0]
+
+    def test_scalar_categories(self):
+        self.assertEqual(BMILogic.get_category(18.4), "Underweight")
+        self.assertEqual(BMILogic.get_category(18.5), "Normal weight")
+        self.assertEqual(BMILogic.get_category(25), "Overweight")
+        self.assertEqual(BMILogic.get_category(30), "Obese")
+
+    def test_scalar_invalid_height(self):
+        with self.assertRaises(ValueError):
+            BMILogic.calculate_bmi(70, 0)
+
+    def check_batch(self, bmis, codes, errors):
+        self.assertEqual(list(errors), [4])
+        self.assertIsInstance(errors[4], ValueError)
+        self.assertTrue(math.isnan(bmis[4]))
+        self.assertEqual(codes[4], INVALID_CATEGORY)
+
+        for i, (weight, height) in enumerate(zip(self.weights, self.heights)):
+            if i in errors:
+                continue
+            bmi = BMILogic.calculate_bmi(weight, height)
+            self.assertAlmostEqual(bmis[i], bmi)
+            self.assertEqual(CATEGORIES[codes[i]], BMILogic.get_category(bmi))
+
+    def test_batch_python(self):
+        self.check_batch(*BMILogic._calculate_bmi_batch_python(array("d", self.weights), array("d", self.heights)))
+
+    @unittest.skipIf(load_numpy() is None, "numpy not installed")
+    def test_batch_numpy(self):
+        np = load_numpy()
+        self.check_batch(*BMILogic._calculate_bmi_batch_numpy(np.array(self.weights), np.array(self.heights)))
+
+    def test_batch_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            BMILogic.calculate_bmi_batch([70, 80], [1.75])
+
+    def test_category_names(self):
+        _, codes, _ = BMILogic.calculate_bmi_batch(self.weights, self.heights)
+        names = BMILogic.get_category_names(codes)
+        self.assertEqual(names[0], "Underweight")
+        self.assertIsNone(names[4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Build time, index size and lookup latency of the breached-password index for
+a synthetic wordlist, plus the cost of rejecting breached passwords in
+generate_many.
+
+Usage: python bench_breach.py [entries] [lookups]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import breach
+from generator import PasswordGenerator
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wordlist = os.path.join(tmp, "list.txt")
+        index_path = os.path.join(tmp, "list.idx")
+        with open(wordlist, "w") as f:
+            f.writelines(f"pass{i}word\n" for i in range(entries))
+
+        start = time.perf_counter()
+        breach.build_index(wordlist, index_path)
+        build_seconds = time.perf_counter() - start
+
+        with breach.BreachIndex(index_path) as index:
+            hits = [f"pass{i * 7919 % entries}word" for i in range(lookups // 2)]
+            misses = [f"miss{i}word" for i in range(lookups // 2)]
+            start = time.perf_counter()
+            found = sum(1 for p in hits if p in index) + sum(1 for p in misses if p in index)
+            lookup_seconds = time.perf_counter() - start
+            assert found == len(hits)
+
+            generator = PasswordGenerator()
+            start = time.perf_counter()
+            for _ in generator.generate_many(lookups):
+                pass
+            plain = time.perf_counter() - start
+            generator.breach_index = index
+            start = time.perf_counter()
+            for _ in generator.generate_many(lookups):
+                pass
+            checked = time.perf_counter() - start
+
+        print(f"entries:          {entries:,}")
+        print(f"build:            {build_seconds:.2f} s")
+        print(f"index size:       {os.path.getsize(index_path) / 2**20:.1f} MiB "
+              f"(wordlist {os.path.getsize(wordlist) / 2**20:.1f} MiB)")
+        print(f"lookup:           {lookup_seconds / lookups * 1e6:.2f} us ({lookups / lookup_seconds:,.0f}/s)")
+        print(f"generate_many:    {lookups / plain:10,.0f} passwords/s")
+        print(f"  with index:     {lookups / checked:10,.0f} passwords/s")
+
+
+if __name__ == "__main__":
+    main()
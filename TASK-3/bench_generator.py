@@ -0,0 +1,127 @@
+"""
+Throughput of PasswordGenerator.generate in a loop (with options, and with a
+precompiled policy) against the bulk generate_many stream, plus six-word
+passphrases and the two strength checks.
+
+Rates can be saved as a baseline and later runs compared against it; the
+comparison exits with status 1 when any rate falls more than --tolerance
+below its baseline, so a faster implementation can be shown not to regress
+the others. The statistical tests in test_statistics.py check that it stays
+unbiased.
+
+Usage: python bench_generator.py [count] [length] [--save FILE | --compare FILE]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+from generator import PasswordGenerator
+
+BASELINE_FILE = "bench_baseline.json"
+
+
+def rate(func, count):
+    start = time.perf_counter()
+    func(count)
+    return count / (time.perf_counter() - start)
+
+
+def measure(count, length):
+    """Returns {benchmark name: operations per second}."""
+    generator = PasswordGenerator()
+    sample = list(generator.generate_many(1000, length))
+
+    def loop(n):
+        for _ in range(n):
+            generator.generate(length)
+
+    def loop_policy(n):
+        policy = generator.policy(length)
+        for _ in range(n):
+            generator.generate(policy=policy)
+
+    def bulk(n):
+        for _ in generator.generate_many(n, length):
+            pass
+
+    def phrases(n):
+        for _ in generator.generate_passphrases(n):
+            pass
+
+    def check(n):
+        for i in range(n):
+            generator.check_strength(sample[i % 1000])
+
+    def estimate(n):
+        for i in range(n):
+            generator.estimate_strength(sample[i % 1000])
+
+    return {
+        "generate": rate(loop, count),
+        "generate_policy": rate(loop_policy, count),
+        "generate_many": rate(bulk, count),
+        "generate_passphrases": rate(phrases, count // 4),
+        "check_strength": rate(check, count),
+        "estimate_strength": rate(estimate, count // 4),
+    }
+
+
+def compare(rates, baseline, tolerance):
+    """Prints each rate against its baseline; returns the names that regressed."""
+    regressed = []
+    for name, value in rates.items():
+        if name not in baseline:
+            continue
+        change = value / baseline[name] - 1
+        flag = ""
+        if change < -tolerance:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"  {name:22} {baseline[name]:12,.0f} -> {value:12,.0f} ({change:+.0%}){flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark password generation.")
+    parser.add_argument("count", type=int, nargs="?", default=200_000)
+    parser.add_argument("length", type=int, nargs="?", default=12)
+    parser.add_argument("--save", metavar="FILE", help="record the rates as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help=f"compare with a baseline (e.g. {BASELINE_FILE})")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    rates = measure(args.count, args.length)
+    print(f"passwords:       {args.count:,} x {args.length} chars")
+    print(f"generate loop:   {rates['generate']:10,.0f} passwords/s")
+    print(f"generate+policy: {rates['generate_policy']:10,.0f} passwords/s")
+    print(f"generate_many:   {rates['generate_many']:10,.0f} passwords/s")
+    print(f"speedup:         {rates['generate_many'] / rates['generate']:.1f}x")
+    print(f"passphrases:     {rates['generate_passphrases']:10,.0f} passphrases/s")
+    print(f"check_strength:  {rates['check_strength']:10,.0f} checks/s")
+    print(f"estimate:        {rates['estimate_strength']:10,.0f} reports/s")
+
+    if args.save:
+        record = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "count": args.count,
+            "length": args.length,
+            "rates": {name: round(value) for name, value in rates.items()},
+        }
+        with open(args.save, "w") as f:
+            json.dump(record, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"against {args.compare} (python {baseline['python']}, {baseline['machine']}):")
+        if compare(rates, baseline["rates"], args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
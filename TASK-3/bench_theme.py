@@ -0,0 +1,61 @@
+"""
+Theme toggle latency in the password generator: the stylesheet set on the
+main window against ThemeManager setting it once on the QApplication (what
+the GUI does), plus the cost of re-applying the active theme.
+
+Usage: python bench_theme.py [toggles] [--offscreen]
+"""
+import os
+import statistics
+import sys
+import time
+
+if "--offscreen" in sys.argv:
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    sys.argv.remove("--offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from gui import PasswordGeneratorApp
+from history import PasswordHistory
+from theme import ThemeManager
+
+
+def median_ms(app, toggles, toggle):
+    samples = []
+    for i in range(toggles):
+        start = time.perf_counter()
+        toggle(i)
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    toggles = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    app = QApplication(sys.argv)
+    # In-memory history, so the benchmark never touches the user's file
+    window = PasswordGeneratorApp(history=PasswordHistory())
+    window.show()
+    app.processEvents()
+
+    # The window starts styled through the application; measure it on its own first
+    app.setStyleSheet("")
+    window.theme_manager.current = None
+
+    def window_level(i):
+        window.setStyleSheet(ThemeManager.THEMES["dark" if i % 2 else "light"])
+
+    print(f"toggles:               {toggles}")
+    print(f"window stylesheet:     {median_ms(app, toggles, window_level):7.2f} ms")
+    window.setStyleSheet("")
+    app.processEvents()
+    print(f"application (toggle):  {median_ms(app, toggles, lambda i: window.toggle_theme()):7.2f} ms")
+    name = window.theme_manager.current
+    print(f"re-apply same theme:   {median_ms(app, toggles, lambda i: window.theme_manager.apply(name)):7.3f} ms")
+
+    window.close()
+
+
+if __name__ == "__main__":
+    main()
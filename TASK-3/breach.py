@@ -0,0 +1,225 @@
+"""
+Offline breached-password lookup.
+
+A wordlist of leaked passwords (one per line, or SHA-1 hex digests as in the
+"Have I Been Pwned" downloads) is turned into a compact index file: the first
+8 bytes of each password's SHA-1, sorted and deduplicated, preceded by a
+fan-out table of where every 16-bit prefix starts. The index is memory-mapped,
+so lists of hundreds of millions of entries are never loaded into RAM and a
+lookup is a handful of page reads.
+
+Usage:
+    python breach.py build rockyou.txt breach.idx
+    python breach.py build pwned-passwords-sha1.txt breach.idx --hashed
+    python breach.py check breach.idx password123 "correct horse"
+"""
+import argparse
+import hashlib
+import heapq
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+
+MAGIC = b"PWBRIDX1"
+KEY_SIZE = 8
+# Keys with the same first PREFIX_BITS bits sit between two fan-out entries
+PREFIX_BITS = 16
+FANOUT_ENTRIES = (1 << PREFIX_BITS) + 1
+
+_HEADER = struct.Struct(">8sQ")  # magic, key count
+_FANOUT = struct.Struct(f">{FANOUT_ENTRIES}Q")
+KEYS_OFFSET = _HEADER.size + _FANOUT.size
+
+# Keys sorted in memory per run while building
+DEFAULT_RUN_SIZE = 2_000_000
+# Bytes read or written at a time from run files and the index
+_IO_BLOCK = 1 << 20
+_SHA1_HEX = re.compile(rb"[0-9A-Fa-f]{40}")
+
+
+def hash_key(password):
+    """Returns the index key for a password (str or bytes)."""
+    if isinstance(password, str):
+        password = password.encode("utf-8")
+    return hashlib.sha1(password).digest()[:KEY_SIZE]
+
+
+def _line_keys(lines, hashed):
+    for line in lines:
+        line = line.rstrip(b"\r\n")
+        if not line:
+            continue
+        if hashed:
+            # "SHA1HEX" or "SHA1HEX:count"; anything else would yield a short key
+            # and shift every record written after it
+            digest = line.split(b":", 1)[0].strip()
+            if _SHA1_HEX.fullmatch(digest):
+                yield bytes.fromhex(digest.decode("ascii"))[:KEY_SIZE]
+        else:
+            yield hashlib.sha1(line).digest()[:KEY_SIZE]
+
+
+def _write_run(keys, directory):
+    keys.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        f.write(b"".join(keys))
+    return path
+
+
+def _read_run(path):
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_IO_BLOCK)
+            if not block:
+                return
+            for i in range(0, len(block), KEY_SIZE):
+                yield block[i:i + KEY_SIZE]
+
+
+def build_index(wordlist_path, index_path, hashed=False, run_size=DEFAULT_RUN_SIZE):
+    """
+    Builds an index file from a wordlist and returns the number of distinct keys.
+
+    The wordlist is read as bytes, so lists in any encoding work; lookups
+    encode passwords as UTF-8. Keys are sorted in runs of run_size and the
+    runs are merged from temporary files, so memory use does not grow with
+    the size of the list. With hashed, lines that are not a 40-digit hex
+    SHA-1 digest (optionally followed by ":count") are skipped.
+    """
+    index_dir = os.path.dirname(os.path.abspath(index_path))
+    runs = []
+    try:
+        with open(wordlist_path, "rb") as wordlist:
+            keys = []
+            for key in _line_keys(wordlist, hashed):
+                keys.append(key)
+                if len(keys) >= run_size:
+                    runs.append(_write_run(keys, index_dir))
+                    keys = []
+            if keys or not runs:
+                runs.append(_write_run(keys, index_dir))
+
+        fanout = [0] * FANOUT_ENTRIES
+        count = 0
+        previous = None
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "wb") as out:
+            out.write(bytes(KEYS_OFFSET))  # header and fan-out are filled in last
+            pending = []
+            for key in heapq.merge(*(_read_run(path) for path in runs)):
+                if key == previous:
+                    continue
+                previous = key
+                fanout[(key[0] << 8 | key[1]) + 1] += 1
+                pending.append(key)
+                count += 1
+                if len(pending) >= _IO_BLOCK // KEY_SIZE:
+                    out.write(b"".join(pending))
+                    pending = []
+            out.write(b"".join(pending))
+
+            for i in range(1, FANOUT_ENTRIES):
+                fanout[i] += fanout[i - 1]
+            out.seek(0)
+            out.write(_HEADER.pack(MAGIC, count))
+            out.write(_FANOUT.pack(*fanout))
+        os.replace(tmp_path, index_path)
+    finally:
+        for path in runs:
+            os.remove(path)
+    return count
+
+
+class BreachIndex:
+    """
+    Read-only, memory-mapped view of an index built by build_index.
+
+    `password in index` hashes the password and binary-searches the keys
+    sharing its 16-bit prefix. With 8-byte keys a false positive needs a
+    64-bit collision, so for any realistic list it does not happen.
+
+    Raises:
+        ValueError: If the file is not a valid index
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < KEYS_OFFSET:
+                raise ValueError(f"{path} is not a breached-password index.")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or len(self._mm) != KEYS_OFFSET + self._count * KEY_SIZE:
+            self._mm.close()
+            raise ValueError(f"{path} is not a breached-password index.")
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, password):
+        return self.contains_key(hash_key(password))
+
+    def contains_key(self, key):
+        mm = self._mm
+        prefix = key[0] << 8 | key[1]
+        lo, hi = struct.unpack_from(">QQ", mm, _HEADER.size + prefix * 8)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = KEYS_OFFSET + mid * KEY_SIZE
+            candidate = mm[offset:offset + KEY_SIZE]
+            if candidate < key:
+                lo = mid + 1
+            elif candidate > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def find(self, passwords):
+        """Yields the passwords of an iterable that are in the index."""
+        for password in passwords:
+            if self.contains_key(hash_key(password)):
+                yield password
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query an offline breached-password index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="build an index from a wordlist")
+    build.add_argument("wordlist")
+    build.add_argument("index")
+    build.add_argument("--hashed", action="store_true", help="lines are SHA-1 hex digests (optionally ':count')")
+    check = commands.add_parser("check", help="look passwords up in an index")
+    check.add_argument("index")
+    check.add_argument("passwords", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        count = build_index(args.wordlist, args.index, hashed=args.hashed)
+        print(f"{count:,} distinct entries written to {args.index}", file=sys.stderr)
+        return 0
+
+    with BreachIndex(args.index) as index:
+        found = False
+        for password in args.passwords:
+            breached = password in index
+            found = found or breached
+            print(f"{password}: {'BREACHED' if breached else 'not found'}")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
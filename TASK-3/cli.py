@@ -0,0 +1,190 @@
+"""
+Headless password generation for bulk jobs.
+
+Generates N passwords with the same options as PasswordGenerator.generate
+(or passphrases and template passwords), spreading the work over a pool of
+processes. Output is streamed one chunk at a time to a file or stdout, so
+memory stays bounded no matter how large N is. Throughput and per-worker
+statistics are printed to stderr.
+
+Usage:
+    python cli.py -n 10000000 --length 16 --exclude "l1O0" -o passwords.txt
+    python cli.py -n 100000 --passphrase --words 5 --capitalize -o phrases.txt
+    python cli.py -n 1000000 --template "Cvccvc-99-!!" -o pronounceable.txt
+    python cli.py -n 1000 --template pin
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from breach import BreachIndex
+from generator import TEMPLATE_PRESETS, PasswordGenerator
+from passphrase import DEFAULT_WORDLIST
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Per-process state, set up once by _init_worker
+_generator = None
+_policy = None
+
+
+def _make_policy(generator, options):
+    """Compiles options; a "words" key selects passphrase mode and a "template" key template mode."""
+    if "words" in options:
+        return generator.passphrase_policy(**options)
+    if "template" in options:
+        return generator.template_policy(**options)
+    return generator.policy(**options)
+
+
+def _init_worker(options, breach_path=None):
+    global _generator, _policy
+    # Each worker maps the index itself; the pages are shared through the OS cache
+    _generator = PasswordGenerator(BreachIndex(breach_path) if breach_path else None)
+    _policy = _make_policy(_generator, options)
+
+
+def _generate_chunk(count):
+    start = time.perf_counter()
+    text = "\n".join(_generator.generate_many(count, policy=_policy))
+    return os.getpid(), count, time.perf_counter() - start, text + "\n"
+
+
+def _chunk_sizes(total, chunk_size):
+    full, rest = divmod(total, chunk_size)
+    for _ in range(full):
+        yield chunk_size
+    if rest:
+        yield rest
+
+
+def run(count, options, out, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, breach_path=None):
+    """
+    Generates count passwords into the text stream out, skipping any found
+    in the breach index at breach_path. options are keyword arguments for
+    PasswordGenerator.policy, or for passphrase_policy or template_policy
+    when they include "words" or "template".
+
+    At most 2 * workers chunks are in flight at a time, which bounds memory
+    use. Returns a dict of per-worker stats keyed by pid:
+    {"chunks", "passwords", "seconds"}.
+
+    Raises:
+        OSError: If the wordlist or breach index cannot be read
+        ValueError: If the options cannot produce a password or breach_path
+            is not a valid index
+    """
+    # Validate in the parent so bad options fail before any process starts
+    _make_policy(PasswordGenerator(), options)
+    if breach_path:
+        BreachIndex(breach_path).close()
+
+    workers = workers or os.cpu_count() or 1
+    stats = defaultdict(lambda: {"chunks": 0, "passwords": 0, "seconds": 0.0})
+    sizes = _chunk_sizes(count, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(options, breach_path)) as pool:
+        pending = set()
+        for size in sizes:
+            pending.add(pool.submit(_generate_chunk, size))
+            if len(pending) >= 2 * workers:
+                break
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pid, generated, seconds, text = future.result()
+                out.write(text)
+                worker = stats[pid]
+                worker["chunks"] += 1
+                worker["passwords"] += generated
+                worker["seconds"] += seconds
+
+                size = next(sizes, None)
+                if size is not None:
+                    pending.add(pool.submit(_generate_chunk, size))
+
+    return dict(stats)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate passwords in bulk without the GUI.")
+    parser.add_argument("-n", "--count", type=int, default=1, help="number of passwords (default: 1)")
+    parser.add_argument("-l", "--length", type=int, default=12, help="password length (default: 12)")
+    parser.add_argument("--no-upper", action="store_true", help="exclude uppercase letters")
+    parser.add_argument("--no-lower", action="store_true", help="exclude lowercase letters")
+    parser.add_argument("--no-digits", action="store_true", help="exclude digits")
+    parser.add_argument("--no-symbols", action="store_true", help="exclude symbols")
+    parser.add_argument("-x", "--exclude", default="", help="characters to exclude")
+    parser.add_argument("-p", "--passphrase", action="store_true", help="generate passphrases instead of passwords")
+    parser.add_argument("--words", type=int, default=6, help="words per passphrase (default: 6)")
+    parser.add_argument("--separator", default="-", help="passphrase word separator (default: -)")
+    parser.add_argument("--capitalize", action="store_true", help="capitalise passphrase words")
+    parser.add_argument("--add-digits", type=int, default=0, help="random digits appended to passphrase words")
+    parser.add_argument("--wordlist", default=DEFAULT_WORDLIST, help="passphrase wordlist (default: EFF large list)")
+    parser.add_argument("-t", "--template", help='follow a template such as "Cvccvc-99-!!" or a preset name: '
+                        + ", ".join(TEMPLATE_PRESETS) + " (see generator.py)")
+    parser.add_argument("-b", "--breach-index", help="skip passwords found in this index (see breach.py)")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"passwords per worker task (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not print statistics")
+    args = parser.parse_args(argv)
+    if args.count < 0:
+        parser.error("--count must not be negative")
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.passphrase:
+        options = {
+            "words": args.words,
+            "separator": args.separator,
+            "capitalize": args.capitalize,
+            "digits": args.add_digits,
+            "wordlist": args.wordlist,
+        }
+    elif args.template is not None:
+        options = {"template": args.template, "exclude_chars": args.exclude}
+    else:
+        options = {
+            "length": args.length,
+            "use_upper": not args.no_upper,
+            "use_lower": not args.no_lower,
+            "use_digits": not args.no_digits,
+            "use_symbols": not args.no_symbols,
+            "exclude_chars": args.exclude,
+        }
+
+    out = open(args.output, "w", encoding="utf-8", buffering=1 << 20) if args.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        stats = run(args.count, options, out, workers=args.workers, chunk_size=args.chunk_size,
+                    breach_path=args.breach_index)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        rate = args.count / elapsed if elapsed > 0 else 0.0
+        print(f"{args.count:,} passwords in {elapsed:.2f}s ({rate:,.0f}/s) using {len(stats)} workers", file=sys.stderr)
+        for pid, worker in sorted(stats.items()):
+            worker_rate = worker["passwords"] / worker["seconds"] if worker["seconds"] > 0 else 0.0
+            print(f"  worker {pid}: {worker['chunks']} chunks, {worker['passwords']:,} passwords, "
+                  f"{worker['seconds']:.2f}s busy ({worker_rate:,.0f}/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,315 @@
+import functools
+import math
+import re
 import secrets
 import string
+from dataclasses import dataclass, field
+
+import strength
+from passphrase import DEFAULT_WORDLIST, PassphrasePolicy
+
+# Random bytes drawn per refill by the bulk generator
+ENTROPY_BLOCK_SIZE = 64 * 1024
+# Distinct option sets whose compiled policies are kept
+POLICY_CACHE_SIZE = 128
+# Consecutive breached draws after which generation gives up
+MAX_BREACH_RETRIES = 100
+# Passwords expanded together by the bulk template generator
+TEMPLATE_BATCH_SIZE = 4096
+
+# Template characters that stand for a random character of a class; any
+# other character is literal, "\x" escapes x and "{n}" repeats the
+# previous token n times. Each class is a subset of one of the
+# (uppercase, lowercase, digits, symbols) charsets, or of all of them.
+VOWELS = "aeiou"
+TEMPLATE_CLASSES = {
+    "C": ("consonants", 0),
+    "c": ("consonants", 1),
+    "V": ("vowels", 0),
+    "v": ("vowels", 1),
+    "A": ("letters", 0),
+    "a": ("letters", 1),
+    "9": ("digits", 2),
+    "!": ("symbols", 3),
+    "*": ("any", None),
+}
+TEMPLATE_PRESETS = {
+    "pronounceable": "Cvccvc-99-!!",
+    "syllables": "Cvcvcvcvc99",
+    "pin": "9{6}",
+}
+_TEMPLATE_TOKEN = re.compile(r"\\(.)|(.)(?:\{(\d+)\})?", re.DOTALL)
+
+BREACHED_LABEL = "Breached"
+BREACHED_COLOR = "#ff4d4d"  # Red
+
+_system_random = secrets.SystemRandom()
+
+
+def _translate_tables(pool):
+    """
+    Returns (table, reject) for bytes.translate: byte b maps to
+    pool[b % len(pool)], and bytes at or above the largest multiple of
+    len(pool) are deleted (rejection sampling), so every character of the
+    pool is equally likely.
+    """
+    size = len(pool)
+    limit = 256 - 256 % size
+    return bytes(ord(pool[b % size]) for b in range(256)), bytes(range(limit, 256))
+
+
+class _CharStream:
+    """Uniform characters from a pool, drawn from the OS CSPRNG in large blocks."""
+
+    def __init__(self, tables, block_size=ENTROPY_BLOCK_SIZE):
+        self._table, self._reject = tables
+        self._block_size = block_size
+        self._buffer = ""
+        self._pos = 0
+
+    def take(self, count):
+        end = self._pos + count
+        while end > len(self._buffer):
+            block = secrets.token_bytes(self._block_size)
+            self._buffer = self._buffer[self._pos:] + block.translate(self._table, self._reject).decode("ascii")
+            self._pos = 0
+            end = count
+        chunk = self._buffer[self._pos:end]
+        self._pos = end
+        return chunk
+
+
+class _IndexStream:
+    """Uniform integers below a bound, using buffered random bytes when the bound fits in a byte."""
+
+    def __init__(self, block_size=ENTROPY_BLOCK_SIZE):
+        self._block_size = block_size
+        self._buffer = b""
+        self._pos = 0
+
+    def below(self, n):
+        if n > 256:
+            return secrets.randbelow(n)
+        limit = 256 - 256 % n
+        while True:
+            if self._pos >= len(self._buffer):
+                self._buffer = secrets.token_bytes(self._block_size)
+                self._pos = 0
+            b = self._buffer[self._pos]
+            self._pos += 1
+            if b < limit:
+                return b % n
+
+
+@dataclass(frozen=True)
+class PasswordPolicy:
+    """
+    Immutable, hashable compiled form of a set of generation options.
+
+    The filtered class pools, the combined pool and the rejection-sampling
+    translate tables are computed once in __post_init__, so generating with a
+    policy does no per-call setup. Build policies through
+    PasswordGenerator.policy(), which caches them.
+
+    Raises:
+        ValueError: If the options cannot produce a password
+    """
+
+    length: int = 12
+    use_upper: bool = True
+    use_lower: bool = True
+    use_digits: bool = True
+    use_symbols: bool = True
+    exclude_chars: str = ""
+    # (uppercase, lowercase, digits, symbols)
+    charsets: tuple = (string.ascii_uppercase, string.ascii_lowercase, string.digits, "!@#$%^&*()_+-=[]{}|;:,.<>?")
+
+    pools: tuple = field(init=False, repr=False, compare=False)
+    combined: str = field(init=False, repr=False, compare=False)
+    class_table: dict = field(init=False, repr=False, compare=False)
+    pool_tables: tuple = field(init=False, repr=False, compare=False)
+    combined_tables: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        selected = (self.use_upper, self.use_lower, self.use_digits, self.use_symbols)
+        if not any(selected):
+            raise ValueError("Select at least one character type.")
+
+        # Calculate minimum required length
+        min_length = sum(selected)
+        if self.length < min_length:
+            raise ValueError(f"Password length must be at least {min_length} for selected character types.")
+
+        errors = (
+            "No uppercase characters available.",
+            "No lowercase characters available.",
+            "No digits available.",
+            "No symbols available.",
+        )
+        pools = []
+        for use, charset, error in zip(selected, self.charsets, errors):
+            if not use:
+                continue
+            pool = "".join([c for c in charset if c not in self.exclude_chars])
+            if not pool:
+                raise ValueError(error)
+            pools.append(pool)
+
+        combined = "".join(pools)
+        set_field = functools.partial(object.__setattr__, self)
+        set_field("pools", tuple(pools))
+        set_field("combined", combined)
+        set_field("class_table", strength.build_class_table(*self.charsets))
+        set_field("pool_tables", tuple(_translate_tables(pool) for pool in pools))
+        set_field("combined_tables", _translate_tables(combined))
+
+    @property
+    def entropy_bits(self):
+        """Upper bound on the entropy of a generated password."""
+        return self.length * math.log2(len(self.combined))
+
+
+@functools.lru_cache(maxsize=POLICY_CACHE_SIZE)
+def _compile_policy(length, use_upper, use_lower, use_digits, use_symbols, exclude_chars, charsets):
+    return PasswordPolicy(length, use_upper, use_lower, use_digits, use_symbols, exclude_chars, charsets)
+
+
+def _parse_template(template):
+    """
+    Splits a template into ("class", char) and ("literal", char) tokens.
+
+    Raises:
+        ValueError: If the template is empty or malformed
+    """
+    tokens = []
+    pos = 0
+    while pos < len(template):
+        match = _TEMPLATE_TOKEN.match(template, pos)
+        if match.group(1) is not None:
+            tokens.append(("literal", match.group(1)))
+        else:
+            char, repeat = match.group(2), match.group(3)
+            if char == "\\":
+                raise ValueError("Template ends with an unfinished escape.")
+            if char in "{}":
+                raise ValueError(f"Unexpected '{char}' in template; escape it as '\\{char}'.")
+            kind = "class" if char in TEMPLATE_CLASSES else "literal"
+            tokens.extend([(kind, char)] * (1 if repeat is None else int(repeat)))
+        pos = match.end()
+    if not tokens:
+        raise ValueError("Template is empty.")
+    return tokens
+
+
+def _class_pool(char, charsets):
+    name, index = TEMPLATE_CLASSES[char]
+    if name == "any":
+        return "".join(charsets)
+    charset = charsets[index]
+    if name == "consonants":
+        return "".join(c for c in charset if c.lower() not in VOWELS)
+    if name == "vowels":
+        return "".join(c for c in charset if c.lower() in VOWELS)
+    return charset
+
+
+@dataclass(frozen=True)
+class TemplatePolicy:
+    """
+    A template compiled once into pool references.
+
+    Each distinct class in the template becomes one filtered pool with its
+    rejection-sampling translate tables. layout lists, for every position of
+    the password, either (pool index, occurrence of that pool) or
+    (None, literal text), so expansion is table-driven and never re-parses
+    the template. Build it through PasswordGenerator.template_policy(),
+    which caches it.
+
+    Raises:
+        ValueError: If the template is malformed, one of its literals is
+            excluded or a class it uses has no characters left after exclusion
+    """
+
+    template: str
+    exclude_chars: str = ""
+    charsets: tuple = (string.ascii_uppercase, string.ascii_lowercase, string.digits, "!@#$%^&*()_+-=[]{}|;:,.<>?")
+
+    pools: tuple = field(init=False, repr=False, compare=False)
+    pool_tables: tuple = field(init=False, repr=False, compare=False)
+    pool_counts: tuple = field(init=False, repr=False, compare=False)
+    layout: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        pool_ids = {}  # template class char -> pool index
+        pools, counts, layout = [], [], []
+        for kind, char in _parse_template(self.template):
+            if kind == "literal":
+                if char in self.exclude_chars:
+                    raise ValueError(f"Literal '{char}' in the template is excluded.")
+                layout.append((None, char))
+                continue
+            if char not in pool_ids:
+                pool = "".join([c for c in _class_pool(char, self.charsets) if c not in self.exclude_chars])
+                if not pool:
+                    raise ValueError(f"No characters available for '{char}' in the template.")
+                pool_ids[char] = len(pools)
+                pools.append(pool)
+                counts.append(0)
+            index = pool_ids[char]
+            layout.append((index, counts[index]))
+            counts[index] += 1
+
+        set_field = functools.partial(object.__setattr__, self)
+        set_field("pools", tuple(pools))
+        set_field("pool_tables", tuple(_translate_tables(pool) for pool in pools))
+        set_field("pool_counts", tuple(counts))
+        set_field("layout", tuple(layout))
+
+    @property
+    def length(self):
+        return len(self.layout)
+
+    @property
+    def entropy_bits(self):
+        """Entropy of a generated password; literals add none."""
+        return sum(count * math.log2(len(pool)) for pool, count in zip(self.pools, self.pool_counts))
+
+
+@functools.lru_cache(maxsize=POLICY_CACHE_SIZE)
+def _compile_template(template, exclude_chars, charsets):
+    return TemplatePolicy(template, exclude_chars, charsets)
+
 
 class PasswordGenerator:
-    def __init__(self):
+    def __init__(self, breach_index=None):
+        """
+        Args:
+            breach_index: Optional breach.BreachIndex of leaked passwords;
+                generated passwords found in it are redrawn, and
+                check_strength flags them as breached
+        """
+        self.breach_index = breach_index
         self.uppercase = string.ascii_uppercase
         self.lowercase = string.ascii_lowercase
         self.digits = string.digits
         self.symbols = "!@#$%^&*()_+-=[]{}|;:,.<>?"
 
-    def generate(self, length=12, use_upper=True, use_lower=True, use_digits=True, use_symbols=True, exclude_chars=""):
+    def policy(self, length=12, use_upper=True, use_lower=True, use_digits=True, use_symbols=True, exclude_chars=""):
+        """
+        Returns the compiled PasswordPolicy for these options, reusing a cached
+        one when the same options were seen before.
+
+        Raises:
+            ValueError: If the options cannot produce a password
+        """
+        # Normalise so equivalent options share one cache entry
+        exclude_chars = "".join(sorted(set(exclude_chars)))
+        charsets = (self.uppercase, self.lowercase, self.digits, self.symbols)
+        return _compile_policy(
+            length, bool(use_upper), bool(use_lower), bool(use_digits), bool(use_symbols), exclude_chars, charsets
+        )
+
+    def generate(self, length=12, use_upper=True, use_lower=True, use_digits=True, use_symbols=True, exclude_chars="", policy=None):
         """
         Generates a password based on the specified criteria.
         
@@ -19,76 +320,249 @@ class PasswordGenerator:
             use_digits: Include digits (default: True)
             use_symbols: Include symbols (default: True)
             exclude_chars: Characters to exclude from password (default: "")
+            policy: Precompiled PasswordPolicy; overrides the options above
             
         Returns:
             Generated password string or error message
         """
-        if not any([use_upper, use_lower, use_digits, use_symbols]):
-            return "Error: Select at least one character type."
-        
-        # Calculate minimum required length
-        min_length = sum([use_upper, use_lower, use_digits, use_symbols])
-        if length < min_length:
-            return f"Error: Password length must be at least {min_length} for selected character types."
+        if policy is None:
+            try:
+                policy = self.policy(length, use_upper, use_lower, use_digits, use_symbols, exclude_chars)
+            except ValueError as e:
+                return f"Error: {str(e)}"
 
-        # Filter pools based on exclusion list
-        pool_upper = "".join([c for c in self.uppercase if c not in exclude_chars])
-        pool_lower = "".join([c for c in self.lowercase if c not in exclude_chars])
-        pool_digits = "".join([c for c in self.digits if c not in exclude_chars])
-        pool_symbols = "".join([c for c in self.symbols if c not in exclude_chars])
+        for _ in range(MAX_BREACH_RETRIES):
+            password = self._draw(policy)
+            if not self.is_breached(password):
+                return password
+        return "Error: Every generated password was found in the breach list."
 
-        char_pool = ""
-        password = []
+    def _draw(self, policy):
+        char_pool = policy.combined
 
         # Ensure at least one character from each selected category is included
-        try:
-            if use_upper:
-                if not pool_upper: raise ValueError("No uppercase characters available.")
-                char_pool += pool_upper
-                password.append(secrets.choice(pool_upper))
-            if use_lower:
-                if not pool_lower: raise ValueError("No lowercase characters available.")
-                char_pool += pool_lower
-                password.append(secrets.choice(pool_lower))
-            if use_digits:
-                if not pool_digits: raise ValueError("No digits available.")
-                char_pool += pool_digits
-                password.append(secrets.choice(pool_digits))
-            if use_symbols:
-                if not pool_symbols: raise ValueError("No symbols available.")
-                char_pool += pool_symbols
-                password.append(secrets.choice(pool_symbols))
-        except ValueError as e:
-            return f"Error: {str(e)}"
-
-        if not char_pool:
-            return "Error: No characters available to generate password."
+        password = [secrets.choice(pool) for pool in policy.pools]
 
         # Fill the rest of the password length
-        remaining_length = length - len(password)
+        remaining_length = policy.length - len(password)
         if remaining_length > 0:
             for _ in range(remaining_length):
                 password.append(secrets.choice(char_pool))
 
         # Shuffle the password to avoid predictable patterns
-        secrets.SystemRandom().shuffle(password)
+        _system_random.shuffle(password)
         
         return "".join(password)
 
-    def check_strength(self, password):
+    def generate_many(self, n, length=12, use_upper=True, use_lower=True, use_digits=True, use_symbols=True, exclude_chars="", policy=None, block_size=ENTROPY_BLOCK_SIZE):
+        """
+        Yields n passwords with the same guarantees as generate(): at least one
+        character from every selected class, the rest drawn from all selected
+        classes, in a uniformly random order.
+
+        Randomness is read from the OS in blocks of block_size bytes and mapped
+        to characters with rejection sampling, instead of one secrets.choice
+        call per character.
+
+        Passwords found in the breach index, if any, are skipped. A
+        PassphrasePolicy yields passphrases, as generate_passphrases() does,
+        and a TemplatePolicy expands its template, as generate_from_templates()
+        does.
+
+        Raises:
+            ValueError: If the options cannot produce a password (the same
+                conditions for which generate() returns an error message)
+        """
+        if policy is None:
+            policy = self.policy(length, use_upper, use_lower, use_digits, use_symbols, exclude_chars)
+        elif isinstance(policy, PassphrasePolicy):
+            yield from self.generate_passphrases(n, policy=policy)
+            return
+        elif isinstance(policy, TemplatePolicy):
+            yield from self.generate_from_templates(n, policy=policy, block_size=block_size)
+            return
+
+        required = [_CharStream(tables, block_size) for tables in policy.pool_tables]
+        fill = _CharStream(policy.combined_tables, block_size)
+        positions = _IndexStream(block_size)
+        fill_length = policy.length - len(policy.pools)
+
+        index = self.breach_index
+        produced = rejected = 0
+        while produced < n:
+            password = fill.take(fill_length)
+            # Inserting each required character at a uniform position gives the
+            # same distribution as appending them and shuffling the whole list,
+            # because the fill characters are independent and identically distributed
+            for stream in required:
+                pos = positions.below(len(password) + 1)
+                password = password[:pos] + stream.take(1) + password[pos:]
+            if index is not None and password in index:
+                rejected += 1
+                if rejected >= MAX_BREACH_RETRIES:
+                    raise ValueError("Every generated password was found in the breach list.")
+                continue
+            rejected = 0
+            produced += 1
+            yield password
+
+    def passphrase_policy(self, words=6, separator="-", capitalize=False, digits=0, wordlist=DEFAULT_WORDLIST):
+        """
+        Returns a PassphrasePolicy; the wordlist is loaded on first use only.
+
+        Raises:
+            ValueError: If the options cannot produce a passphrase
+        """
+        return PassphrasePolicy(words, separator, bool(capitalize), digits, wordlist)
+
+    def generate_passphrase(self, words=6, separator="-", capitalize=False, digits=0, wordlist=DEFAULT_WORDLIST, policy=None):
+        """
+        Generates a passphrase of words picked uniformly from the wordlist.
+
+        Args:
+            words: Number of words (default: 6)
+            separator: Text placed between words (default: "-")
+            capitalize: Capitalise every word (default: False)
+            digits: Random digits to append to random words (default: 0)
+            wordlist: Path of the wordlist (default: the bundled EFF list)
+            policy: Precompiled PassphrasePolicy; overrides the options above
+
+        Returns:
+            Generated passphrase or error message
+        """
+        try:
+            return next(self.generate_passphrases(1, words, separator, capitalize, digits, wordlist, policy))
+        except (OSError, ValueError) as e:
+            return f"Error: {str(e)}"
+
+    def generate_passphrases(self, n, words=6, separator="-", capitalize=False, digits=0, wordlist=DEFAULT_WORDLIST, policy=None):
+        """
+        Yields n passphrases. Passphrases found in the breach index are skipped.
+
+        Raises:
+            OSError: If the wordlist cannot be read
+            ValueError: If the options cannot produce a passphrase
+        """
+        if policy is None:
+            policy = self.passphrase_policy(words, separator, capitalize, digits, wordlist)
+
+        source = policy.word_source
+        size = len(source)
+        randbelow = secrets.randbelow
+        produced = rejected = 0
+        while produced < n:
+            picked = [source[randbelow(size)] for _ in range(policy.words)]
+            if policy.capitalize:
+                picked = [word[:1].upper() + word[1:] for word in picked]
+            for _ in range(policy.digits):
+                i = randbelow(policy.words)
+                picked[i] += str(randbelow(10))
+            passphrase = policy.separator.join(picked)
+
+            if self.is_breached(passphrase):
+                rejected += 1
+                if rejected >= MAX_BREACH_RETRIES:
+                    raise ValueError("Every generated passphrase was found in the breach list.")
+                continue
+            rejected = 0
+            produced += 1
+            yield passphrase
+
+    def template_policy(self, template, exclude_chars=""):
+        """
+        Returns the compiled TemplatePolicy for a template, reusing a cached
+        one when the same template and exclusions were seen before.
+
+        Template syntax: C/c consonant, V/v vowel, A/a letter (upper/lower),
+        9 digit, ! symbol, * any character; "{n}" repeats the previous token,
+        "\\" escapes the next character and anything else is literal. For
+        example "Cvccvc-99-!!" or "A{3}9{4}". A name from TEMPLATE_PRESETS,
+        such as "pronounceable", stands for its template.
+
+        Raises:
+            ValueError: If the template cannot produce a password
+        """
+        template = TEMPLATE_PRESETS.get(template, template)
+        exclude_chars = "".join(sorted(set(exclude_chars)))
+        charsets = (self.uppercase, self.lowercase, self.digits, self.symbols)
+        return _compile_template(template, exclude_chars, charsets)
+
+    def generate_from_template(self, template="Cvccvc-99-!!", exclude_chars="", policy=None):
+        """
+        Generates a password following a template (see template_policy).
+
+        Returns:
+            Generated password string or error message
+        """
+        try:
+            return next(self.generate_from_templates(1, template, exclude_chars, policy, block_size=256))
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+    def generate_from_templates(self, n, template="Cvccvc-99-!!", exclude_chars="", policy=None, block_size=ENTROPY_BLOCK_SIZE):
+        """
+        Yields n passwords following a template. Breached ones are skipped.
+
+        Passwords are expanded TEMPLATE_BATCH_SIZE at a time: every pool
+        draws the characters for all its slots in the batch from one
+        block-buffered stream, each slot's column is a strided slice of
+        that, and the columns are zipped into passwords.
+
+        Raises:
+            ValueError: If the template cannot produce a password
+        """
+        if policy is None:
+            policy = self.template_policy(template, exclude_chars)
+
+        streams = [_CharStream(tables, block_size) for tables in policy.pool_tables]
+        index = self.breach_index
+        produced = rejected = 0
+        while produced < n:
+            batch = min(n - produced, TEMPLATE_BATCH_SIZE)
+            drawn = [stream.take(batch * count) for stream, count in zip(streams, policy.pool_counts)]
+            columns = [
+                literal * batch if pool is None else drawn[pool][literal::policy.pool_counts[pool]]
+                for pool, literal in policy.layout
+            ]
+            for password in map("".join, zip(*columns)):
+                if index is not None and password in index:
+                    rejected += 1
+                    if rejected >= MAX_BREACH_RETRIES:
+                        raise ValueError("Every generated password was found in the breach list.")
+                    continue
+                rejected = 0
+                produced += 1
+                yield password
+
+    def check_strength(self, password, policy=None):
         """
         Returns a strength score (0-4) and a label.
+
+        The character classes come from policy when given (or the default
+        policy) and are detected in a single pass over the password.
+        Passphrase and template policies have no character classes, so their
+        passwords get the label and color of estimate_strength() instead.
+        Passwords in the breach index are labelled "Breached".
         """
+        if self.is_breached(password):
+            return BREACHED_LABEL, BREACHED_COLOR
+        if policy is None:
+            policy = self.policy()
+        elif not isinstance(policy, PasswordPolicy):
+            report = self.estimate_strength(password, policy)
+            return report.label, report.color
+        present = set(password.translate(policy.class_table))
+
         score = 0
         if len(password) >= 8:
             score += 1
-        if any(c in self.uppercase for c in password):
+        if "U" in present:
             score += 1
-        if any(c in self.lowercase for c in password):
+        if "L" in present:
             score += 1
-        if any(c in self.digits for c in password):
+        if "D" in present:
             score += 1
-        if any(c in self.symbols for c in password):
+        if "S" in present:
             score += 1
             
         # Adjust for length
@@ -102,3 +576,32 @@ class PasswordGenerator:
             return "Medium", "#ffa64d" # Orange
         else:
             return "Strong", "#4dff88" # Green
+
+    def estimate_strength(self, password, policy=None):
+        """
+        Returns a strength.StrengthReport with charset and Shannon entropy,
+        detected sequences, repeats and keyboard walks, and an entropy-based
+        label and color. Breached passwords get zero entropy and the
+        "Breached" label.
+
+        With the policy (password, passphrase or template) the password was
+        generated from, the entropy is capped at what that policy can produce.
+        """
+        report = strength.estimate(password, None if policy is None else policy.entropy_bits)
+        if self.is_breached(password):
+            report = report._replace(entropy_bits=0.0, label=BREACHED_LABEL, color=BREACHED_COLOR)
+        return report
+
+    def estimate_strength_many(self, passwords, policy=None):
+        """Yields a StrengthReport for every password in an iterable (for audits)."""
+        for password in passwords:
+            yield self.estimate_strength(password, policy)
+
+    def is_breached(self, password):
+        return self.breach_index is not None and password in self.breach_index
+
+    def find_breached(self, passwords):
+        """Yields the passwords of an iterable that appear in the breach index."""
+        if self.breach_index is None:
+            return iter(())
+        return self.breach_index.find(passwords)
@@ -1,27 +1,36 @@
+import functools
 import sys
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QLabel, QPushButton, QCheckBox, QSlider, QSpinBox, 
-    QFrame, QApplication, QLineEdit, QListWidget, QListWidgetItem
+    QFrame, QApplication, QLineEdit, QListWidget, QListWidgetItem, QComboBox
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QClipboard, QIcon
 import pyperclip
-from generator import PasswordGenerator
-from styles import MINIMALIST_THEME, DARK_THEME
+from generator import TEMPLATE_PRESETS, PasswordGenerator
+from history import DEFAULT_PATH, PasswordHistory
+from preview import PreviewWorker
+from theme import ThemeManager
 
 class PasswordGeneratorApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, history=None):
         super().__init__()
         self.generator = PasswordGenerator()
         self.dark_mode = False
-        self.password_history = []  # Store copied passwords
+        # Styles the whole application, so dialogs and popups follow the theme too
+        self.theme_manager = ThemeManager(QApplication.instance())
+        # Copied passwords, persisted encrypted between sessions
+        self.password_history = history if history is not None else PasswordHistory(DEFAULT_PATH)
+        # Regenerates in the background as the settings change
+        self.preview = PreviewWorker(self.build_preview_job, parent=self)
+        self.preview.ready.connect(self.show_result)
         self.init_ui()
 
     def init_ui(self):
         self.setWindowTitle("Password Generator")
         self.setGeometry(100, 100, 600, 850)
-        self.setStyleSheet(MINIMALIST_THEME)
+        self.theme_manager.apply("light")
 
         # Main Layout
         main_widget = QWidget()
@@ -135,6 +144,74 @@ class PasswordGeneratorApp(QMainWindow):
         exclusion_layout.addWidget(self.exclusion_input)
         controls_layout.addLayout(exclusion_layout)
 
+        # Template Presets
+        template_layout = QHBoxLayout()
+        template_label = QLabel("Template:")
+        self.template_combo = QComboBox()
+        self.template_combo.addItem("None", None)
+        for name, template in TEMPLATE_PRESETS.items():
+            self.template_combo.addItem(f"{name} ({template})", name)
+        self.template_combo.setToolTip("Follow a preset template instead of the length and character options")
+        self.template_combo.currentIndexChanged.connect(self.update_mode)
+
+        template_layout.addWidget(template_label)
+        template_layout.addWidget(self.template_combo)
+        controls_layout.addLayout(template_layout)
+
+        # Passphrase Mode
+        self.check_passphrase = QCheckBox("Passphrase (random words)")
+        self.check_passphrase.setToolTip("Generate a passphrase of random words instead of characters")
+        self.check_passphrase.toggled.connect(self.update_mode)
+        controls_layout.addWidget(self.check_passphrase)
+
+        passphrase_layout = QHBoxLayout()
+        words_label = QLabel("Words:")
+        self.words_spinbox = QSpinBox()
+        self.words_spinbox.setRange(3, 12)
+        self.words_spinbox.setValue(6)
+        self.words_spinbox.setToolTip("Number of words in the passphrase")
+
+        separator_label = QLabel("Separator:")
+        self.separator_input = QLineEdit("-")
+        self.separator_input.setMaxLength(3)
+        self.separator_input.setFixedWidth(50)
+        self.separator_input.setToolTip("Text placed between words")
+
+        self.check_capitalize = QCheckBox("Capitalize")
+        self.check_capitalize.setToolTip("Capitalize every word")
+        self.check_add_digit = QCheckBox("Add digit")
+        self.check_add_digit.setToolTip("Append a random digit to a random word")
+
+        passphrase_layout.addWidget(words_label)
+        passphrase_layout.addWidget(self.words_spinbox)
+        passphrase_layout.addWidget(separator_label)
+        passphrase_layout.addWidget(self.separator_input)
+        passphrase_layout.addWidget(self.check_capitalize)
+        passphrase_layout.addWidget(self.check_add_digit)
+        controls_layout.addLayout(passphrase_layout)
+
+        self.password_controls = [
+            self.length_slider, self.length_spinbox, self.check_upper, self.check_lower,
+            self.check_digits, self.check_symbols,
+        ]
+        self.passphrase_controls = [
+            self.words_spinbox, self.separator_input, self.check_capitalize, self.check_add_digit,
+        ]
+        self.update_mode()
+
+        # Live preview: every settings change schedules a debounced regeneration.
+        # The length spinbox is kept in sync with the slider, so only the slider is watched.
+        self.length_slider.valueChanged.connect(self.schedule_preview)
+        self.words_spinbox.valueChanged.connect(self.schedule_preview)
+        self.exclusion_input.textChanged.connect(self.schedule_preview)
+        self.separator_input.textChanged.connect(self.schedule_preview)
+        self.template_combo.currentIndexChanged.connect(self.schedule_preview)
+        for checkbox in (
+            self.check_upper, self.check_lower, self.check_digits, self.check_symbols,
+            self.check_passphrase, self.check_capitalize, self.check_add_digit,
+        ):
+            checkbox.toggled.connect(self.schedule_preview)
+
         # Buttons
         buttons_layout = QHBoxLayout()
         buttons_layout.setSpacing(15)
@@ -182,65 +259,129 @@ class PasswordGeneratorApp(QMainWindow):
         self.history_list.setMaximumHeight(150)
         self.history_list.setToolTip("Click on a password to copy it again")
         self.history_list.itemClicked.connect(self.copy_from_history)
+        for password, timestamp in self.password_history.entries():
+            self.history_list.addItem(self.make_history_item(password, timestamp))
         layout.addWidget(self.history_list)
         # Removed addStretch since we want the card to be compact
         
         # Initial Generation
         self.generate_password()
 
-    def generate_password(self):
-        length = self.length_spinbox.value()
-        use_upper = self.check_upper.isChecked()
-        use_lower = self.check_lower.isChecked()
-        use_digits = self.check_digits.isChecked()
-        use_symbols = self.check_symbols.isChecked()
-        exclude_chars = self.exclusion_input.text()
-
-        password = self.generator.generate(length, use_upper, use_lower, use_digits, use_symbols, exclude_chars)
+    def update_mode(self, *_):
+        # A passphrase ignores the template; a template ignores the length and character options
+        passphrase = self.check_passphrase.isChecked()
+        template = self.template_combo.currentData() is not None
+        for widget in self.password_controls:
+            widget.setEnabled(not passphrase and not template)
+        for widget in self.passphrase_controls:
+            widget.setEnabled(passphrase)
+        self.template_combo.setEnabled(not passphrase)
+        self.exclusion_input.setEnabled(not passphrase)
+
+    def read_options(self):
+        """Snapshot of the generation settings; widgets are read on the GUI thread only."""
+        if self.check_passphrase.isChecked():
+            return (
+                "passphrase",
+                self.words_spinbox.value(),
+                self.separator_input.text(),
+                self.check_capitalize.isChecked(),
+                1 if self.check_add_digit.isChecked() else 0,
+            )
+        if self.template_combo.currentData() is not None:
+            return ("template", self.template_combo.currentData(), self.exclusion_input.text())
+        return (
+            "password",
+            self.length_spinbox.value(),
+            self.check_upper.isChecked(),
+            self.check_lower.isChecked(),
+            self.check_digits.isChecked(),
+            self.check_symbols.isChecked(),
+            self.exclusion_input.text(),
+        )
+
+    def build_result(self, options):
+        """
+        Generates a password and rates it. Touches no widgets, so it can run
+        on the preview worker thread. Returns (password, strength text, color).
+        """
+        mode, *args = options
+        if mode == "passphrase":
+            try:
+                policy = self.generator.passphrase_policy(*args)
+            except (OSError, ValueError) as e:
+                return f"Error: {str(e)}", "Error", "#ff4d4d"
+            password = self.generator.generate_passphrase(policy=policy)
+            if password.startswith("Error:"):
+                return password, "Error", "#ff4d4d"
+            # Passphrases are rated by the entropy of the word choice, not their characters
+            report = self.generator.estimate_strength(password, policy)
+            return password, f"Strength: {report.label} (~{report.entropy_bits:.0f} bits)", report.color
+
+        if mode == "template":
+            try:
+                policy = self.generator.template_policy(*args)
+            except ValueError as e:
+                return f"Error: {str(e)}", "Error", "#ff4d4d"
+            password = self.generator.generate_from_template(policy=policy)
+            if password.startswith("Error:"):
+                return password, "Error", "#ff4d4d"
+            # Literals add nothing to guess, so templates are rated by the policy's entropy
+            report = self.generator.estimate_strength(password, policy)
+            return password, f"Strength: {report.label} (~{report.entropy_bits:.0f} bits)", report.color
+
+        password = self.generator.generate(*args)
+        if password.startswith("Error:"):
+            return password, "Error", "#ff4d4d"
+        strength, color = self.generator.check_strength(password)
+        return password, f"Strength: {strength}", color
+
+    def show_result(self, result):
+        password, strength_text, color = result
         self.password_display.setText(password)
+        self.strength_label.setText(strength_text)
+        self.strength_label.setStyleSheet(f"color: {color}; font-weight: bold;")
 
-        # Update Strength
-        if "Error" not in password:
-            strength, color = self.generator.check_strength(password)
-            self.strength_label.setText(f"Strength: {strength}")
-            self.strength_label.setStyleSheet(f"color: {color}; font-weight: bold;")
-        else:
-            self.strength_label.setText("Error")
-            self.strength_label.setStyleSheet("color: #ff4d4d; font-weight: bold;")
+    def build_preview_job(self):
+        return functools.partial(self.build_result, self.read_options())
+
+    def schedule_preview(self, *_):
+        self.preview.request()
+
+    def generate_password(self):
+        # An explicit request wins over any preview still in flight
+        self.preview.cancel()
+        self.show_result(self.build_result(self.read_options()))
 
     def copy_to_clipboard(self):
         password = self.password_display.text()
-        if "Error" not in password and password != "Click Generate":
+        if not password.startswith("Error:") and password != "Click Generate":
             pyperclip.copy(password)
             
             # Add to history
             from datetime import datetime
             timestamp = datetime.now().strftime("%H:%M:%S")
-            history_entry = f"{password} ({timestamp})"
             
-            # Avoid duplicates
-            if password not in [entry.split(" (")[0] for entry in self.password_history]:
-                self.password_history.insert(0, history_entry)
-                # Keep only last 10
-                if len(self.password_history) > 10:
-                    self.password_history.pop()
-                self.update_history_display()
+            # Duplicates are ignored; evicted entries are always the bottom rows
+            evicted = self.password_history.add(password, timestamp)
+            if evicted is not None:
+                self.history_list.insertItem(0, self.make_history_item(password, timestamp))
+                for _ in evicted:
+                    self.history_list.takeItem(self.history_list.count() - 1)
             
             original_text = self.copy_btn.text()
             self.copy_btn.setText("Copied!")
             from PyQt6.QtCore import QTimer
             QTimer.singleShot(2000, lambda: self.copy_btn.setText("Copy to Clipboard"))
 
-    def update_history_display(self):
-        self.history_list.clear()
-        for entry in self.password_history:
-            item = QListWidgetItem(entry)
-            item.setToolTip("Click to copy this password")
-            self.history_list.addItem(item)
+    def make_history_item(self, password, timestamp):
+        item = QListWidgetItem(f"{password} ({timestamp})")
+        item.setData(Qt.ItemDataRole.UserRole, password)
+        item.setToolTip("Click to copy this password")
+        return item
     
     def copy_from_history(self, item):
-        # Extract password from "password (timestamp)" format
-        password = item.text().split(" (")[0]
+        password = item.data(Qt.ItemDataRole.UserRole)
         pyperclip.copy(password)
         self.copy_btn.setText("Copied!")
         from PyQt6.QtCore import QTimer
@@ -253,8 +394,13 @@ class PasswordGeneratorApp(QMainWindow):
     def toggle_theme(self):
         self.dark_mode = not self.dark_mode
         if self.dark_mode:
-            self.setStyleSheet(DARK_THEME)
+            self.theme_manager.apply("dark")
             self.theme_toggle_btn.setText("☀️ Light")
         else:
-            self.setStyleSheet(MINIMALIST_THEME)
+            self.theme_manager.apply("light")
             self.theme_toggle_btn.setText("🌙 Dark")
+
+    def closeEvent(self, event):
+        self.preview.cancel()
+        self.preview.wait_for_done()
+        super().closeEvent(event)
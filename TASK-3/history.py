@@ -0,0 +1,132 @@
+"""
+Persistent history of copied passwords.
+
+Entries are kept in an OrderedDict keyed by password, so duplicates are
+detected and the oldest entry is evicted in O(1). The history is saved to a
+file encrypted with Fernet (AES-128-CBC with an HMAC-SHA256 tag) under a
+random key stored in a separate, owner-only key file. Without the
+cryptography package, or with path=None, the history is kept in memory only.
+
+Threat model: the key file sits next to the history (path + ".key" by
+default) and both are readable by the owner only, so the encryption does
+not protect against anyone who can read the owner's files; file
+permissions are what does. It keeps the passwords out of backups, sync
+folders, indexers and copies that take the history file alone, and the
+HMAC detects tampering. Pass key_path on another volume (or a removable
+drive) to separate the two. A missing or corrupt key is replaced and the
+history starts afresh, the same as with an unreadable history file.
+"""
+import json
+import os
+import time
+from collections import OrderedDict
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # Persistence is optional
+    Fernet = None
+
+DEFAULT_LIMIT = 10
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".password_generator", "history.enc")
+
+
+def _write_private(path, data):
+    """Atomically replaces path with data, readable by the owner only."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class PasswordHistory:
+    """
+    Bounded, de-duplicated history of (password, timestamp) entries.
+
+    Args:
+        path: Encrypted history file, or None to keep the history in memory
+        limit: Maximum number of entries; the oldest are evicted first
+        key_path: Key file (default: path + ".key"), created on first use
+
+    Raises:
+        ValueError: If limit is less than 1
+    """
+
+    def __init__(self, path=None, limit=DEFAULT_LIMIT, key_path=None):
+        if limit < 1:
+            raise ValueError("History limit must be at least 1.")
+        self.limit = limit
+        self.path = path if Fernet is not None else None
+        self.key_path = key_path or (f"{path}.key" if path else None)
+        self._entries = OrderedDict()  # password -> timestamp, oldest first
+        self._fernet = None
+        if self.path:
+            self._fernet = self._load_key()
+            self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, password):
+        return password in self._entries
+
+    def entries(self):
+        """Returns (password, timestamp) pairs, newest first."""
+        return list(reversed(self._entries.items()))
+
+    def add(self, password, timestamp=None):
+        """
+        Records password unless it is already in the history.
+
+        Returns None for a duplicate, otherwise the list of evicted
+        passwords, oldest first, so a view can update incrementally.
+        """
+        if password in self._entries:
+            return None
+        self._entries[password] = timestamp or time.strftime("%H:%M:%S")
+        evicted = []
+        while len(self._entries) > self.limit:
+            evicted.append(self._entries.popitem(last=False)[0])
+        self.save()
+        return evicted
+
+    def clear(self):
+        self._entries.clear()
+        self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        data = json.dumps(list(self._entries.items())).encode("utf-8")
+        _write_private(self.path, self._fernet.encrypt(data))
+
+    def _load_key(self):
+        """Returns a Fernet for the key file, writing a new key if it is missing or corrupt."""
+        try:
+            with open(self.key_path, "rb") as f:
+                return Fernet(f.read().strip())
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            # A history encrypted under the old key is ignored by _load
+            print(f"Replacing unreadable password history key: {self.key_path}")
+        key = Fernet.generate_key()
+        _write_private(self.key_path, key)
+        return Fernet(key)
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                token = f.read()
+        except FileNotFoundError:
+            return
+        try:
+            entries = json.loads(self._fernet.decrypt(token))
+        except (InvalidToken, ValueError):
+            # Unreadable with this key: start afresh; the next save replaces it
+            print(f"Ignoring unreadable password history: {self.path}")
+            return
+        # Trim to the current limit if it was lowered since the last save
+        for password, timestamp in entries[-self.limit:]:
+            self._entries[password] = timestamp
@@ -0,0 +1,112 @@
+"""
+Diceware-style passphrases.
+
+A wordlist is memory-mapped once and indexed by a compact array of word
+offsets, so picking a word is an O(1) slice with no file I/O per call, even
+for lists with millions of entries. The bundled list is the EFF large
+wordlist (CC BY 3.0, eff.org/dice). Words containing "-" are skipped when a
+list is loaded, so passphrases joined with the default "-" separator split
+back into their words; that leaves 7772 of the EFF list's 7776 words, still
+~12.9 bits per word.
+"""
+import functools
+import math
+import mmap
+import os
+import re
+from array import array
+from dataclasses import dataclass, field
+
+DEFAULT_WORDLIST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "eff_large_wordlist.txt")
+# Word lists kept mapped at once
+WORDLIST_CACHE_SIZE = 8
+
+# One word per line, optionally preceded by its dice roll ("11111<TAB>abacus")
+_WORD_LINE = re.compile(rb"^[ \t]*(?:[1-6]+[ \t]+)?(\S[^\r\n]*?)[ \t]*\r?$", re.MULTILINE)
+
+
+class WordList:
+    """
+    Read-only sequence of the words in a wordlist file.
+
+    The file is mapped into memory and only the start and end offsets of
+    each word are kept, as 4 bytes each (8 for files over 4 GiB). The list
+    should not contain duplicates, or those words would be picked more often.
+
+    Raises:
+        ValueError: If the file contains no words
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                raise ValueError(f"Wordlist {path} contains no words.")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        offsets = array("I" if size < 1 << 32 else "Q")
+        for match in _WORD_LINE.finditer(self._mm):
+            if b"-" in match.group(1):
+                continue  # "t-shirt" would make "-"-separated phrases ambiguous
+            offsets.append(match.start(1))
+            offsets.append(match.end(1))
+        if not offsets:
+            self._mm.close()
+            raise ValueError(f"Wordlist {path} contains no words.")
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) // 2
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        start = self._offsets[2 * i]
+        return self._mm[start:self._offsets[2 * i + 1]].decode("utf-8")
+
+    def close(self):
+        self._mm.close()
+
+
+@functools.lru_cache(maxsize=WORDLIST_CACHE_SIZE)
+def load_wordlist(path=DEFAULT_WORDLIST):
+    """Returns the WordList for path, loading it only the first time."""
+    return WordList(path)
+
+
+@dataclass(frozen=True)
+class PassphrasePolicy:
+    """
+    Immutable passphrase options, with the wordlist resolved once.
+
+    Args:
+        words: Number of words
+        separator: Text placed between words
+        capitalize: Capitalise the first letter of every word
+        digits: Number of random digits, each appended to a random word
+        wordlist: Path of the wordlist file
+
+    Raises:
+        ValueError: If the options cannot produce a passphrase
+    """
+
+    words: int = 6
+    separator: str = "-"
+    capitalize: bool = False
+    digits: int = 0
+    wordlist: str = DEFAULT_WORDLIST
+
+    word_source: WordList = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.words < 1:
+            raise ValueError("A passphrase needs at least one word.")
+        if self.digits < 0:
+            raise ValueError("The number of digits cannot be negative.")
+        object.__setattr__(self, "word_source", load_wordlist(self.wordlist))
+
+    @property
+    def entropy_bits(self):
+        """Upper bound on the entropy of a generated passphrase."""
+        return self.words * math.log2(len(self.word_source)) + self.digits * math.log2(10 * self.words)
@@ -0,0 +1,109 @@
+import itertools
+import time
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+# Quiet time after the last change before a preview is generated
+DEBOUNCE_MS = 120
+# Longest a continuous stream of changes (a slider drag) delays a preview
+MAX_WAIT_MS = 300
+
+
+class _JobSignals(QObject):
+    finished = pyqtSignal(int, object)  # token, result
+    failed = pyqtSignal(int, object)  # token, exception
+
+
+class _PreviewJob(QRunnable):
+    def __init__(self, token, job):
+        super().__init__()
+        self.token = token
+        self.job = job
+        self.signals = _JobSignals()
+        # Kept by the worker so a queued job can be taken back out of the pool
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            result = self.job()
+        except Exception as e:
+            self.signals.failed.emit(self.token, e)
+        else:
+            self.signals.finished.emit(self.token, result)
+
+
+class PreviewWorker(QObject):
+    """
+    Debounced, coalescing background generation for live previews.
+
+    request() may be called on every slider tick or keystroke. Calls within
+    delay_ms of each other are coalesced into one job, but a continuous
+    stream of calls still produces a preview every max_wait_ms. build_job is
+    called on the GUI thread when the job is dispatched, so it can read the
+    widgets, and must return a callable that is safe to run on the worker
+    thread. Only the result of the newest job is emitted through `ready`;
+    queued jobs are dropped when superseded, and results of stale ones
+    that were already running are ignored.
+    """
+
+    ready = pyqtSignal(object)
+
+    def __init__(self, build_job, delay_ms=DEBOUNCE_MS, max_wait_ms=MAX_WAIT_MS, parent=None):
+        super().__init__(parent)
+        self.build_job = build_job
+        self.delay_ms = delay_ms
+        self.max_wait_ms = max_wait_ms
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._dispatch)
+        self._pending_since = 0.0
+        self._tokens = itertools.count()
+        self._latest = None
+        self._jobs = {}  # token -> _PreviewJob
+
+    def request(self):
+        now = time.monotonic()
+        if not self._timer.isActive():
+            self._pending_since = now
+        elif (now - self._pending_since) * 1000 >= self.max_wait_ms:
+            return  # Let the timer fire; the job will see the latest state
+        self._timer.start(self.delay_ms)
+
+    def cancel(self):
+        """Drop the pending request and any queued or running job."""
+        self._timer.stop()
+        self._latest = None
+        for token, job in list(self._jobs.items()):
+            if self.pool.tryTake(job):
+                del self._jobs[token]
+
+    def is_pending(self):
+        return self._timer.isActive() or self._latest is not None
+
+    def wait_for_done(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+
+    def _dispatch(self):
+        self.cancel()
+        token = next(self._tokens)
+        job = _PreviewJob(token, self.build_job())
+        job.signals.finished.connect(self._on_finished)
+        job.signals.failed.connect(self._on_failed)
+        self._jobs[token] = job
+        self._latest = token
+        self.pool.start(job)
+
+    def _on_finished(self, token, result):
+        self._jobs.pop(token, None)
+        if token != self._latest:
+            return  # Superseded while running
+        self._latest = None
+        self.ready.emit(result)
+
+    def _on_failed(self, token, error):
+        self._jobs.pop(token, None)
+        if token == self._latest:
+            self._latest = None
+            print(f"Preview error: {error}")
@@ -0,0 +1,181 @@
+"""
+Entropy-based password strength estimation.
+
+Characters are classified in a single pass with a precomputed translate
+table, sequences and keyboard walks are looked up as n-grams in precomputed
+sets, and repeats are found with one precompiled regular expression. estimate_many
+scores large lists of existing passwords for audit jobs.
+"""
+import math
+import re
+import string
+from collections import Counter
+from typing import NamedTuple
+
+# Alphabet size assumed for each character class when computing charset entropy
+CLASS_POOL_SIZES = {
+    "upper": 26,
+    "lower": 26,
+    "digits": 10,
+    "symbols": len(string.punctuation) + 1,  # printable punctuation and space
+    "other": 100,  # anything outside printable ASCII
+}
+CLASS_NAMES = {"U": "upper", "L": "lower", "D": "digits", "S": "symbols", "O": "other"}
+
+# Bits credited to each character that is predictable from a pattern
+PATTERN_CHAR_BITS = 1.0
+
+# Effective entropy thresholds for the labels used by the GUI
+WEAK_BELOW_BITS = 36
+STRONG_FROM_BITS = 60
+
+LABEL_COLORS = {
+    "Weak": "#ff4d4d",  # Red
+    "Medium": "#ffa64d",  # Orange
+    "Strong": "#4dff88",  # Green
+}
+
+KEYBOARD_ROWS = (
+    "`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./",
+    "~!@#$%^&*()_+", "qwertyuiop{}|", 'asdfghjkl:"', "zxcvbnm<>?",
+)
+
+
+class _ClassTable(dict):
+    """str.translate table mapping every character to a one-letter class code."""
+
+    def __missing__(self, key):
+        return "O"
+
+
+def build_class_table(upper, lower, digits, symbols):
+    """
+    Builds a str.translate table that maps characters of the given charsets
+    to "U", "L", "D" and "S" and everything else to "O", so
+    set(password.translate(table)) yields the classes present in one pass.
+    """
+    table = _ClassTable()
+    for code, chars in (("U", upper), ("L", lower), ("D", digits), ("S", symbols)):
+        for c in chars:
+            table[ord(c)] = code
+    return table
+
+
+def _ngrams(sources, n):
+    """All lowercase n-grams of sources, read in either direction."""
+    grams = set()
+    for source in sources:
+        for text in (source, source[::-1]):
+            grams.update(text[i:i + n].lower() for i in range(len(text) - n + 1))
+    return frozenset(grams)
+
+
+CLASS_TABLE = build_class_table(string.ascii_uppercase, string.ascii_lowercase, string.digits, string.punctuation + " ")
+_SEQUENCE_GRAMS = _ngrams((string.ascii_lowercase, string.digits), 3)
+_KEYBOARD_GRAMS = _ngrams(KEYBOARD_ROWS, 4)
+_REPEAT = re.compile(r"(.{1,8}?)\1+", re.DOTALL)
+
+
+class StrengthReport(NamedTuple):
+    length: int
+    classes: frozenset
+    charset_bits: float  # length * log2(alphabet size of the classes present)
+    shannon_bits: float  # length * Shannon entropy of the character frequencies
+    entropy_bits: float  # charset entropy after discounting pattern characters
+    patterns: tuple  # (kind, start, end) spans, end exclusive
+    label: str
+    color: str
+
+
+def classify(password):
+    """Returns the set of class names present in password."""
+    return frozenset(CLASS_NAMES[code] for code in set(password.translate(CLASS_TABLE)))
+
+
+def _ngram_runs(grams, lowered, n):
+    """Finds n-grams of lowered that are in grams, merged into (start, end) runs."""
+    runs = []
+    for start in [i for i in range(len(lowered) - n + 1) if lowered[i:i + n] in grams]:
+        if runs and start <= runs[-1][1] - n + 1:
+            runs[-1][1] = start + n
+        else:
+            runs.append([start, start + n])
+    return runs
+
+
+def _scan(password):
+    """Returns (kind, start, end, repeat_unit_length) for every pattern found."""
+    found = []
+    lowered = password.lower()
+    for start, end in _ngram_runs(_SEQUENCE_GRAMS, lowered, 3):
+        found.append(("sequence", start, end, 0))
+    for start, end in _ngram_runs(_KEYBOARD_GRAMS, lowered, 4):
+        found.append(("keyboard", start, end, 0))
+    for match in _REPEAT.finditer(password):
+        if match.end() - match.start() >= 3:
+            found.append(("repeat", match.start(), match.end(), len(match.group(1))))
+    found.sort(key=lambda p: p[1])
+    return found
+
+
+def find_patterns(password):
+    """Returns (kind, start, end) spans for sequences, keyboard walks and repeats."""
+    return tuple((kind, start, end) for kind, start, end, _ in _scan(password))
+
+
+def _predictable_chars(found):
+    """
+    Counts characters implied by a pattern. The first character of a sequence
+    or keyboard walk, and the first unit of a repeat, stay unpredictable.
+    """
+    covered = set()
+    for kind, start, end, unit in found:
+        first = start + (unit if kind == "repeat" else 1)
+        covered.update(range(first, end))
+    return len(covered)
+
+
+def label_for(bits):
+    if bits < WEAK_BELOW_BITS:
+        return "Weak"
+    elif bits < STRONG_FROM_BITS:
+        return "Medium"
+    return "Strong"
+
+
+def estimate(password, max_bits=None):
+    """
+    Scores one password and returns a StrengthReport.
+
+    max_bits caps the effective entropy when the password is known to come
+    from a smaller space than its characters suggest, such as a passphrase
+    drawn from a wordlist.
+    """
+    length = len(password)
+    codes = set(password.translate(CLASS_TABLE))
+    classes = frozenset(CLASS_NAMES[code] for code in codes)
+    pool = sum(CLASS_POOL_SIZES[name] for name in classes)
+    bits_per_char = math.log2(pool) if pool > 1 else 0.0
+    charset_bits = length * bits_per_char
+
+    # Shannon entropy in bits: length * H = length * log2(length) - sum(c * log2(c))
+    shannon_bits = 0.0
+    if length:
+        shannon_bits = length * math.log2(length) - sum(c * math.log2(c) for c in Counter(password).values())
+
+    found = _scan(password)
+    patterns = tuple((kind, start, end) for kind, start, end, _ in found)
+    predictable = _predictable_chars(found)
+    entropy_bits = (length - predictable) * bits_per_char + predictable * PATTERN_CHAR_BITS
+    entropy_bits = min(entropy_bits, charset_bits)
+    if max_bits is not None:
+        entropy_bits = min(entropy_bits, max_bits)
+
+    label = label_for(entropy_bits)
+    return StrengthReport(length, classes, charset_bits, shannon_bits, entropy_bits, patterns, label, LABEL_COLORS[label])
+
+
+def estimate_many(passwords):
+    """Yields a StrengthReport for every password in an iterable."""
+    for password in passwords:
+        yield estimate(password)
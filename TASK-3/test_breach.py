@@ -0,0 +1,80 @@
+import hashlib
+import itertools
+import os
+import tempfile
+import unittest
+
+import breach
+from generator import PasswordGenerator
+
+
+class TestBreachIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def build(self, lines, hashed=False, run_size=breach.DEFAULT_RUN_SIZE):
+        with open(self.path("list.txt"), "wb") as f:
+            f.write(b"\n".join(lines) + b"\n")
+        count = breach.build_index(self.path("list.txt"), self.path("list.idx"), hashed=hashed, run_size=run_size)
+        index = breach.BreachIndex(self.path("list.idx"))
+        self.addCleanup(index.close)
+        return count, index
+
+    def test_lookup(self):
+        words = [f"word{i}".encode() for i in range(1000)] + [b"password", b"p\xc3\xa4ss", b"password"]
+        count, index = self.build(words, run_size=97)
+        self.assertEqual(count, 1002)
+        self.assertEqual(len(index), 1002)
+        self.assertIn("password", index)
+        self.assertIn("päss", index)
+        self.assertIn("word999", index)
+        self.assertNotIn("word1000", index)
+        self.assertNotIn("", index)
+        self.assertEqual(list(index.find(["word1", "nope", "password"])), ["word1", "password"])
+
+    def test_hashed_list(self):
+        lines = [hashlib.sha1(b"hunter2").hexdigest().upper().encode() + b":17"]
+        _, index = self.build(lines, hashed=True)
+        self.assertIn("hunter2", index)
+        self.assertNotIn("hunter3", index)
+
+    def test_hashed_list_skips_malformed_lines(self):
+        digests = [hashlib.sha1(w).hexdigest().encode() for w in (b"hunter2", b"letmein", b"qwerty")]
+        lines = [digests[0] + b":3", b"ABCDEF:5", b"not hex at all", b"Z" * 40, digests[1], digests[2] + b":1"]
+        count, index = self.build(lines, hashed=True)
+        self.assertEqual(count, 3)
+        for password in ("hunter2", "letmein", "qwerty"):
+            self.assertIn(password, index)
+
+    def test_invalid_file(self):
+        with open(self.path("bad.idx"), "wb") as f:
+            f.write(b"not an index")
+        with self.assertRaises(ValueError):
+            breach.BreachIndex(self.path("bad.idx"))
+
+    def test_generator_rejects_breached(self):
+        # Only 4 passwords are possible; all but "01" are breached
+        candidates = ["".join(p) for p in itertools.product("01", repeat=2)]
+        _, index = self.build([p.encode() for p in candidates if p != "01"])
+        generator = PasswordGenerator(index)
+        options = dict(length=2, use_upper=False, use_lower=False, use_symbols=False, exclude_chars="23456789")
+
+        self.assertEqual(generator.generate(**options), "01")
+        self.assertEqual(set(generator.generate_many(20, **options)), {"01"})
+        self.assertEqual(generator.check_strength("00")[0], "Breached")
+        self.assertEqual(generator.estimate_strength("00").entropy_bits, 0.0)
+        self.assertEqual(list(generator.find_breached(["01", "11"])), ["11"])
+
+        _, index = self.build([p.encode() for p in candidates])
+        generator = PasswordGenerator(index)
+        self.assertIn("Error", generator.generate(**options))
+        with self.assertRaises(ValueError):
+            list(generator.generate_many(1, **options))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import io
+import unittest
+
+import cli
+
+
+class TestCli(unittest.TestCase):
+    def test_run_streams_all_passwords(self):
+        out = io.StringIO()
+        options = {"length": 10, "use_symbols": False, "exclude_chars": "abc"}
+        stats = cli.run(25, options, out, workers=2, chunk_size=7)
+
+        passwords = out.getvalue().splitlines()
+        self.assertEqual(len(passwords), 25)
+        self.assertTrue(all(len(p) == 10 and p.isalnum() for p in passwords))
+        self.assertFalse(set("".join(passwords)) & set("abc"))
+        self.assertEqual(sum(w["passwords"] for w in stats.values()), 25)
+        self.assertEqual(sum(w["chunks"] for w in stats.values()), 4)
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            cli.run(5, {"length": 2}, io.StringIO(), workers=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
-from generator import PasswordGenerator
+from generator import TEMPLATE_PRESETS, PasswordGenerator, PasswordPolicy
+import math
 import string
 
 class TestPasswordGenerator(unittest.TestCase):
@@ -53,5 +54,84 @@ class TestPasswordGenerator(unittest.TestCase):
         self.assertNotIn("1", password)
         self.assertNotIn("!", password)
 
+    def test_generate_many(self):
+        passwords = list(self.generator.generate_many(200, length=8, exclude_chars="A1!"))
+        self.assertEqual(len(passwords), 200)
+        for password in passwords:
+            self.assertEqual(len(password), 8)
+            self.assertTrue(any(c in string.ascii_uppercase for c in password))
+            self.assertTrue(any(c in string.ascii_lowercase for c in password))
+            self.assertTrue(any(c in string.digits for c in password))
+            self.assertTrue(any(c in self.generator.symbols for c in password))
+            self.assertFalse(set(password) & set("A1!"))
+
+    def test_generate_many_errors(self):
+        with self.assertRaises(ValueError):
+            list(self.generator.generate_many(1, use_upper=False, use_lower=False, use_digits=False, use_symbols=False))
+        with self.assertRaises(ValueError):
+            list(self.generator.generate_many(1, length=2))
+        with self.assertRaises(ValueError):
+            list(self.generator.generate_many(1, use_digits=True, exclude_chars=string.digits))
+
+    def test_policy_cached(self):
+        policy = self.generator.policy(length=16, exclude_chars="ba")
+        self.assertIs(policy, self.generator.policy(length=16, exclude_chars="aab"))
+        self.assertEqual(hash(policy), hash(PasswordPolicy(16, exclude_chars="ab")))
+        self.assertNotIn("a", policy.combined)
+        with self.assertRaises(Exception):
+            policy.length = 20
+
+    def test_generate_with_policy(self):
+        policy = self.generator.policy(length=20, use_symbols=False, exclude_chars="xyz")
+        password = self.generator.generate(policy=policy)
+        self.assertEqual(len(password), 20)
+        self.assertFalse(set(password) & set("xyz" + self.generator.symbols))
+        for password in self.generator.generate_many(10, policy=policy):
+            self.assertEqual(len(password), 20)
+        self.assertEqual(self.generator.check_strength(password, policy), self.generator.check_strength(password))
+
+    def test_policy_errors(self):
+        with self.assertRaises(ValueError):
+            self.generator.policy(use_digits=True, exclude_chars=string.digits)
+
+    def test_template(self):
+        password = self.generator.generate_from_template("Cvccvc-99-!!")
+        self.assertEqual(len(password), 12)
+        self.assertEqual(password[6], "-")
+        self.assertTrue(password[0].isupper() and password[0] not in "AEIOU")
+        self.assertIn(password[1], "aeiou")
+        self.assertTrue(password[7:9].isdigit())
+        self.assertTrue(set(password[10:]) <= set(self.generator.symbols))
+
+        policy = self.generator.template_policy("a{3}\\{-\\}*", exclude_chars="xyz")
+        self.assertIs(policy, self.generator.template_policy("a{3}\\{-\\}*", exclude_chars="zyx"))
+        self.assertEqual(policy.length, 7)
+        for password in self.generator.generate_many(300, policy=policy):
+            self.assertEqual(password[3:6], "{-}")
+            self.assertTrue(password[:3].islower())
+            self.assertFalse(set(password) & set("xyz"))
+
+    def test_template_errors(self):
+        for template in ("", "a{", "{3}", "a\\"):
+            self.assertIn("Error", self.generator.generate_from_template(template))
+        with self.assertRaises(ValueError):
+            list(self.generator.generate_from_templates(1, "v", exclude_chars="aeiou"))
+        with self.assertRaises(ValueError):
+            self.generator.template_policy("Cvccvc-99", exclude_chars="-")
+        self.assertIn("Error", self.generator.generate_from_template(r"a\{9", exclude_chars="{"))
+
+    def test_template_presets(self):
+        for name, template in TEMPLATE_PRESETS.items():
+            self.assertIs(self.generator.template_policy(name), self.generator.template_policy(template))
+        self.assertTrue(self.generator.generate_from_template("pin").isdigit())
+
+    def test_template_strength(self):
+        policy = self.generator.template_policy("9{4}")
+        self.assertAlmostEqual(policy.entropy_bits, 4 * math.log2(10))
+        report = self.generator.estimate_strength("8305", policy)
+        self.assertAlmostEqual(report.entropy_bits, policy.entropy_bits)
+        # Template policies have no character classes to count
+        self.assertEqual(self.generator.check_strength("8305", policy), (report.label, report.color))
+
 if __name__ == '__main__':
     unittest.main()
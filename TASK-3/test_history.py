@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+import history
+from history import PasswordHistory
+
+
+class TestPasswordHistory(unittest.TestCase):
+    def test_dedup_and_eviction(self):
+        store = PasswordHistory(limit=3)
+        self.assertEqual(store.add("a", "1"), [])
+        self.assertIsNone(store.add("a", "2"))
+        self.assertEqual(store.add("b", "3"), [])
+        self.assertEqual(store.add("c", "4"), [])
+        self.assertEqual(store.add("d", "5"), ["a"])
+        self.assertEqual(store.entries(), [("d", "5"), ("c", "4"), ("b", "3")])
+        self.assertNotIn("a", store)
+        store.clear()
+        self.assertEqual(len(store), 0)
+        with self.assertRaises(ValueError):
+            PasswordHistory(limit=0)
+
+    @unittest.skipIf(history.Fernet is None, "cryptography is not installed")
+    def test_encrypted_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.enc")
+            store = PasswordHistory(path, limit=5)
+            for i in range(4):
+                store.add(f"secret-{i}", f"12:00:0{i}")
+
+            with open(path, "rb") as f:
+                self.assertNotIn(b"secret", f.read())
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+            self.assertEqual(os.stat(path + ".key").st_mode & 0o777, 0o600)
+
+            self.assertEqual(PasswordHistory(path, limit=5).entries(), store.entries())
+            # A lower limit keeps the newest entries
+            self.assertEqual([p for p, _ in PasswordHistory(path, limit=2).entries()], ["secret-3", "secret-2"])
+
+            # The file cannot be read with another key
+            other = PasswordHistory(path, key_path=os.path.join(tmp, "other.key"))
+            self.assertEqual(len(other), 0)
+
+    @unittest.skipIf(history.Fernet is None, "cryptography is not installed")
+    def test_corrupt_key_starts_afresh(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.enc")
+            PasswordHistory(path).add("secret", "12:00:00")
+            with open(path + ".key", "r+b") as f:
+                f.truncate(10)
+
+            store = PasswordHistory(path)
+            self.assertEqual(len(store), 0)
+            store.add("fresh", "12:00:01")
+            self.assertEqual(PasswordHistory(path).entries(), [("fresh", "12:00:01")])
+
+
+if __name__ == '__main__':
+    unittest.main()
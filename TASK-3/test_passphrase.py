@@ -0,0 +1,69 @@
+import math
+import os
+import tempfile
+import unittest
+
+from generator import PasswordGenerator
+from passphrase import DEFAULT_WORDLIST, WordList, load_wordlist
+
+
+class TestPassphrase(unittest.TestCase):
+    def setUp(self):
+        self.generator = PasswordGenerator()
+
+    def test_default_wordlist(self):
+        words = load_wordlist(DEFAULT_WORDLIST)
+        self.assertIs(words, load_wordlist(DEFAULT_WORDLIST))
+        self.assertEqual(len(words), 7772)
+        self.assertEqual(words[0], "abacus")
+        self.assertEqual(words[-1], "zoom")
+
+    def test_wordlist_formats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "words.txt")
+            with open(path, "wb") as f:
+                f.write(b"11111\tabacus\r\n\n  \n11112 abdomen  \nt-shirt\nzebra\n\xc3\xa9t\xc3\xa9")
+            words = WordList(path)
+            self.assertEqual([words[i] for i in range(len(words))], ["abacus", "abdomen", "zebra", "été"])
+            words.close()
+
+            with open(path, "wb") as f:
+                f.write(b"\n\n")
+            with self.assertRaises(ValueError):
+                WordList(path)
+
+    def test_generate_passphrase(self):
+        words = set(load_wordlist()[i] for i in range(len(load_wordlist())))
+        passphrase = self.generator.generate_passphrase(words=5, separator=".")
+        parts = passphrase.split(".")
+        self.assertEqual(len(parts), 5)
+        self.assertTrue(set(parts) <= words)
+
+        passphrase = self.generator.generate_passphrase(words=4, separator=" ", capitalize=True, digits=3)
+        parts = passphrase.split(" ")
+        self.assertEqual(len(parts), 4)
+        self.assertEqual(sum(c.isdigit() for c in passphrase), 3)
+        self.assertTrue(all(p[0].isupper() and p.rstrip("0123456789").lower() in words for p in parts))
+
+    def test_errors(self):
+        self.assertIn("Error", self.generator.generate_passphrase(words=0))
+        self.assertIn("Error", self.generator.generate_passphrase(wordlist="/nonexistent/words.txt"))
+        with self.assertRaises(ValueError):
+            list(self.generator.generate_passphrases(1, digits=-1))
+
+    def test_batch_and_strength(self):
+        policy = self.generator.passphrase_policy(words=6)
+        self.assertAlmostEqual(policy.entropy_bits, 6 * math.log2(7772))
+        phrases = list(self.generator.generate_many(50, policy=policy))
+        self.assertEqual(len(phrases), 50)
+        # Hyphenated EFF words are skipped, so the default separator splits cleanly
+        self.assertTrue(all(len(p.split("-")) == 6 for p in phrases))
+
+        report = self.generator.estimate_strength(phrases[0], policy)
+        self.assertLessEqual(report.entropy_bits, policy.entropy_bits)
+        self.assertLess(report.entropy_bits, report.charset_bits)
+        self.assertEqual(report.label, "Strong")
+
+
+if __name__ == '__main__':
+    unittest.main()
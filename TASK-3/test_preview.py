@@ -0,0 +1,62 @@
+import time
+import unittest
+
+from PyQt6.QtCore import QCoreApplication
+
+from preview import PreviewWorker
+
+
+class TestPreviewWorker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.state = 0
+        self.built = []
+        self.results = []
+        self.worker = PreviewWorker(self.build_job, delay_ms=20, max_wait_ms=10_000)
+        self.worker.ready.connect(self.results.append)
+
+    def build_job(self):
+        self.built.append(self.state)
+        state = self.state
+        return lambda: state * 2
+
+    def settle(self, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while self.worker.is_pending() and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.002)
+        self.app.processEvents()
+
+    def test_requests_are_coalesced(self):
+        for value in range(50):
+            self.state = value
+            self.worker.request()
+        self.settle()
+        self.assertEqual(self.built, [49])
+        self.assertEqual(self.results, [98])
+
+    def test_max_wait_forces_a_preview(self):
+        self.worker.max_wait_ms = 30
+        deadline = time.monotonic() + 0.3
+        while time.monotonic() < deadline:
+            self.state += 1
+            self.worker.request()
+            self.app.processEvents()
+            time.sleep(0.005)
+        self.settle()
+        self.assertGreater(len(self.results), 1)
+        self.assertEqual(self.results[-1], self.built[-1] * 2)
+
+    def test_cancel_drops_result(self):
+        self.worker.request()
+        self.worker.cancel()
+        self.settle()
+        self.assertEqual(self.results, [])
+        self.assertFalse(self.worker.is_pending())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Statistical tests for the generators: chi-square uniformity of characters
+within each class, independence of character and position, and invariants
+checked over randomly drawn options.
+
+The default sample sizes keep the suite to a few seconds; set
+PASSWORD_STATS_SCALE (e.g. 10) to multiply them for a more sensitive run.
+"""
+import os
+import random
+import secrets
+import statistics
+import string
+import tempfile
+import unittest
+from collections import Counter
+
+from generator import PasswordGenerator
+from passphrase import load_wordlist
+
+SCALE = float(os.environ.get("PASSWORD_STATS_SCALE", "1"))
+# Per-test false-failure rate; small because the suite runs on every change
+ALPHA = 1e-6
+
+
+def chi_square(observed, expected):
+    return sum((o - e) ** 2 / e for o, e in zip(observed, expected))
+
+
+def critical_value(df, alpha=ALPHA):
+    """Upper alpha quantile of chi-square(df), Wilson-Hilferty approximation."""
+    z = statistics.NormalDist().inv_cdf(1 - alpha)
+    return df * (1 - 2 / (9 * df) + z * (2 / (9 * df)) ** 0.5) ** 3
+
+
+def uniformity(counts, symbols):
+    """Returns (statistic, critical value) for counts being uniform over symbols."""
+    total = sum(counts[s] for s in symbols)
+    expected = total / len(symbols)
+    return chi_square([counts[s] for s in symbols], [expected] * len(symbols)), critical_value(len(symbols) - 1)
+
+
+def independence(table):
+    """Returns (statistic, critical value) for row and column independence of a contingency table."""
+    row_totals = [sum(row) for row in table]
+    col_totals = [sum(col) for col in zip(*table)]
+    total = sum(row_totals)
+    observed, expected = [], []
+    for row, row_total in zip(table, row_totals):
+        for count, col_total in zip(row, col_totals):
+            observed.append(count)
+            expected.append(row_total * col_total / total)
+    df = (len(table) - 1) * (len(col_totals) - 1)
+    return chi_square(observed, expected), critical_value(df)
+
+
+class TestGeneratorStatistics(unittest.TestCase):
+    length = 16
+
+    @classmethod
+    def setUpClass(cls):
+        cls.generator = PasswordGenerator()
+        cls.policy = cls.generator.policy(cls.length, exclude_chars="l1O0")
+        count = int(200_000 * SCALE)
+        cls.bulk = "".join(cls.generator.generate_many(count, policy=cls.policy))
+        count = int(20_000 * SCALE)
+        cls.single = "".join(cls.generator.generate(policy=cls.policy) for _ in range(count))
+
+    def assert_uniform_per_class(self, text):
+        counts = Counter(text)
+        for pool in self.policy.pools:
+            statistic, critical = uniformity(counts, pool)
+            self.assertLess(statistic, critical, f"characters of {pool!r} are not uniform")
+
+    def assert_position_independent(self, text):
+        chars = self.policy.combined
+        table = []
+        for position in range(self.length):
+            counts = Counter(text[position::self.length])
+            table.append([counts[c] for c in chars])
+        statistic, critical = independence(table)
+        self.assertLess(statistic, critical, "character distribution depends on position")
+
+    def test_generate_many_uniform_per_class(self):
+        self.assert_uniform_per_class(self.bulk)
+
+    def test_generate_many_position_independent(self):
+        self.assert_position_independent(self.bulk)
+
+    def test_generate_uniform_per_class(self):
+        self.assert_uniform_per_class(self.single)
+
+    def test_generate_position_independent(self):
+        self.assert_position_independent(self.single)
+
+    def test_detects_modulo_bias(self):
+        # A naive byte % len(pool) mapping must fail the same test
+        pool = self.policy.combined
+        biased = "".join(pool[b % len(pool)] for b in secrets.token_bytes(len(self.bulk) // 4))
+        statistic, critical = uniformity(Counter(biased), pool)
+        self.assertGreater(statistic, critical)
+
+
+class TestTemplateStatistics(unittest.TestCase):
+    def test_slots_uniform_and_independent(self):
+        generator = PasswordGenerator()
+        policy = generator.template_policy("cvc9c", exclude_chars="z")
+        text = "".join(generator.generate_from_templates(int(100_000 * SCALE), policy=policy))
+        consonants = policy.pools[0]
+        # The three consonant slots share one stream; each must be uniform and alike
+        table = [[Counter(text[slot::5])[c] for c in consonants] for slot in (0, 2, 4)]
+        statistic, critical = independence(table)
+        self.assertLess(statistic, critical)
+        for slot, pool in ((0, consonants), (1, "aeiou"), (3, "0123456789")):
+            statistic, critical = uniformity(Counter(text[slot::5]), pool)
+            self.assertLess(statistic, critical, f"slot {slot} is not uniform")
+
+
+class TestGeneratorInvariants(unittest.TestCase):
+    def test_random_options(self):
+        generator = PasswordGenerator()
+        classes = (generator.uppercase, generator.lowercase, generator.digits, generator.symbols)
+        rng = random.Random(1234)
+        for _ in range(int(300 * SCALE)):
+            selected = [rng.random() < 0.6 for _ in classes]
+            if not any(selected):
+                selected[rng.randrange(4)] = True
+            length = rng.randint(sum(selected), 40)
+            exclude = "".join(rng.sample(string.printable, rng.randint(0, 12)))
+            options = dict(length=length, use_upper=selected[0], use_lower=selected[1],
+                           use_digits=selected[2], use_symbols=selected[3], exclude_chars=exclude)
+            try:
+                policy = generator.policy(**options)
+            except ValueError:
+                self.assertTrue(generator.generate(**options).startswith("Error:"))
+                continue
+
+            passwords = [generator.generate(**options)] + list(generator.generate_many(20, policy=policy))
+            allowed = set(policy.combined)
+            for password in passwords:
+                self.assertEqual(len(password), length)
+                self.assertFalse(set(password) & set(exclude), options)
+                self.assertTrue(set(password) <= allowed, options)
+                for use, charset in zip(selected, classes):
+                    self.assertEqual(use, bool(set(password) & set(charset)), options)
+
+
+class TestPassphraseStatistics(unittest.TestCase):
+    def test_words_uniform(self):
+        words = [f"word{i}" for i in range(20)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "words.txt")
+            with open(path, "w") as f:
+                f.write("\n".join(words))
+            generator = PasswordGenerator()
+            phrases = generator.generate_passphrases(int(20_000 * SCALE), words=5, separator=" ", wordlist=path)
+            picked = " ".join(phrases).split(" ")
+            # Release the mapped file so the directory can be removed
+            load_wordlist(path).close()
+            load_wordlist.cache_clear()
+
+        statistic, critical = uniformity(Counter(picked), words)
+        self.assertLess(statistic, critical)
+
+        # Each of the 5 slots draws from the same distribution
+        table = [[Counter(picked[slot::5])[w] for w in words] for slot in range(5)]
+        statistic, critical = independence(table)
+        self.assertLess(statistic, critical)
+
+
+if __name__ == '__main__':
+    unittest.main()
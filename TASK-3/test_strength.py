@@ -0,0 +1,43 @@
+import math
+import unittest
+
+import strength
+from generator import PasswordGenerator
+
+
+class TestStrength(unittest.TestCase):
+    def test_classify(self):
+        self.assertEqual(strength.classify("aB3!"), {"upper", "lower", "digits", "symbols"})
+        self.assertEqual(strength.classify("héllo"), {"lower", "other"})
+        self.assertEqual(strength.classify(""), frozenset())
+
+    def test_entropy(self):
+        report = strength.estimate("Xk9#mQ2$vL7@")
+        self.assertAlmostEqual(report.charset_bits, 12 * math.log2(95))
+        self.assertAlmostEqual(report.shannon_bits, 12 * math.log2(12))
+        self.assertEqual(report.patterns, ())
+        self.assertEqual(report.entropy_bits, report.charset_bits)
+        self.assertEqual(report.label, "Strong")
+
+    def test_patterns(self):
+        self.assertEqual(strength.find_patterns("xxabcdxx"), (("sequence", 2, 6),))
+        self.assertEqual(strength.find_patterns("zyxw"), (("sequence", 0, 4),))
+        self.assertEqual(strength.find_patterns("Qwer"), (("keyboard", 0, 4),))
+        self.assertEqual(strength.find_patterns("z!z!z!"), (("repeat", 0, 6),))
+
+    def test_patterns_lower_entropy(self):
+        walk = strength.estimate("qwertyuiop")
+        random_ish = strength.estimate("qpwoeiruty")
+        self.assertLess(walk.entropy_bits, random_ish.entropy_bits)
+        self.assertEqual(walk.label, "Weak")
+        self.assertEqual(strength.estimate("aaaaaaaaaaaaaaaa").label, "Weak")
+
+    def test_estimate_many(self):
+        passwords = list(PasswordGenerator().generate_many(50, length=20))
+        reports = list(strength.estimate_many(passwords))
+        self.assertEqual([r.length for r in reports], [20] * 50)
+        self.assertEqual(reports[0], strength.estimate(passwords[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
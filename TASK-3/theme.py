@@ -0,0 +1,28 @@
+from styles import MINIMALIST_THEME, DARK_THEME
+
+
+class ThemeManager:
+    """
+    Applies the styles.py themes to a target; the GUI passes the QApplication
+    so the stylesheet is set once for every window.
+
+    Setting a stylesheet makes Qt re-parse it and re-polish every affected
+    widget, so apply() does nothing when the requested theme is already active.
+    """
+
+    THEMES = {
+        "light": MINIMALIST_THEME,
+        "dark": DARK_THEME,
+    }
+
+    def __init__(self, target):
+        self.target = target
+        self.current = None
+
+    def apply(self, name):
+        """Apply a theme to the target. Returns False if nothing changed."""
+        if name == self.current:
+            return False
+        self.target.setStyleSheet(self.THEMES[name])
+        self.current = name
+        return True
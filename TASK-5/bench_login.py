@@ -0,0 +1,115 @@
+"""
+Login throughput under concurrent clients.
+
+Starts a server with serve.py on a temporary database, signs up --users
+accounts and has --clients concurrent clients log in for --duration
+seconds, while a probe requests the login page every PROBE_INTERVAL
+seconds. The probe latency shows how far the hashing stalls everything
+else the server does. Runs once with hashing inline (CHAT_HASH_THREADS=0)
+and once on the native thread pool, unless --threads picks one.
+
+Usage: python bench_login.py [--clients 32] [--users 32] [--duration 10] [--threads N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+from loadgen import percentile, start_server, wait_until_up
+
+PASSWORD = "bench-password"
+PROBE_INTERVAL = 0.05
+
+
+async def sign_up(http, url, name):
+    async with http.post(f"{url}/signup", data={"name": name, "password": PASSWORD}) as response:
+        await response.read()
+
+
+async def log_in(http, url, name):
+    """Returns (seconds taken, HTTP status); a good login redirects to the lounge."""
+    start = time.perf_counter()
+    async with http.post(f"{url}/", data={"name": name, "password": PASSWORD}, allow_redirects=False) as response:
+        await response.read()
+        return time.perf_counter() - start, response.status
+
+
+async def login_client(http, url, name, stop, results):
+    while time.monotonic() < stop:
+        results.append(await log_in(http, url, name))
+
+
+async def probe(http, url, stop, latencies):
+    while time.monotonic() < stop:
+        start = time.perf_counter()
+        async with http.get(f"{url}/") as response:
+            await response.read()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(PROBE_INTERVAL)
+
+
+async def measure(url, process, args):
+    names = [f"bench{i}" for i in range(args.users)]
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar()) as http:
+        await wait_until_up(http, url, process)
+        await asyncio.gather(*(sign_up(http, url, name) for name in names))
+        results, probes = [], []
+        stop = time.monotonic() + args.duration
+        start = time.perf_counter()
+        await asyncio.gather(
+            probe(http, url, stop, probes),
+            *(login_client(http, url, names[i % len(names)], stop, results) for i in range(args.clients)),
+        )
+        elapsed = time.perf_counter() - start
+
+    ok = [seconds for seconds, status in results if status == 302]
+    busy = sum(1 for _, status in results if status == 503)
+    return {
+        "logins/s": len(ok) / elapsed,
+        "login p50": percentile(ok, 0.5),
+        "login p99": percentile(ok, 0.99),
+        "refused": busy,
+        "failed": len(results) - len(ok) - busy,
+        "probe p50": percentile(probes, 0.5),
+        "probe p99": percentile(probes, 0.99),
+    }
+
+
+def run(args, threads):
+    os.environ["CHAT_HASH_THREADS"] = str(threads)
+    with tempfile.TemporaryDirectory() as tmp:
+        process, url = start_server(args.async_mode, os.path.join(tmp, "chat.db"))
+        try:
+            return asyncio.run(measure(url, process, args))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark logins under concurrent clients.")
+    parser.add_argument("--async-mode", default="eventlet")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--threads", type=int, help="hashing threads (default: compare 0 and 4)")
+    args = parser.parse_args(argv)
+
+    print(f"{args.clients} clients, {args.users} accounts, {args.duration:g} s, {args.async_mode}")
+    for threads in ([args.threads] if args.threads is not None else [0, 4]):
+        r = run(args, threads)
+        label = "inline" if threads == 0 else f"{threads} threads"
+        print(f"  {label:10} {r['logins/s']:7.1f} logins/s   "
+              f"login p50 {r['login p50'] * 1000:6.0f} ms  p99 {r['login p99'] * 1000:6.0f} ms   "
+              f"probe p50 {r['probe p50'] * 1000:6.1f} ms  p99 {r['probe p99'] * 1000:6.1f} ms   "
+              f"refused {r['refused']}, failed {r['failed']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
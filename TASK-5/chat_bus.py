@@ -0,0 +1,124 @@
+"""
+A minimal TCP message bus for running the chat on several processes.
+
+The broker relays newline-delimited JSON frames: every frame a publisher
+sends is forwarded to all subscribers. BusManager is a python-socketio
+client manager on top of it, so emits, room broadcasts and callbacks reach
+clients connected to any worker, the same way RedisManager does with a
+Redis server. Use it with CHAT_MESSAGE_QUEUE=chatbus://host:port.
+
+Usage:
+    python chat_bus.py [--host 127.0.0.1] [--port 5600]
+"""
+import argparse
+import json
+import socket
+import socketserver
+import threading
+import time
+from urllib.parse import urlparse
+
+from socketio.pubsub_manager import PubSubManager
+
+DEFAULT_PORT = 5600
+RECONNECT_DELAY = 1.0
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        role = self.rfile.readline().strip()
+        if role == b"SUB":
+            with self.server.lock:
+                self.server.subscribers.add(self.wfile)
+            try:
+                self.rfile.read()  # Subscribers send nothing more; wait for them to go away
+            finally:
+                with self.server.lock:
+                    self.server.subscribers.discard(self.wfile)
+        elif role == b"PUB":
+            for frame in self.rfile:
+                self.server.relay(frame)
+
+
+class Broker(socketserver.ThreadingTCPServer):
+    """Relays every frame from a publisher connection to all subscriber connections."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, _BrokerHandler)
+        self.lock = threading.Lock()
+        self.subscribers = set()
+
+    def relay(self, frame):
+        with self.lock:
+            for subscriber in list(self.subscribers):
+                try:
+                    subscriber.write(frame)
+                    subscriber.flush()
+                except OSError:
+                    self.subscribers.discard(subscriber)
+
+
+class BusManager(PubSubManager):
+    """
+    Client manager that shares Socket.IO events between servers through a
+    Broker at url ("chatbus://host:port").
+    """
+
+    name = "chatbus"
+
+    def __init__(self, url=f"chatbus://127.0.0.1:{DEFAULT_PORT}", channel="socketio", write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        parsed = urlparse(url)
+        self.address = (parsed.hostname or "127.0.0.1", parsed.port or DEFAULT_PORT)
+        self._publisher = None
+        self._publish_lock = threading.Lock()
+
+    def _connect(self, role):
+        conn = socket.create_connection(self.address)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn.sendall(role + b"\n")
+        return conn
+
+    def _publish(self, data):
+        frame = (json.dumps({"channel": self.channel, "data": data}) + "\n").encode("utf-8")
+        with self._publish_lock:
+            for retries_left in (1, 0):
+                try:
+                    if self._publisher is None:
+                        self._publisher = self._connect(b"PUB")
+                    self._publisher.sendall(frame)
+                    return
+                except OSError:
+                    self._publisher = None
+                    if not retries_left:
+                        self._get_logger().error("Cannot publish to the chat bus at %s:%s", *self.address)
+
+    def _listen(self):
+        while True:
+            try:
+                with self._connect(b"SUB") as conn, conn.makefile("rb") as frames:
+                    for frame in frames:
+                        message = json.loads(frame)
+                        if message.get("channel") == self.channel:
+                            yield message["data"]
+            except OSError:
+                pass
+            self._get_logger().error("Lost the chat bus at %s:%s, reconnecting", *self.address)
+            time.sleep(RECONNECT_DELAY)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the chat message bus broker.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    with Broker((args.host, args.port)) as broker:
+        print(f"Chat bus listening on {args.host}:{args.port}")
+        broker.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Open rooms and room membership.
+
+LocalChatState keeps them in this process, as the chat always did.
+SQLiteChatState keeps them in a SQLite database that every worker process
+of a multi-process deployment opens, so a room created through one worker
+can be joined through all of them. Accounts are kept by user_store.py.
+
+A member is the Socket.IO connection (sid) that joined under a name, and
+the SQLite state records which worker holds it. Every worker refreshes its
+row in the workers table with heartbeat(); members held by a worker that
+has not done so for WORKER_TTL seconds, because it crashed or was killed,
+no longer count, so their names can join again through a live worker.
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+WORKER_TTL = 30.0  # Seconds without a heartbeat before a worker's members are dropped
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS open_rooms (
+        room TEXT PRIMARY KEY,
+        created REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS room_members (
+        room TEXT NOT NULL,
+        name TEXT NOT NULL,
+        sid TEXT NOT NULL,
+        worker TEXT NOT NULL,
+        PRIMARY KEY (room, name)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS room_members_worker ON room_members (worker)",
+    """CREATE TABLE IF NOT EXISTS workers (
+        worker TEXT PRIMARY KEY,
+        seen REAL NOT NULL
+    )""",
+)
+
+
+class LocalChatState:
+    """In-process state; the default for a single server process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rooms = {}  # room -> {member name: sid}
+
+    def create_room(self, room):
+        """Returns False if the room is already open."""
+        with self._lock:
+            if room in self._rooms:
+                return False
+            self._rooms[room] = {}
+            return True
+
+    def room_exists(self, room):
+        return room in self._rooms
+
+    def join_room(self, room, name, sid):
+        """
+        Adds name, connected as sid, to an open room. Returns False if the
+        room is closed or name is already in it.
+        """
+        with self._lock:
+            members = self._rooms.get(room)
+            if members is None or name in members:
+                return False
+            members[name] = sid
+            return True
+
+    def leave_room(self, room, name, sid):
+        """Removes name from room if it joined as sid and returns how many members remain."""
+        with self._lock:
+            members = self._rooms.get(room, {})
+            if members.get(name) == sid:
+                del members[name]
+            return len(members)
+
+    def close_room(self, room, only_if_empty=False):
+        """Closes room (only if nobody is in it, when only_if_empty). Returns True if it was closed."""
+        with self._lock:
+            members = self._rooms.get(room)
+            if members is None or (only_if_empty and members):
+                return False
+            del self._rooms[room]
+            return True
+
+    def heartbeat(self):
+        """Nothing to refresh: members live and die with this process."""
+
+    def close(self):
+        """Nothing to release."""
+
+
+class SQLiteChatState:
+    """
+    State shared by all processes that open the same database file. Each
+    instance is one worker, named by worker_id (unique per process start
+    unless given).
+    """
+
+    def __init__(self, path, worker_id=None, ttl=WORKER_TTL):
+        self.path = path
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        for pragma in PRAGMAS:
+            self._conn.execute(pragma)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(room_members)")]
+        if columns and "worker" not in columns:
+            # Members from before workers were tracked; they are only connections, so start afresh
+            self._conn.execute("DROP TABLE room_members")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        # Registers this worker and clears out the members of dead ones
+        self.heartbeat()
+
+    def _one(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _change(self, sql, params=()):
+        """Runs one write statement; returns the number of rows changed."""
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def _live_workers(self):
+        """SQL for the workers whose members still count, with its parameters."""
+        return "SELECT worker FROM workers WHERE seen > ? UNION SELECT ?", (time.time() - self.ttl, self.worker_id)
+
+    def heartbeat(self):
+        """Marks this worker alive and drops the members of workers that are not. Call it every few seconds."""
+        live, params = self._live_workers()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO workers (worker, seen) VALUES (?, ?) "
+                "ON CONFLICT(worker) DO UPDATE SET seen = excluded.seen",
+                (self.worker_id, time.time()),
+            )
+            self._conn.execute(f"DELETE FROM room_members WHERE worker NOT IN ({live})", params)
+            self._conn.execute("DELETE FROM workers WHERE seen <= ?", (params[0],))
+
+    def create_room(self, room):
+        return self._change("INSERT OR IGNORE INTO open_rooms (room, created) VALUES (?, ?)", (room, time.time())) == 1
+
+    def room_exists(self, room):
+        return self._one("SELECT 1 FROM open_rooms WHERE room = ?", (room,)) is not None
+
+    def join_room(self, room, name, sid):
+        live, params = self._live_workers()
+        with self._lock:
+            # A row left behind by a dead worker does not keep the name out
+            self._conn.execute(
+                f"DELETE FROM room_members WHERE room = ? AND name = ? AND worker NOT IN ({live})",
+                (room, name, *params),
+            )
+            # Atomic: the member row is only added while the room is open
+            return self._conn.execute(
+                "INSERT OR IGNORE INTO room_members (room, name, sid, worker) "
+                "SELECT ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM open_rooms WHERE room = ?)",
+                (room, name, sid, self.worker_id, room),
+            ).rowcount == 1
+
+    def leave_room(self, room, name, sid):
+        live, params = self._live_workers()
+        with self._lock:
+            self._conn.execute("DELETE FROM room_members WHERE room = ? AND name = ? AND sid = ?", (room, name, sid))
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM room_members WHERE room = ? AND worker IN ({live})", (room, *params)
+            ).fetchone()[0]
+
+    def close_room(self, room, only_if_empty=False):
+        if only_if_empty:
+            live, params = self._live_workers()
+            with self._lock:
+                closed = self._conn.execute(
+                    "DELETE FROM open_rooms WHERE room = ? "
+                    f"AND NOT EXISTS (SELECT 1 FROM room_members WHERE room = ? AND worker IN ({live}))",
+                    (room, room, *params),
+                ).rowcount == 1
+                if closed:
+                    self._conn.execute("DELETE FROM room_members WHERE room = ?", (room,))
+                return closed
+        with self._lock:
+            self._conn.execute("DELETE FROM room_members WHERE room = ?", (room,))
+            return self._conn.execute("DELETE FROM open_rooms WHERE room = ?", (room,)).rowcount == 1
+
+    def close(self):
+        """Shuts this worker down: its members leave their rooms at once rather than after the TTL."""
+        with self._lock:
+            self._conn.execute("DELETE FROM room_members WHERE worker = ?", (self.worker_id,))
+            self._conn.execute("DELETE FROM workers WHERE worker = ?", (self.worker_id,))
+            self._conn.close()
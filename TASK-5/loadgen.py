@@ -0,0 +1,198 @@
+"""
+Load generator: opens thousands of Socket.IO clients against a chat server,
+spread over rooms of --room-size members, has every client send messages at
+a steady pace and reports connect latency, message throughput and fan-out
+latency (from a message being sent to each room member receiving it).
+
+Without --url it starts a local server with serve.py on a temporary
+database. Only --room-size accounts are created (password hashing is slow
+on purpose); each of them joins every room under its own session cookie.
+
+Usage: python loadgen.py [--url http://127.0.0.1:5000] [--async-mode auto]
+                         [--clients 2000] [--room-size 20] [--messages 5]
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import aiohttp
+import socketio
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PASSWORD = "loadgen-password"
+ROOM_TITLE = re.compile(r"Chat Room: (\w+)")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(async_mode, db_path):
+    port = free_port()
+    env = dict(os.environ, CHAT_DB=db_path)
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "serve.py"), "--async-mode", async_mode, "--port", str(port),
+         "--max-connections", "0"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def wait_until_up(http, url, process, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with http.get(url):
+                return
+        except aiohttp.ClientConnectionError:
+            if (process and process.poll() is not None) or time.monotonic() > deadline:
+                raise RuntimeError(f"no server at {url}")
+            await asyncio.sleep(0.1)
+
+
+async def session_cookie(http, url, path, data, cookie=None):
+    """POSTs a form without following the redirect; returns the new session cookie."""
+    headers = {"Cookie": f"session={cookie}"} if cookie else {}
+    async with http.post(f"{url}{path}", data=data, headers=headers, allow_redirects=False) as response:
+        return response.cookies["session"].value
+
+
+async def enter_rooms(http, url, room_size, room_count):
+    """Returns one session cookie per client: room_size accounts, each in room_count rooms."""
+    names = [f"load{random.randrange(10**6):06d}{i}" for i in range(room_size)]
+    for name in names:
+        async with http.post(f"{url}/signup", data={"name": name, "password": PASSWORD}):
+            pass
+    accounts = [
+        await session_cookie(http, url, "/", {"name": name, "password": PASSWORD})
+        for name in names
+    ]
+
+    cookies = []
+    for _ in range(room_count):
+        creator = await session_cookie(http, url, "/lounge", {"code": "", "create": "1"}, accounts[0])
+        async with http.get(f"{url}/room", headers={"Cookie": f"session={creator}"}) as response:
+            code = ROOM_TITLE.search(await response.text()).group(1)
+        cookies.append(creator)
+        cookies.extend(await asyncio.gather(*(
+            session_cookie(http, url, "/lounge", {"code": code, "join": "1"}, account)
+            for account in accounts[1:]
+        )))
+    return cookies
+
+
+class LoadClient:
+    def __init__(self, index, cookie):
+        self.index = index
+        self.cookie = cookie
+        self.connect_time = None
+        self.latencies = []
+        self.last_receive = 0.0
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.sio.on("message", self.on_message)
+
+    async def on_message(self, data):
+        text = data.get("message", "")
+        if text.startswith("lg "):
+            self.last_receive = time.time()
+            self.latencies.append(self.last_receive - float(text.split()[3]))
+
+    async def connect(self, url, limit):
+        async with limit:
+            start = time.perf_counter()
+            try:
+                await self.sio.connect(url, headers={"Cookie": f"session={self.cookie}"},
+                                       transports=["websocket"], wait_timeout=30)
+            except socketio.exceptions.ConnectionError:
+                return
+            self.connect_time = time.perf_counter() - start
+
+    async def send(self, count, interval):
+        await asyncio.sleep(random.uniform(0, interval))
+        for n in range(count):
+            await self.sio.emit("message", {"data": f"lg {self.index} {n} {time.time():.6f}"})
+            await asyncio.sleep(interval)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else float("nan")
+
+
+def report_latency(label, values):
+    print(f"{label} p50 {percentile(values, 0.5) * 1000:8.1f} ms   p99 {percentile(values, 0.99) * 1000:8.1f} ms   "
+          f"max {max(values, default=float('nan')) * 1000:8.1f} ms")
+
+
+async def run(args, url, process=None):
+    room_count = max(1, args.clients // args.room_size)
+    async with aiohttp.ClientSession(cookie_jar=aiohttp.DummyCookieJar()) as http:
+        await wait_until_up(http, url, process)
+        cookies = await enter_rooms(http, url, args.room_size, room_count)
+
+    clients = [LoadClient(i, cookie) for i, cookie in enumerate(cookies)]
+    limit = asyncio.Semaphore(args.concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(client.connect(url, limit) for client in clients))
+    connect_elapsed = time.perf_counter() - start
+    connected = [client for client in clients if client.connect_time is not None]
+
+    sent = len(connected) * args.messages
+    # Every message reaches each connected member of its room, the sender included
+    members = Counter(client.index // args.room_size for client in connected)
+    expected = sum(count * count for count in members.values()) * args.messages
+    send_start = time.time()
+    await asyncio.gather(*(client.send(args.messages, args.interval) for client in connected))
+    deadline = time.monotonic() + args.timeout
+    while time.monotonic() < deadline and sum(len(c.latencies) for c in connected) < expected:
+        await asyncio.sleep(0.1)
+    delivered = sum(len(c.latencies) for c in connected)
+    elapsed = max(c.last_receive for c in connected) - send_start if delivered else float("nan")
+
+    print(f"server:       {url}")
+    print(f"clients:      {len(connected):,} of {len(clients):,} connected in {room_count} rooms "
+          f"of {args.room_size} ({connect_elapsed:.1f} s)")
+    report_latency("connect:     ", [c.connect_time for c in connected])
+    print(f"messages:     {sent:,} sent, {delivered:,} of {expected:,} deliveries ({delivered / max(expected, 1):.1%})")
+    print(f"throughput:   {sent / elapsed:,.0f} messages/s, {delivered / elapsed:,.0f} deliveries/s")
+    report_latency("fan-out:     ", [latency for c in connected for latency in c.latencies])
+
+    await asyncio.gather(*(c.sio.disconnect() for c in connected))
+    return 0 if connected and delivered == expected else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open many Socket.IO clients against the chat and measure it.")
+    parser.add_argument("--url", help="server to test (default: start one with serve.py)")
+    parser.add_argument("--async-mode", default="auto", help="async mode of the started server (default: auto)")
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--room-size", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=5, help="messages sent by each client")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between one client's messages")
+    parser.add_argument("--concurrency", type=int, default=100, help="connections opened at once")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for deliveries")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        return asyncio.run(run(args, args.url))
+    with tempfile.TemporaryDirectory() as tmp:
+        process, url = start_server(args.async_mode, os.path.join(tmp, "chat.db"))
+        try:
+            return asyncio.run(run(args, url, process))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
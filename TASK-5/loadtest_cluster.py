@@ -0,0 +1,188 @@
+"""
+Multi-process load test: starts a chat_bus broker and several chat server
+processes sharing one database, connects clients to them round-robin, has
+every client send messages into one room and checks that every client
+receives every message, whichever worker its sender is connected to.
+
+Reports delivery completeness, the share of deliveries that crossed between
+workers, throughput and send-to-receive latency. Exits with status 1 if any
+message was lost.
+
+Usage: python loadtest_cluster.py [--workers 3] [--clients 30] [--messages 20]
+"""
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+import socketio
+
+from chat_bus import Broker
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PASSWORD = "loadtest-password"
+ROOM_TITLE = re.compile(r"Chat Room: (\w+)")
+
+WORKER_CODE = """
+import sys
+import main
+main.socketio.start_background_task(main.flush_messages)
+main.socketio.run(main.app, port=int(sys.argv[1]), allow_unsafe_werkzeug=True, log_output=False)
+"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_workers(count, env):
+    workers = []
+    for _ in range(count):
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-c", WORKER_CODE, str(port)], cwd=HERE, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        workers.append((process, f"http://127.0.0.1:{port}"))
+    for process, url in workers:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                requests.get(url, timeout=1)
+                break
+            except requests.ConnectionError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"worker at {url} did not start")
+                time.sleep(0.1)
+    return workers
+
+
+def log_in(url, name, room=None):
+    """
+    Signs name up and logs in through the worker at url, then creates a room
+    (or joins room). Returns the HTTP session and the room code.
+    """
+    http = requests.Session()
+    http.post(f"{url}/signup", data={"name": name, "password": PASSWORD})
+    http.post(f"{url}/", data={"name": name, "password": PASSWORD})
+    if room is None:
+        page = http.post(f"{url}/lounge", data={"code": "", "create": "1"})
+    else:
+        page = http.post(f"{url}/lounge", data={"code": room, "join": "1"})
+    match = ROOM_TITLE.search(page.text)
+    if not match:
+        raise RuntimeError(f"{name} could not enter a room through {url}")
+    return http, match.group(1)
+
+
+class LoadClient:
+    def __init__(self, index, url, http):
+        self.index = index
+        self.url = url
+        self.received = {}  # (sender, n) -> receive time
+        self.latencies = []
+        self.cross_worker = 0
+        self.sio = socketio.Client(reconnection=False)
+        self.sio.on("message", self.on_message)
+        self.cookie = "; ".join(f"{k}={v}" for k, v in http.cookies.items())
+
+    def on_message(self, data):
+        text = data.get("message", "")
+        if not text.startswith("lt "):
+            return
+        _, sender, n, sent, worker = text.split()
+        now = time.time()
+        self.received[(int(sender), int(n))] = now
+        self.latencies.append(now - float(sent))
+        if worker != self.url:
+            self.cross_worker += 1
+
+    def connect(self):
+        self.sio.connect(self.url, headers={"Cookie": self.cookie}, transports=["websocket"])
+
+    def send(self, n):
+        self.sio.emit("message", {"data": f"lt {self.index} {n} {time.time():.6f} {self.url}"})
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the chat across several worker processes.")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--clients", type=int, default=30)
+    parser.add_argument("--messages", type=int, default=20, help="messages sent by each client")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    broker = Broker(("127.0.0.1", 0))
+    threading.Thread(target=broker.serve_forever, daemon=True).start()
+    tmp = tempfile.TemporaryDirectory()
+    env = dict(
+        os.environ,
+        CHAT_DB=os.path.join(tmp.name, "chat.db"),
+        CHAT_MESSAGE_QUEUE="chatbus://127.0.0.1:%d" % broker.server_address[1],
+    )
+    workers = start_workers(args.workers, env)
+    clients = []
+    try:
+        urls = [url for _, url in workers]
+        # The room is created through the first worker and joined through all of them
+        first, code = log_in(urls[0], "load0")
+        http_sessions = [first]
+        for i in range(1, args.clients):
+            http_sessions.append(log_in(urls[i % len(urls)], f"load{i}", code)[0])
+
+        clients = [LoadClient(i, urls[i % len(urls)], http) for i, http in enumerate(http_sessions)]
+        connect_start = time.perf_counter()
+        for client in clients:
+            client.connect()
+        connect_time = time.perf_counter() - connect_start
+
+        expected = args.clients * args.messages
+        start = time.perf_counter()
+        for n in range(args.messages):
+            for client in clients:
+                client.send(n)
+        deadline = time.monotonic() + args.timeout
+        while time.monotonic() < deadline and any(len(c.received) < expected for c in clients):
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+
+        delivered = sum(len(c.received) for c in clients)
+        latencies = [latency for c in clients for latency in c.latencies]
+        cross = sum(c.cross_worker for c in clients)
+        print(f"workers:      {args.workers}, clients: {args.clients}, room: {code}")
+        print(f"connect:      {connect_time / args.clients * 1000:.1f} ms/client")
+        print(f"sent:         {expected:,} messages")
+        print(f"delivered:    {delivered:,} of {expected * args.clients:,} ({delivered / (expected * args.clients):.1%})")
+        print(f"cross-worker: {cross / max(delivered, 1):.1%} of deliveries")
+        print(f"throughput:   {delivered / elapsed:,.0f} deliveries/s, {expected / elapsed:,.0f} messages/s")
+        if latencies:
+            print(f"latency:      p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+                  f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms")
+        return 0 if delivered == expected * args.clients else 1
+    finally:
+        for client in clients:
+            if client.sio.connected:
+                client.sio.disconnect()
+        for process, _ in workers:
+            process.terminate()
+            process.wait()
+        broker.shutdown()
+        broker.server_close()
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,273 +1,416 @@
-from flask import Flask, render_template, request, session, redirect, url_for
-from flask_socketio import join_room, leave_room, send, SocketIO
-from werkzeug.security import generate_password_hash, check_password_hash
-import random
-import os
-from string import ascii_uppercase
-from datetime import datetime
-
-app = Flask(__name__)
-app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-key-change-in-production")
-socketio = SocketIO(app)
-
-# Constants
-ROOM_CODE_LENGTH = 4
-MIN_USERNAME_LENGTH = 3
-MAX_USERNAME_LENGTH = 20
-MIN_PASSWORD_LENGTH = 6
-MAX_MESSAGE_LENGTH = 500
-
-rooms = {}
-users = {}
-PROFILE_PICS = [
-    '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg"><circle cx="50" cy="50" r="50" fill="#4A90E2"/></svg>',
-    '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg"><circle cx="50" cy="50" r="50" fill="#50C878"/></svg>',
-    '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg"><circle cx="50" cy="50" r="50" fill="#FF6B6B"/></svg>',
-    '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg"><circle cx="50" cy="50" r="50" fill="#9B59B6"/></svg>',
-    '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg"><circle cx="50" cy="50" r="50" fill="#F39C12"/></svg>',
-    '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg"><circle cx="50" cy="50" r="50" fill="#1ABC9C"/></svg>',
-]
-
-# Helper Functions
-def validate_username(username):
-    """Validate username meets requirements"""
-    if not username:
-        return False, "Username is required."
-    if len(username) < MIN_USERNAME_LENGTH:
-        return False, f"Username must be at least {MIN_USERNAME_LENGTH} characters."
-    if len(username) > MAX_USERNAME_LENGTH:
-        return False, f"Username must be less than {MAX_USERNAME_LENGTH} characters."
-    if not username.replace("_", "").replace("-", "").isalnum():
-        return False, "Username can only contain letters, numbers, hyphens, and underscores."
-    return True, None
-
-def validate_password(password):
-    """Validate password meets requirements"""
-    if not password:
-        return False, "Password is required."
-    if len(password) < MIN_PASSWORD_LENGTH:
-        return False, f"Password must be at least {MIN_PASSWORD_LENGTH} characters."
-    return True, None
-
-def validate_message(message):
-    """Validate message meets requirements"""
-    if not message or not message.strip():
-        return False, "Message cannot be empty."
-    if len(message) > MAX_MESSAGE_LENGTH:
-        return False, f"Message must be less than {MAX_MESSAGE_LENGTH} characters."
-    return True, None
-
-def generate_unique_code(length):
-    while True:
-        code = ""
-        for _ in range(length):
-            code += random.choice(ascii_uppercase)
-
-        if code not in rooms:
-            break
-
-    return code
-
-def cleanup_empty_room(room_code):
-    """Delete room if empty after a delay"""
-    socketio.sleep(5)
-    if room_code in rooms and rooms[room_code]["members"] <= 0:
-        print(f"Deleting empty room {room_code} after delay.")
-        del rooms[room_code]
-
-@app.route("/", methods=["POST", "GET"])
-def login():
-    session.clear()
-    if request.method == "POST":
-        name = request.form.get("name", "").strip()
-        password = request.form.get("password", "")
-
-        if not name or not password:
-            return render_template("login.html", error="Please enter a username and password.", name=name)
-
-        if name not in users:
-            return render_template("login.html", error="Invalid username or password.", name=name)
-        
-        if not check_password_hash(users[name]["password"], password):
-            return render_template("login.html", error="Invalid username or password.", name=name)
-
-        session["name"] = name
-        return redirect(url_for("lounge"))
-
-    return render_template("login.html")
-
-@app.route("/signup", methods=["POST", "GET"])
-def signup():
-    if request.method == "POST":
-        name = request.form.get("name", "").strip()
-        password = request.form.get("password", "")
-
-        # Validate username
-        valid_username, username_error = validate_username(name)
-        if not valid_username:
-            return render_template("signup.html", error=username_error, name=name)
-
-        # Validate password
-        valid_password, password_error = validate_password(password)
-        if not valid_password:
-            return render_template("signup.html", error=password_error, name=name)
-
-        if name in users:
-            return render_template("signup.html", error="Username already taken.", name=name)
-
-        # Hash password before storing
-        hashed_password = generate_password_hash(password)
-        users[name] = {"password": hashed_password, "profile_pic": random.choice(PROFILE_PICS)}
-        return redirect(url_for("login"))
-
-    return render_template("signup.html")
-
-@app.route("/lounge", methods=["POST", "GET"])
-def lounge():
-    name = session.get("name")
-    if not name:
-        return redirect(url_for("login"))
-
-    if request.method == "POST":
-        code = request.form.get("code")
-        join = request.form.get("join", False)
-        create = request.form.get("create", False)
-
-        if join != False and not code:
-            return render_template("lounge.html", error="Please enter a room code.", user=users.get(name))
-
-        room = code
-        if create != False:
-            room = generate_unique_code(ROOM_CODE_LENGTH)
-            rooms[room] = {"members": 0, "messages": [], "names": set()}
-        elif code not in rooms:
-            return render_template("lounge.html", error="Room does not exist.", user=users.get(name))
-
-        session["room"] = room
-        return redirect(url_for("room"))
-
-    return render_template("lounge.html", user=users.get(name))
-
-@app.route("/logout")
-def logout():
-    session.clear()
-    return redirect(url_for("login"))
-
-@app.route("/account", methods=["GET", "POST"])
-def account():
-    if "name" not in session:
-        return redirect(url_for("login"))
-
-    if request.method == "POST":
-        name = session["name"]
-        pic_index = int(request.form.get("profile_pic"))
-        if 0 <= pic_index < len(PROFILE_PICS):
-            users[name]["profile_pic"] = PROFILE_PICS[pic_index]
-        return redirect(url_for("account"))
-
-    return render_template("account.html", users=users, profile_pics=PROFILE_PICS)
-
-@app.route("/room")
-def room():
-    if "name" not in session or "room" not in session or session["room"] not in rooms:
-        return redirect(url_for("lounge"))
-
-    room_code = session.get("room")
-    return render_template("room.html", code=room_code, messages=rooms[room_code]["messages"])
-
-@socketio.on("message")
-def message(data):
-    room = session.get("room")
-    name = session.get("name")
-    if room not in rooms or name not in users:
-        return
-    
-    msg_content = data.get("data", "")
-    
-    # Validate message
-    valid_msg, msg_error = validate_message(msg_content)
-    if not valid_msg:
-        send({"error": msg_error}, to=request.sid)
-        return
-
-    now = datetime.now()
-    current_time = now.strftime("%H:%M")
-    content = {
-        "name": name,
-        "message": msg_content,
-        "time": current_time,
-        "profile_pic": users[name]["profile_pic"]
-    }
-    send(content, to=room)
-    rooms[room]["messages"].append(content)
-    print(f"{session.get('name')} said: {msg_content}")
-
-@socketio.on("connect")
-def connect(auth):
-    room = session.get("room")
-    name = session.get("name")
-    if not room or not name or name not in users:
-        return
-    if room not in rooms:
-        leave_room(room)
-        return
-    
-    if name in rooms[room]["names"]:
-        return False
-
-    join_room(room)
-    now = datetime.now()
-    current_time = now.strftime("%H:%M")
-    send({"name": name, "message": "has entered the room", "time": current_time, "profile_pic": users[name]["profile_pic"]}, to=room)
-    rooms[room]["members"] += 1
-    rooms[room]["names"].add(name)
-    print(f"{name} joined room {room}")
-
-@socketio.on("disconnect")
-def disconnect():
-    room = session.get("room")
-    name = session.get("name")
-
-    if not room or not name or name not in users:
-        return
-
-    leave_room(room)
-
-    if room in rooms:
-        rooms[room]["members"] -= 1
-        rooms[room]["names"].discard(name)
-        if rooms[room]["members"] <= 0:
-            socketio.start_background_task(cleanup_empty_room, room)
-    
-    now = datetime.now()
-    current_time = now.strftime("%H:%M")
-    send({"name": name, "message": "has left the room", "time": current_time, "profile_pic": users[name]["profile_pic"]}, to=room)
-    print(f"{name} has left the room {room}")
-
-
-@socketio.on("leave")
-def leave(data):
-    room = session.get("room")
-    name = session.get("name")
-
-    if not room or not name or name not in users:
-        session.clear()
-        return
-
-    leave_room(room)
-    profile_pic = users[name]["profile_pic"] # Get pic before clearing session
-
-    if room in rooms:
-        rooms[room]["members"] -= 1
-        rooms[room]["names"].discard(name)
-        if rooms[room]["members"] <= 0:
-            del rooms[room]
-    
-    now = datetime.now()
-    current_time = now.strftime("%H:%M")
-    send({"name": name, "message": "has left the room", "time": current_time, "profile_pic": profile_pic}, to=room)
-    print(f"{name} has left the room {room}")
-    session.clear()
-
-if __name__ == "__main__":
-    socketio.run(app, debug=True)
+from flask import Flask, render_template, request, session, redirect, url_for, jsonify
+from flask_socketio import join_room, leave_room, send, SocketIO, ConnectionRefusedError
+from werkzeug.security import generate_password_hash, check_password_hash
+import atexit
+import random
+import os
+import sqlite3
+import threading
+import time
+from string import ascii_uppercase
+from datetime import datetime
+from message_store import MessageStore, FLUSH_INTERVAL
+from chat_bus import BusManager
+from chat_state import LocalChatState, SQLiteChatState
+from user_store import UserStore
+
+# Run several workers behind one load balancer by pointing them all at the same
+# message queue (redis://..., or chatbus://host:port for the bundled chat_bus.py
+# broker) and the same CHAT_DB; rooms and messages then live in the database, like users.
+MESSAGE_QUEUE = os.environ.get("CHAT_MESSAGE_QUEUE")
+CHAT_STATE = os.environ.get("CHAT_STATE", "sqlite" if MESSAGE_QUEUE else "local")
+# serve.py sets eventlet or gevent after monkey patching; running main.py directly is
+# the threaded development server
+ASYNC_MODE = os.environ.get("CHAT_ASYNC_MODE", "threading")
+MAX_CONNECTIONS = int(os.environ.get("CHAT_MAX_CONNECTIONS", "0"))  # Socket.IO clients per process, 0 for no limit
+HASH_THREADS = int(os.environ.get("CHAT_HASH_THREADS", "4"))  # Native threads for password hashing, 0 to hash inline
+MAX_PENDING_HASHES = int(os.environ.get("CHAT_MAX_PENDING_HASHES", "64"))  # Logins/signups hashing at once
+
+app = Flask(__name__)
+app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-key-change-in-production")
+if MESSAGE_QUEUE and MESSAGE_QUEUE.startswith("chatbus://"):
+    socketio = SocketIO(app, async_mode=ASYNC_MODE,
+                        client_manager=BusManager(MESSAGE_QUEUE, channel="flask-socketio"))
+else:
+    socketio = SocketIO(app, async_mode=ASYNC_MODE, message_queue=MESSAGE_QUEUE)
+
+# Constants
+ROOM_CODE_LENGTH = 4
+MIN_USERNAME_LENGTH = 3
+MAX_USERNAME_LENGTH = 20
+MIN_PASSWORD_LENGTH = 6
+MAX_MESSAGE_LENGTH = 500
+HISTORY_PAGE_SIZE = 50  # Messages per history page by default
+MAX_HISTORY_PAGE_SIZE = 200
+COMPACT_INTERVAL = 3600  # Seconds between message log compactions
+HEARTBEAT_INTERVAL = 5  # Seconds between heartbeats that keep this worker's room members alive
+USER_CACHE_TTL = 30  # Seconds a cached account is trusted when other workers may change it
+DATABASE_PATH = os.environ.get("CHAT_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "chat.db"))
+
+if CHAT_STATE == "sqlite":
+    state = SQLiteChatState(DATABASE_PATH)
+    atexit.register(state.close)
+elif CHAT_STATE == "local":
+    state = LocalChatState()
+else:
+    raise ValueError(f"Unknown CHAT_STATE {CHAT_STATE!r}; expected 'local' or 'sqlite'")
+# Shared when another process may append to the same log
+message_store = MessageStore(DATABASE_PATH, shared=CHAT_STATE == "sqlite")
+atexit.register(message_store.close)
+users = UserStore(DATABASE_PATH, cache_ttl=USER_CACHE_TTL if MESSAGE_QUEUE else None)
+atexit.register(users.close)
+
+# Password hashing runs on native threads so a burst of logins does not stall the
+# eventlet/gevent loop; under the threaded server each request has its own thread anyway
+hash_slots = threading.BoundedSemaphore(MAX_PENDING_HASHES)
+hash_pool = None
+if HASH_THREADS and ASYNC_MODE == "eventlet":
+    from eventlet import tpool
+    tpool.set_num_threads(HASH_THREADS)
+elif HASH_THREADS and ASYNC_MODE == "gevent":
+    from gevent.threadpool import ThreadPool
+    hash_pool = ThreadPool(HASH_THREADS)
+active_sids = set()  # Socket.IO connections accepted by this process
+PROFILE_PICS = [
+    '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg"><circle cx="50" cy="50" r="50" fill="#4A90E2"/></svg>',
+    '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg"><circle cx="50" cy="50" r="50" fill="#50C878"/></svg>',
+    '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg"><circle cx="50" cy="50" r="50" fill="#FF6B6B"/></svg>',
+    '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg"><circle cx="50" cy="50" r="50" fill="#9B59B6"/></svg>',
+    '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg"><circle cx="50" cy="50" r="50" fill="#F39C12"/></svg>',
+    '<svg viewBox="0 0 100 100" xmlns="http://www.w3.org/2000/svg"><circle cx="50" cy="50" r="50" fill="#1ABC9C"/></svg>',
+]
+
+# Helper Functions
+def validate_username(username):
+    """Validate username meets requirements"""
+    if not username:
+        return False, "Username is required."
+    if len(username) < MIN_USERNAME_LENGTH:
+        return False, f"Username must be at least {MIN_USERNAME_LENGTH} characters."
+    if len(username) > MAX_USERNAME_LENGTH:
+        return False, f"Username must be less than {MAX_USERNAME_LENGTH} characters."
+    if not username.replace("_", "").replace("-", "").isalnum():
+        return False, "Username can only contain letters, numbers, hyphens, and underscores."
+    return True, None
+
+def validate_password(password):
+    """Validate password meets requirements"""
+    if not password:
+        return False, "Password is required."
+    if len(password) < MIN_PASSWORD_LENGTH:
+        return False, f"Password must be at least {MIN_PASSWORD_LENGTH} characters."
+    return True, None
+
+def validate_message(message):
+    """Validate message meets requirements"""
+    if not message or not message.strip():
+        return False, "Message cannot be empty."
+    if len(message) > MAX_MESSAGE_LENGTH:
+        return False, f"Message must be less than {MAX_MESSAGE_LENGTH} characters."
+    return True, None
+
+def run_hashing(func, *args):
+    """
+    Runs a password hashing call off the event loop and returns its result, or
+    None without running it when MAX_PENDING_HASHES calls are already in progress.
+    """
+    if not hash_slots.acquire(blocking=False):
+        return None
+    try:
+        if HASH_THREADS and ASYNC_MODE == "eventlet":
+            return tpool.execute(func, *args)
+        if hash_pool is not None:
+            return hash_pool.apply(func, args)
+        return func(*args)
+    finally:
+        hash_slots.release()
+
+def history_page(room, before=None, limit=HISTORY_PAGE_SIZE):
+    """
+    Returns one page of a room's history: the newest messages with a seq
+    below `before` (or the newest overall), oldest first, plus the cursor
+    for the next older page. Raises ValueError for malformed arguments.
+    """
+    before = None if before in (None, "") else int(before)
+    limit = min(max(int(limit), 1), MAX_HISTORY_PAGE_SIZE)
+    messages = message_store.before(room, before, limit)
+    oldest = messages[0]["seq"] if messages else None
+    # compact() trims old messages, so the oldest one kept is not always seq 1
+    has_more = oldest is not None and oldest > message_store.first_seq(room)
+    return {"messages": messages, "before": oldest, "has_more": has_more}
+
+def generate_unique_code(length):
+    while True:
+        code = ""
+        for _ in range(length):
+            code += random.choice(ascii_uppercase)
+
+        # Codes with a stored history stay reserved for that room
+        if not state.room_exists(code) and not message_store.has_room(code):
+            break
+
+    return code
+
+def run_logged(func):
+    """Runs func, logging a database error instead of raising it. Returns True if it succeeded."""
+    try:
+        func()
+        return True
+    except sqlite3.Error as e:
+        print(f"Database error in {func.__name__}: {e}")
+        return False
+
+def flush_messages():
+    """Background task: commits buffered messages, sends heartbeats and compacts the log now and then."""
+    last_compact = last_heartbeat = time.monotonic()
+    while True:
+        socketio.sleep(FLUSH_INTERVAL)
+        # A failure must not end the task: a failed flush keeps its batch for the next one,
+        # and a worker that stops sending heartbeats loses its room members
+        run_logged(message_store.flush)
+        if time.monotonic() - last_heartbeat >= HEARTBEAT_INTERVAL and run_logged(state.heartbeat):
+            last_heartbeat = time.monotonic()
+        if time.monotonic() - last_compact >= COMPACT_INTERVAL:
+            run_logged(message_store.compact)
+            last_compact = time.monotonic()
+
+def cleanup_empty_room(room_code):
+    """Delete room if empty after a delay"""
+    socketio.sleep(5)
+    if state.close_room(room_code, only_if_empty=True):
+        print(f"Deleting empty room {room_code} after delay.")
+
+@app.route("/", methods=["POST", "GET"])
+def login():
+    session.clear()
+    if request.method == "POST":
+        name = request.form.get("name", "").strip()
+        password = request.form.get("password", "")
+
+        if not name or not password:
+            return render_template("login.html", error="Please enter a username and password.", name=name)
+
+        user = users.get(name)
+        if user is None:
+            return render_template("login.html", error="Invalid username or password.", name=name)
+        
+        valid = run_hashing(check_password_hash, user["password"], password)
+        if valid is None:
+            return render_template("login.html", error="Too many logins right now, please try again.", name=name), 503
+        if not valid:
+            return render_template("login.html", error="Invalid username or password.", name=name)
+
+        session["name"] = name
+        return redirect(url_for("lounge"))
+
+    return render_template("login.html")
+
+@app.route("/signup", methods=["POST", "GET"])
+def signup():
+    if request.method == "POST":
+        name = request.form.get("name", "").strip()
+        password = request.form.get("password", "")
+
+        # Validate username
+        valid_username, username_error = validate_username(name)
+        if not valid_username:
+            return render_template("signup.html", error=username_error, name=name)
+
+        # Validate password
+        valid_password, password_error = validate_password(password)
+        if not valid_password:
+            return render_template("signup.html", error=password_error, name=name)
+
+        if users.get(name) is not None:
+            return render_template("signup.html", error="Username already taken.", name=name)
+
+        # Hash password before storing
+        hashed_password = run_hashing(generate_password_hash, password)
+        if hashed_password is None:
+            return render_template("signup.html", error="Too many signups right now, please try again.", name=name), 503
+        if not users.add(name, hashed_password, random.choice(PROFILE_PICS)):
+            return render_template("signup.html", error="Username already taken.", name=name)
+        return redirect(url_for("login"))
+
+    return render_template("signup.html")
+
+@app.route("/lounge", methods=["POST", "GET"])
+def lounge():
+    name = session.get("name")
+    if not name:
+        return redirect(url_for("login"))
+
+    if request.method == "POST":
+        code = request.form.get("code")
+        join = request.form.get("join", False)
+        create = request.form.get("create", False)
+
+        if join != False and not code:
+            return render_template("lounge.html", error="Please enter a room code.", user=users.get(name))
+
+        room = code
+        if create != False:
+            room = generate_unique_code(ROOM_CODE_LENGTH)
+            state.create_room(room)
+        elif not state.room_exists(code):
+            if not message_store.has_room(code):
+                return render_template("lounge.html", error="Room does not exist.", user=users.get(name))
+            # Reopen a room whose history outlived it (e.g. across a restart)
+            state.create_room(room)
+
+        session["room"] = room
+        return redirect(url_for("room"))
+
+    return render_template("lounge.html", user=users.get(name))
+
+@app.route("/logout")
+def logout():
+    session.clear()
+    return redirect(url_for("login"))
+
+@app.route("/account", methods=["GET", "POST"])
+def account():
+    if "name" not in session:
+        return redirect(url_for("login"))
+
+    if request.method == "POST":
+        name = session["name"]
+        pic_index = int(request.form.get("profile_pic"))
+        if 0 <= pic_index < len(PROFILE_PICS):
+            users.set_profile_pic(name, PROFILE_PICS[pic_index])
+        return redirect(url_for("account"))
+
+    return render_template("account.html", user=users.get(session["name"]), profile_pics=PROFILE_PICS)
+
+@app.route("/room")
+def room():
+    if "name" not in session or "room" not in session or not state.room_exists(session["room"]):
+        return redirect(url_for("lounge"))
+
+    room_code = session.get("room")
+    # History is fetched page by page over the socket after connecting
+    return render_template("room.html", code=room_code, history_page_size=HISTORY_PAGE_SIZE)
+
+@app.route("/room/<code>/messages")
+def room_messages(code):
+    """JSON history endpoint: ?before=<seq>&limit=<n> pages backwards."""
+    if "name" not in session or session.get("room") != code:
+        return jsonify({"error": "Not a member of this room."}), 403
+    try:
+        page = history_page(code, request.args.get("before"), request.args.get("limit", HISTORY_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "Invalid history cursor."}), 400
+    return jsonify(page)
+
+@socketio.on("history")
+def history(data):
+    """Socket.IO history request; the page is returned through the acknowledgement."""
+    room = session.get("room")
+    if not room or users.get(session.get("name")) is None or not state.room_exists(room):
+        return {"error": "Not in a room."}
+    data = data or {}
+    try:
+        return history_page(room, data.get("before"), data.get("limit", HISTORY_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return {"error": "Invalid history cursor."}
+
+@socketio.on("message")
+def message(data):
+    room = session.get("room")
+    name = session.get("name")
+    user = users.get(name) if name else None
+    if not room or user is None or not state.room_exists(room):
+        return
+    
+    msg_content = data.get("data", "")
+    
+    # Validate message
+    valid_msg, msg_error = validate_message(msg_content)
+    if not valid_msg:
+        send({"error": msg_error}, to=request.sid)
+        return
+
+    now = datetime.now()
+    current_time = now.strftime("%H:%M")
+    content = {
+        "name": name,
+        "message": msg_content,
+        "time": current_time,
+        "profile_pic": user["profile_pic"]
+    }
+    content = message_store.append(room, content)
+    send(content, to=room)
+    print(f"{session.get('name')} said: {msg_content}")
+
+@socketio.on("connect")
+def connect(auth):
+    if MAX_CONNECTIONS and len(active_sids) >= MAX_CONNECTIONS:
+        raise ConnectionRefusedError("Server is full, try again later.")
+    active_sids.add(request.sid)
+    room = session.get("room")
+    name = session.get("name")
+    user = users.get(name) if name else None
+    if not room or user is None:
+        return
+    if not state.room_exists(room):
+        leave_room(room)
+        return
+    
+    # Fails if the name is already in the room, possibly through another worker
+    if not state.join_room(room, name, request.sid):
+        active_sids.discard(request.sid)
+        return False
+
+    join_room(room)
+    now = datetime.now()
+    current_time = now.strftime("%H:%M")
+    send({"name": name, "message": "has entered the room", "time": current_time, "profile_pic": user["profile_pic"]}, to=room)
+    print(f"{name} joined room {room}")
+
+@socketio.on("disconnect")
+def disconnect():
+    active_sids.discard(request.sid)
+    room = session.get("room")
+    name = session.get("name")
+    user = users.get(name) if name else None
+
+    if not room or user is None:
+        return
+
+    leave_room(room)
+
+    if state.room_exists(room) and state.leave_room(room, name, request.sid) <= 0:
+        socketio.start_background_task(cleanup_empty_room, room)
+    
+    now = datetime.now()
+    current_time = now.strftime("%H:%M")
+    send({"name": name, "message": "has left the room", "time": current_time, "profile_pic": user["profile_pic"]}, to=room)
+    print(f"{name} has left the room {room}")
+
+
+@socketio.on("leave")
+def leave(data):
+    room = session.get("room")
+    name = session.get("name")
+    user = users.get(name) if name else None
+
+    if not room or user is None:
+        session.clear()
+        return
+
+    leave_room(room)
+    profile_pic = user["profile_pic"] # Get pic before clearing session
+
+    if state.room_exists(room) and state.leave_room(room, name, request.sid) <= 0:
+        state.close_room(room, only_if_empty=True)
+    
+    now = datetime.now()
+    current_time = now.strftime("%H:%M")
+    send({"name": name, "message": "has left the room", "time": current_time, "profile_pic": profile_pic}, to=room)
+    print(f"{name} has left the room {room}")
+    session.clear()
+
+if __name__ == "__main__":
+    # Development server; run serve.py in production
+    socketio.start_background_task(flush_messages)
+    socketio.run(app, debug=os.environ.get("FLASK_DEBUG") == "1")
@@ -0,0 +1,284 @@
+"""
+Durable chat message log.
+
+Messages are appended to a SQLite table in WAL mode, keyed by (room, seq)
+where seq counts up from 1 in every room. Writes are buffered and committed
+in batches, either when BATCH_SIZE messages are pending or when the
+background flusher runs, so a busy room costs one transaction per batch
+rather than one per message; at most FLUSH_INTERVAL seconds of messages are
+at risk if the process dies. Only the last HOT_TAIL_SIZE messages of the
+HOT_ROOMS most recently active rooms are kept in memory. compact() retires
+rooms idle for longer than RETENTION_SECONDS and trims every room to its
+newest MAX_ROOM_MESSAGES.
+
+With shared=True several processes can append to the same database and
+reads always go to the database. Messages cannot wait for the flusher
+there, as the other processes would not see them, so append() commits
+before it returns and assigns the seq inside the transaction. Appends made
+by other threads while a commit is running queue up and are committed
+together by the next one (group commit), so a busy process still shares one
+transaction between many messages.
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 1.0
+HOT_TAIL_SIZE = 200
+HOT_ROOMS = 1000
+MAX_ROOM_MESSAGES = 100_000
+RETENTION_SECONDS = 7 * 24 * 3600
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS rooms (
+        room TEXT PRIMARY KEY,
+        last_seq INTEGER NOT NULL,
+        updated REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS messages (
+        room TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        message TEXT NOT NULL,
+        time TEXT NOT NULL,
+        profile_pic TEXT,
+        created REAL NOT NULL,
+        PRIMARY KEY (room, seq)
+    ) WITHOUT ROWID""",
+)
+
+FIELDS = ("seq", "name", "message", "time", "profile_pic")
+
+
+class MessageStore:
+    """
+    Append-only, per-room message log with a bounded in-memory tail.
+
+    Messages are dicts with the keys in FIELDS; append() assigns "seq".
+    All methods are safe to call from several threads.
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE, hot_tail_size=HOT_TAIL_SIZE, hot_rooms=HOT_ROOMS, shared=False):
+        self.path = path
+        self.shared = shared
+        self.batch_size = batch_size
+        self.hot_tail_size = hot_tail_size
+        self.hot_rooms = hot_rooms
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        for pragma in PRAGMAS:
+            self._conn.execute(pragma)
+        with self._conn:
+            for statement in SCHEMA:
+                self._conn.execute(statement)
+        # room -> last assigned seq, for every room with stored messages
+        self._last_seq = dict(self._conn.execute("SELECT room, last_seq FROM rooms"))
+        self._tails = OrderedDict()  # room -> deque of recent messages, most recently used last
+        self._pending = []
+        self._queue_lock = threading.Lock()
+        self._queue = []  # shared appends waiting for the next group commit
+
+    def has_room(self, room):
+        with self._lock:
+            if self.shared:
+                return self._stored_last_seq(room) is not None
+            return room in self._last_seq
+
+    def last_seq(self, room):
+        with self._lock:
+            if self.shared:
+                return self._stored_last_seq(room) or 0
+            return self._last_seq.get(room, 0)
+
+    def append(self, room, message):
+        """Assigns the next seq of room to message, logs it and returns it."""
+        if self.shared:
+            return self._append_shared(room, message)
+        with self._lock:
+            seq = self._last_seq.get(room, 0) + 1
+            self._last_seq[room] = seq
+            message = dict(message, seq=seq)
+            self._tail(room).append(message)
+            self._pending.append((room, message, time.time()))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            return message
+
+    def first_seq(self, room):
+        """Returns the seq of the oldest message kept for room (compact() drops older ones), or 0."""
+        with self._lock:
+            (first,) = self._conn.execute("SELECT MIN(seq) FROM messages WHERE room = ?", (room,)).fetchone()
+            if first is None and not self.shared:
+                # Nothing committed yet: the oldest message is still pending
+                first = next((m["seq"] for r, m, _ in self._pending if r == room), None)
+            return first or 0
+
+    def recent(self, room, limit):
+        """Returns up to limit newest messages of room, oldest first."""
+        return self.before(room, None, limit)
+
+    def before(self, room, seq, limit):
+        """
+        Returns up to limit messages of room with a seq below seq (or the
+        newest ones when seq is None), oldest first.
+        """
+        with self._lock:
+            last = self.last_seq(room)
+            end = last + 1 if seq is None else min(seq, last + 1)
+            start = max(1, end - limit)
+            if start >= end:
+                return []
+
+            tail = None if self.shared else self._tails.get(room)
+            if tail and tail[0]["seq"] <= start:
+                # Served from memory: the tail holds consecutive seqs
+                offset = start - tail[0]["seq"]
+                return [tail[i] for i in range(offset, offset + end - start)]
+
+            self.flush()
+            rows = self._conn.execute(
+                "SELECT seq, name, message, time, profile_pic FROM messages "
+                "WHERE room = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (room, start, end),
+            ).fetchall()
+        return [dict(zip(FIELDS, row)) for row in rows]
+
+    def flush(self):
+        """Commits all pending messages in one transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            try:
+                self._write(pending)
+            except sqlite3.Error:
+                # Keep the batch so the next flush retries it
+                self._pending = pending + self._pending
+                raise
+
+    def _write(self, pending):
+        latest = {}  # room -> (last seq, time) in this batch
+        for room, message, created in pending:
+            latest[room] = (message["seq"], created)
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO messages (room, seq, name, message, time, profile_pic, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (room, m["seq"], m["name"], m["message"], m["time"], m.get("profile_pic"), created)
+                    for room, m, created in pending
+                ],
+            )
+            self._conn.executemany(
+                "INSERT INTO rooms (room, last_seq, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(room) DO UPDATE SET last_seq = excluded.last_seq, updated = excluded.updated",
+                [(room, seq, created) for room, (seq, created) in latest.items()],
+            )
+
+    def _stored_last_seq(self, room):
+        row = self._conn.execute("SELECT last_seq FROM rooms WHERE room = ?", (room,)).fetchone()
+        return row[0] if row else None
+
+    def _append_shared(self, room, message):
+        entry = {"room": room, "message": message, "created": time.time()}
+        with self._queue_lock:
+            self._queue.append(entry)
+        with self._lock:
+            # Whoever gets the lock first commits every append queued by then
+            if "result" not in entry and "error" not in entry:
+                with self._queue_lock:
+                    batch, self._queue = self._queue, []
+                self._commit_shared(batch)
+        if "error" in entry:
+            raise entry["error"]
+        return entry["result"]
+
+    def _commit_shared(self, batch):
+        counts = {}  # room -> messages in this batch
+        for entry in batch:
+            counts[entry["room"]] = counts.get(entry["room"], 0) + 1
+        try:
+            with self._conn:
+                # The upserts take the database write lock, so seqs stay gapless across processes
+                next_seq = {}
+                for room, count in counts.items():
+                    (last_seq,) = self._conn.execute(
+                        "INSERT INTO rooms (room, last_seq, updated) VALUES (?, ?, ?) "
+                        "ON CONFLICT(room) DO UPDATE SET last_seq = last_seq + excluded.last_seq, "
+                        "updated = excluded.updated RETURNING last_seq",
+                        (room, count, batch[-1]["created"]),
+                    ).fetchone()
+                    next_seq[room] = last_seq - count + 1
+                results = []
+                for entry in batch:
+                    seq = next_seq[entry["room"]]
+                    next_seq[entry["room"]] = seq + 1
+                    results.append(dict(entry["message"], seq=seq))
+                self._conn.executemany(
+                    "INSERT INTO messages (room, seq, name, message, time, profile_pic, created) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (entry["room"], m["seq"], m["name"], m["message"], m["time"], m.get("profile_pic"),
+                         entry["created"])
+                        for entry, m in zip(batch, results)
+                    ],
+                )
+        except sqlite3.Error as e:
+            for entry in batch:
+                entry["error"] = e
+            return
+        for entry, message in zip(batch, results):
+            entry["result"] = message
+
+    def compact(self, retention=RETENTION_SECONDS, max_room_messages=MAX_ROOM_MESSAGES, now=None):
+        """
+        Retires rooms idle for longer than retention seconds and deletes all
+        but the newest max_room_messages of every other room. Returns the
+        number of messages deleted.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self.flush()
+            with self._conn:
+                idle = [room for (room,) in self._conn.execute(
+                    "SELECT room FROM rooms WHERE updated < ?", (now - retention,))]
+                deleted = 0
+                for room in idle:
+                    deleted += self._conn.execute("DELETE FROM messages WHERE room = ?", (room,)).rowcount
+                    self._conn.execute("DELETE FROM rooms WHERE room = ?", (room,))
+                    self._last_seq.pop(room, None)
+                    self._tails.pop(room, None)
+
+                for room, last_seq in self._conn.execute(
+                        "SELECT room, last_seq FROM rooms WHERE last_seq > ?", (max_room_messages,)).fetchall():
+                    cutoff = last_seq - max_room_messages
+                    deleted += self._conn.execute(
+                        "DELETE FROM messages WHERE room = ? AND seq <= ?", (room, cutoff)
+                    ).rowcount
+                    tail = self._tails.get(room)
+                    while tail and tail[0]["seq"] <= cutoff:
+                        tail.popleft()
+            return deleted
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    def _tail(self, room):
+        tail = self._tails.get(room)
+        if tail is None:
+            tail = self._tails[room] = deque(maxlen=self.hot_tail_size)
+            if len(self._tails) > self.hot_rooms:
+                self._tails.popitem(last=False)
+        else:
+            self._tails.move_to_end(room)
+        return tail
@@ -0,0 +1,147 @@
+"""
+Production entry point for the chat server.
+
+Picks an async mode (eventlet, gevent, or the threaded Werkzeug server as a
+fallback), monkey patches the standard library for it before anything else
+is imported, and serves the app without the debugger or reloader. With
+--workers N it supervises N worker processes on consecutive ports, sharing
+CHAT_DB and the message queue in CHAT_MESSAGE_QUEUE; when no queue is set,
+a chat_bus.py broker is started for them. Put a load balancer with sticky
+sessions in front of the workers.
+
+Usage:
+    python serve.py [--async-mode auto|eventlet|gevent|threading] [--host 127.0.0.1]
+                    [--port 5000] [--workers 1] [--max-connections 5000]
+"""
+import os
+import sys
+from importlib.util import find_spec
+
+ASYNC_MODES = ("eventlet", "gevent", "threading")
+
+
+def resolve_async_mode(argv, environ):
+    """The --async-mode argument or CHAT_ASYNC_MODE; "auto" picks the first installed of ASYNC_MODES."""
+    mode = environ.get("CHAT_ASYNC_MODE", "auto")
+    for i, arg in enumerate(argv):
+        if arg == "--async-mode" and i + 1 < len(argv):
+            mode = argv[i + 1]
+        elif arg.startswith("--async-mode="):
+            mode = arg.split("=", 1)[1]
+    if mode == "auto":
+        return next(m for m in ASYNC_MODES if m == "threading" or find_spec(m))
+    return mode
+
+
+# Patch before the rest of the standard library, Flask or main are imported, so
+# every socket, lock and sleep they create is cooperative
+ASYNC_MODE = resolve_async_mode(sys.argv[1:], os.environ)
+if ASYNC_MODE == "eventlet":
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
+import argparse  # noqa: E402
+import socket  # noqa: E402
+import subprocess  # noqa: E402
+import time  # noqa: E402
+
+from chat_bus import DEFAULT_PORT as BUS_PORT  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAX_CONNECTIONS = 5000
+# Extra server capacity beyond the Socket.IO limit, for page loads and history requests
+HTTP_HEADROOM = 100
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the chat in production.")
+    parser.add_argument("--async-mode", choices=("auto",) + ASYNC_MODES, default="auto",
+                        help="default: CHAT_ASYNC_MODE or auto")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes, on port, port + 1, ...")
+    parser.add_argument("--max-connections", type=int, default=MAX_CONNECTIONS,
+                        help="Socket.IO connections per worker, 0 for no limit (default: %(default)s)")
+    parser.add_argument("--bus-port", type=int, default=BUS_PORT,
+                        help="port of the broker started for several workers without CHAT_MESSAGE_QUEUE")
+    return parser.parse_args(argv)
+
+
+def wait_for_port(host, port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def server_options(async_mode, max_connections):
+    """Keyword arguments for socketio.run; eventlet and gevent also cap concurrent connections."""
+    if async_mode == "threading":
+        # Werkzeug has no cap; the connect handler still refuses clients over the limit
+        return {"allow_unsafe_werkzeug": True}
+    if async_mode == "eventlet":
+        # Without max_size eventlet stops accepting at 1024 connections
+        return {"max_size": max_connections + HTTP_HEADROOM if max_connections else sys.maxsize}
+    # gevent spawns a greenlet per connection without limit unless given a pool size
+    return {"spawn": max_connections + HTTP_HEADROOM} if max_connections else {}
+
+
+def serve(args):
+    os.environ["CHAT_ASYNC_MODE"] = ASYNC_MODE
+    os.environ["CHAT_MAX_CONNECTIONS"] = str(args.max_connections)
+    import main as chat
+
+    options = server_options(ASYNC_MODE, args.max_connections)
+    print(f"Serving on http://{args.host}:{args.port} ({ASYNC_MODE}, pid {os.getpid()})", flush=True)
+    chat.socketio.start_background_task(chat.flush_messages)
+    chat.socketio.run(chat.app, host=args.host, port=args.port, debug=False, use_reloader=False,
+                      log_output=False, **options)
+
+
+def supervise(args):
+    """Runs args.workers copies of serve() and stops them all when one exits."""
+    env = dict(os.environ)
+    processes = []
+    if not env.get("CHAT_MESSAGE_QUEUE"):
+        processes.append(subprocess.Popen(
+            [sys.executable, os.path.join(HERE, "chat_bus.py"), "--port", str(args.bus_port)], env=env))
+        wait_for_port("127.0.0.1", args.bus_port)
+        env["CHAT_MESSAGE_QUEUE"] = f"chatbus://127.0.0.1:{args.bus_port}"
+
+    for i in range(args.workers):
+        processes.append(subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--async-mode", ASYNC_MODE, "--host", args.host,
+             "--port", str(args.port + i), "--max-connections", str(args.max_connections)],
+            env=env,
+        ))
+    try:
+        while all(process.poll() is None for process in processes):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+    return max(process.returncode or 0 for process in processes)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.workers > 1:
+        return supervise(args)
+    serve(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import queue
+import threading
+import unittest
+
+from chat_bus import Broker, BusManager
+
+
+class TestChatBus(unittest.TestCase):
+    def setUp(self):
+        self.broker = Broker(("127.0.0.1", 0))
+        threading.Thread(target=self.broker.serve_forever, daemon=True).start()
+        self.addCleanup(self.broker.server_close)
+        self.addCleanup(self.broker.shutdown)
+        self.url = "chatbus://127.0.0.1:%d" % self.broker.server_address[1]
+
+    def listen(self, manager):
+        received = queue.Queue()
+
+        def run():
+            for message in manager._listen():
+                received.put(message)
+
+        threading.Thread(target=run, daemon=True).start()
+        return received
+
+    def test_publish_reaches_every_subscriber(self):
+        first = self.listen(BusManager(self.url))
+        second = self.listen(BusManager(self.url))
+        other_channel = self.listen(BusManager(self.url, channel="other"))
+        publisher = BusManager(self.url, write_only=True)
+        # Wait until all three subscribers are registered with the broker
+        while len(self.broker.subscribers) < 3:
+            threading.Event().wait(0.01)
+
+        publisher._publish({"method": "emit", "event": "message", "data": "hi"})
+        for received in (first, second):
+            self.assertEqual(received.get(timeout=5)["data"], "hi")
+        self.assertTrue(other_channel.empty())
+
+
+if __name__ == '__main__':
+    unittest.main()
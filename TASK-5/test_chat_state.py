@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from chat_state import LocalChatState, SQLiteChatState
+
+
+class ChatStateTests:
+    def make_state(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.state = self.make_state()
+
+    def test_room_membership(self):
+        self.assertFalse(self.state.join_room("ABCD", "alice", "sid1"))
+        self.assertTrue(self.state.create_room("ABCD"))
+        self.assertFalse(self.state.create_room("ABCD"))
+        self.assertTrue(self.state.join_room("ABCD", "alice", "sid1"))
+        self.assertFalse(self.state.join_room("ABCD", "alice", "sid2"))
+        self.assertTrue(self.state.join_room("ABCD", "bob", "sid3"))
+
+        # Only the connection that joined can leave
+        self.assertEqual(self.state.leave_room("ABCD", "alice", "sid2"), 2)
+        self.assertEqual(self.state.leave_room("ABCD", "alice", "sid1"), 1)
+        self.assertFalse(self.state.close_room("ABCD", only_if_empty=True))
+        self.assertEqual(self.state.leave_room("ABCD", "bob", "sid3"), 0)
+        self.assertTrue(self.state.close_room("ABCD", only_if_empty=True))
+        self.assertFalse(self.state.room_exists("ABCD"))
+
+    def test_close_room_drops_members(self):
+        self.state.create_room("ABCD")
+        self.state.join_room("ABCD", "alice", "sid1")
+        self.assertTrue(self.state.close_room("ABCD"))
+        self.state.create_room("ABCD")
+        self.assertTrue(self.state.join_room("ABCD", "alice", "sid2"))
+
+
+class TestLocalChatState(ChatStateTests, unittest.TestCase):
+    def make_state(self):
+        return LocalChatState()
+
+
+class TestSQLiteChatState(ChatStateTests, unittest.TestCase):
+    def make_state(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "chat.db")
+        return self.open()
+
+    def open(self, **kwargs):
+        state = SQLiteChatState(self.path, **kwargs)
+        self.addCleanup(state.close)
+        return state
+
+    def test_shared_between_connections(self):
+        other = self.open()
+        self.state.create_room("ABCD")
+        self.assertTrue(other.room_exists("ABCD"))
+        self.assertTrue(other.join_room("ABCD", "alice", "sid1"))
+        self.assertFalse(self.state.join_room("ABCD", "alice", "sid2"))
+
+    def test_worker_restart(self):
+        self.state.create_room("ABCD")
+        self.assertTrue(self.state.join_room("ABCD", "alice", "sid1"))
+        # The worker dies without closing; its replacement stops counting it
+        # once its heartbeat is older than the TTL (here at once)
+        restarted = self.open(ttl=0)
+        self.assertTrue(restarted.join_room("ABCD", "alice", "sid2"))
+        self.assertEqual(restarted.leave_room("ABCD", "alice", "sid1"), 1)
+        self.assertEqual(restarted.leave_room("ABCD", "alice", "sid2"), 0)
+
+    def test_close_drops_members(self):
+        self.state.create_room("ABCD")
+        other = SQLiteChatState(self.path)
+        other.join_room("ABCD", "alice", "sid1")
+        other.close()
+        self.assertTrue(self.state.close_room("ABCD", only_if_empty=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["CHAT_DB"] = os.path.join(_tmp.name, "chat.db")
+
+import main  # noqa: E402  (reads CHAT_DB on import)
+
+
+class StopLoop(Exception):
+    pass
+
+
+class TestFlushMessages(unittest.TestCase):
+    def test_survives_database_errors(self):
+        sleeps = mock.Mock(side_effect=[None, None, None, StopLoop])
+        flush = mock.Mock(side_effect=[sqlite3.OperationalError("database is locked"), None, None])
+        heartbeat = mock.Mock(side_effect=[sqlite3.OperationalError("database is locked"), None, None])
+        flush.__name__, heartbeat.__name__ = "flush", "heartbeat"
+        with mock.patch.object(main.socketio, "sleep", sleeps), \
+                mock.patch.object(main.message_store, "flush", flush), \
+                mock.patch.object(main.state, "heartbeat", heartbeat), \
+                mock.patch.object(main, "HEARTBEAT_INTERVAL", 0), \
+                mock.patch("builtins.print"):
+            with self.assertRaises(StopLoop):
+                main.flush_messages()
+        self.assertEqual(flush.call_count, 3)
+        self.assertEqual(heartbeat.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
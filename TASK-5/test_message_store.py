@@ -0,0 +1,104 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from message_store import MessageStore
+
+
+def message(i, name="alice"):
+    return {"name": name, "message": f"hello {i}", "time": "12:00", "profile_pic": "<svg/>"}
+
+
+class TestMessageStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "chat.db")
+
+    def open(self, **kwargs):
+        store = MessageStore(self.path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_sequences_and_recent(self):
+        store = self.open(batch_size=10, hot_tail_size=5)
+        for i in range(1, 26):
+            self.assertEqual(store.append("ROOM", message(i))["seq"], i)
+        store.append("OTHR", message(0))
+
+        self.assertEqual([m["seq"] for m in store.recent("ROOM", 3)], [23, 24, 25])
+        # Older than the hot tail: read back from SQLite
+        page = store.before("ROOM", 8, 4)
+        self.assertEqual([m["seq"] for m in page], [4, 5, 6, 7])
+        self.assertEqual(page[0]["message"], "hello 4")
+        self.assertEqual(store.before("ROOM", 1, 10), [])
+        self.assertEqual(store.recent("NONE", 10), [])
+        self.assertEqual(store.last_seq("OTHR"), 1)
+
+    def test_durable_across_reopen(self):
+        store = self.open(batch_size=1000)
+        for i in range(1, 8):
+            store.append("ROOM", message(i))
+        store.close()
+
+        store = self.open()
+        self.assertTrue(store.has_room("ROOM"))
+        self.assertEqual(store.append("ROOM", message(8))["seq"], 8)
+        self.assertEqual([m["message"] for m in store.recent("ROOM", 3)], ["hello 6", "hello 7", "hello 8"])
+
+    def test_compact(self):
+        store = self.open()
+        for i in range(1, 21):
+            store.append("BUSY", message(i))
+        store.append("IDLE", message(1))
+        store.flush()
+
+        deleted = store.compact(retention=60, max_room_messages=5, now=0)
+        self.assertEqual(deleted, 15)
+        self.assertEqual([m["seq"] for m in store.before("BUSY", 8, 10)], [])
+        self.assertEqual(len(store.recent("BUSY", 100)), 5)
+        self.assertEqual(store.first_seq("BUSY"), 16)
+
+        deleted = store.compact(retention=60, max_room_messages=5, now=10**10)
+        self.assertEqual(deleted, 6)
+        self.assertFalse(store.has_room("IDLE"))
+        self.assertEqual(store.first_seq("IDLE"), 0)
+
+    def test_first_seq_of_pending_messages(self):
+        store = self.open(batch_size=1000)
+        self.assertEqual(store.first_seq("ROOM"), 0)
+        store.append("ROOM", message(1))
+        self.assertEqual(store.first_seq("ROOM"), 1)
+
+    def test_shared_stores_interleave(self):
+        first, second = self.open(shared=True), self.open(shared=True)
+        for i in range(1, 7):
+            store = first if i % 2 else second
+            self.assertEqual(store.append("ROOM", message(i))["seq"], i)
+        # Committed on append: each store reads the other's messages
+        self.assertEqual([m["message"] for m in second.recent("ROOM", 2)], ["hello 5", "hello 6"])
+        self.assertEqual(first.last_seq("ROOM"), 6)
+        self.assertTrue(second.has_room("ROOM"))
+        self.assertFalse(second.has_room("NONE"))
+
+    def test_shared_group_commit(self):
+        store = self.open(shared=True)
+        seqs = []
+
+        def append_many():
+            for i in range(50):
+                seqs.append(store.append("ROOM", message(i))["seq"])
+
+        threads = [threading.Thread(target=append_many) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Appends committed together still get gapless, distinct seqs
+        self.assertEqual(sorted(seqs), list(range(1, 401)))
+        self.assertEqual(len(self.open(shared=True).recent("ROOM", 1000)), 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from user_store import UserStore
+
+
+class TestUserStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "chat.db")
+
+    def open(self, **kwargs):
+        store = UserStore(self.path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_add_and_get(self):
+        store = self.open()
+        self.assertIsNone(store.get("alice"))
+        self.assertTrue(store.add("alice", "hash", "<svg/>"))
+        self.assertFalse(store.add("alice", "other", "<svg/>"))
+        store.set_profile_pic("alice", "<svg id='2'/>")
+        self.assertEqual(store.get("alice"), {"password": "hash", "profile_pic": "<svg id='2'/>"})
+        # Callers get copies; the cache cannot be changed through them
+        store.get("alice")["password"] = "changed"
+        self.assertEqual(store.get("alice")["password"], "hash")
+
+    def test_durable_and_indexed(self):
+        self.open().add("alice", "hash", "<svg/>")
+        self.assertEqual(self.open().get("alice")["password"], "hash")
+        with sqlite3.connect(self.path) as conn:
+            plan = " ".join(row[-1] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT password FROM users WHERE name = ?", ("alice",)))
+        self.assertIn("users_name", plan)
+
+    def test_cache_is_written_through(self):
+        store = self.open(cache_size=2)
+        for name in ("alice", "bob", "carol"):
+            store.add(name, f"{name}-hash", "<svg/>")
+        self.assertEqual(list(store._cache), ["bob", "carol"])
+        with mock.patch.object(store, "_conn", wraps=store._conn) as conn:
+            store.get("carol")
+            conn.execute.assert_not_called()
+            store.get("alice")
+            conn.execute.assert_called_once()
+
+    def test_cache_ttl(self):
+        first, second = self.open(), self.open(cache_ttl=0)
+        first.add("alice", "hash", "<svg/>")
+        self.assertEqual(second.get("alice")["profile_pic"], "<svg/>")
+        first.set_profile_pic("alice", "<svg id='2'/>")
+        self.assertEqual(second.get("alice")["profile_pic"], "<svg id='2'/>")
+
+
+if __name__ == '__main__':
+    unittest.main()
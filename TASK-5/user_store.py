@@ -0,0 +1,94 @@
+"""
+Durable user accounts.
+
+Accounts live in a SQLite table with a unique index on the username, so
+they survive restarts and are shared by every worker process that opens the
+same database. Reads go through a bounded in-memory cache that every write
+updates as well (write-through); with several processes, cache_ttl bounds
+how long a profile picture changed through another process can stay stale.
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_SIZE = 10_000
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        password TEXT NOT NULL,
+        profile_pic TEXT
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS users_name ON users (name)",
+)
+
+
+class UserStore:
+    """
+    Accounts keyed by username; users are dicts with "password" (a hash) and
+    "profile_pic". All methods are safe to call from several threads.
+    """
+
+    def __init__(self, path, cache_size=CACHE_SIZE, cache_ttl=None):
+        self.path = path
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        for pragma in PRAGMAS:
+            self._conn.execute(pragma)
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._cache = OrderedDict()  # name -> (user, time cached), most recently used last
+
+    def get(self, name):
+        """Returns a copy of the user called name, or None."""
+        with self._lock:
+            entry = self._cache.get(name)
+            if entry and (self.cache_ttl is None or time.monotonic() - entry[1] < self.cache_ttl):
+                self._cache.move_to_end(name)
+                return dict(entry[0])
+            row = self._conn.execute("SELECT password, profile_pic FROM users WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                # Misses are not cached: another process may sign the name up
+                self._cache.pop(name, None)
+                return None
+            user = {"password": row[0], "profile_pic": row[1]}
+            self._remember(name, user)
+            return dict(user)
+
+    def add(self, name, password_hash, profile_pic):
+        """Creates an account. Returns False if the name is taken."""
+        with self._lock:
+            added = self._conn.execute(
+                "INSERT OR IGNORE INTO users (name, password, profile_pic) VALUES (?, ?, ?)",
+                (name, password_hash, profile_pic),
+            ).rowcount == 1
+            if added:
+                self._remember(name, {"password": password_hash, "profile_pic": profile_pic})
+            return added
+
+    def set_profile_pic(self, name, profile_pic):
+        with self._lock:
+            self._conn.execute("UPDATE users SET profile_pic = ? WHERE name = ?", (profile_pic, name))
+            entry = self._cache.get(name)
+            if entry:
+                self._remember(name, dict(entry[0], profile_pic=profile_pic))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _remember(self, name, user):
+        self._cache[name] = (user, time.monotonic())
+        self._cache.move_to_end(name)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)